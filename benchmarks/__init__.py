@@ -0,0 +1,7 @@
+"""
+Benchmark suite for the encode and decode hot paths.
+
+Run it with:
+
+    python -m benchmarks [--sizes short 1MB 100MB] [--baseline FILE] [--save FILE]
+"""
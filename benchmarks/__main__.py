@@ -0,0 +1,58 @@
+"""
+Command-line entry point for the benchmark suite.
+"""
+
+import argparse
+import sys
+import tempfile
+
+from benchmarks.suite import (
+    CASES, DEFAULT_SIZES, SIZES, find_regressions, load_baseline, run_benchmarks, save_baseline
+)
+
+
+def main():
+    """Main function to handle command line arguments and run the benchmarks"""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Benchmark the Morse code encoder and decoder")
+    parser.add_argument("cases", nargs="*", metavar="CASE",
+                        help=f"Benchmarks to run, from: {', '.join(CASES)} (default: all)")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=DEFAULT_SIZES,
+                        help="Input sizes to benchmark (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of timing samples per benchmark (default: %(default)s)")
+    parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative regression (default: %(default)s)")
+    parser.add_argument("--save", help="Write the results to this JSON file as a new baseline")
+
+    args = parser.parse_args()
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    try:
+        baseline = load_baseline(args.baseline) if args.baseline else {}
+    except (IOError, ValueError) as e:
+        print(f"Error: cannot load baseline: {e}", file=sys.stderr)
+        return 1
+
+    results = []
+    print(f"{'benchmark':<24} {'size':>6} {'ms/call':>10} {'MB/s':>10} {'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for result in run_benchmarks(workdir, args.cases, args.sizes, args.repeat):
+            results.append(result)
+            print(f"{result['name']:<24} {result['size']:>6} {result['seconds'] * 1e3:>10.3f} "
+                  f"{result['mb_per_s']:>10.2f} {result['peak_bytes'] / 1e6:>10.2f}", flush=True)
+
+    if args.save:
+        save_baseline(args.save, results)
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
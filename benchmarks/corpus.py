@@ -0,0 +1,114 @@
+"""
+Deterministic input generators for the benchmarks.
+"""
+
+import random
+
+from encode import encode_to_morse
+from morse_utils import CHAR_TO_MORSE
+
+# Size of the block that is generated randomly and then repeated; large
+# enough that the repetition does not make the input unrealistically regular
+_BLOCK_SIZE = 1 << 20
+
+# Characters mixed into the text generated for skip_unknown benchmarks
+_UNKNOWN_CHARS = "#%*<>[]{}|~\t\né"
+
+
+def _random_words(rng, size, alphabet):
+    """
+    Generates words of 1 to 10 characters separated by single spaces.
+
+    Args:
+        rng (random.Random): Random number generator
+        size (int): Approximate number of characters to generate
+        alphabet (str): Characters the words are made of
+
+    Returns:
+        str: The generated text, at least size characters long
+    """
+    words = []
+    length = 0
+    while length < size:
+        word = "".join(rng.choices(alphabet, k=rng.randint(1, 10)))
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _repeat_to_size(block, size, separator):
+    """
+    Repeats a block, joined by a separator, and trims the result to size.
+
+    The result is trimmed back to the last separator so that it never ends
+    in the middle of a word.
+
+    Args:
+        block (str): Text to repeat
+        size (int): Number of characters wanted
+        separator (str): Word separator used to join and trim
+
+    Returns:
+        str: Text of at most size characters
+    """
+    if len(block) >= size:
+        text = block
+    else:
+        text = separator.join([block] * (size // (len(block) + len(separator)) + 1))
+    if len(text) <= size:
+        return text
+    return text[:text.rindex(separator, 0, size + 1)].rstrip()
+
+
+def make_text(size, seed=0, unknown=False):
+    """
+    Generates English text that can be encoded.
+
+    Args:
+        size (int): Approximate number of characters
+        seed (int): Seed for the random number generator
+        unknown (bool): If True, one word in ten contains unsupported characters
+
+    Returns:
+        str: The generated text
+    """
+    rng = random.Random(seed)
+    alphabet = "".join(CHAR_TO_MORSE) + "abcdefghijklmnopqrstuvwxyz" * 2
+    block = _random_words(rng, min(size, _BLOCK_SIZE), alphabet)
+    if unknown:
+        words = block.split(" ")
+        for index in range(0, len(words), 10):
+            words[index] += rng.choice(_UNKNOWN_CHARS)
+        block = " ".join(words)
+    return _repeat_to_size(block, size, " ")
+
+
+def make_morse(size, seed=0):
+    """
+    Generates Morse code that can be decoded.
+
+    Args:
+        size (int): Approximate number of characters
+        seed (int): Seed for the random number generator
+
+    Returns:
+        str: The generated Morse code
+    """
+    # Morse code is roughly four times as long as the text it encodes
+    block = encode_to_morse(make_text(min(size, _BLOCK_SIZE) // 4 + 1, seed))
+    return _repeat_to_size(block, size, " / ")
+
+
+def make_messages(count, seed=0):
+    """
+    Generates short messages, such as a column of a data frame would hold.
+
+    Args:
+        count (int): Number of messages
+        seed (int): Seed for the random number generator
+
+    Returns:
+        list: Messages of 10 to 40 characters
+    """
+    rng = random.Random(seed)
+    return [make_text(rng.randint(10, 40), seed=rng.random()) for _ in range(count)]
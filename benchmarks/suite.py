@@ -0,0 +1,293 @@
+"""
+Benchmark cases, timing and baseline comparison.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from benchmarks.corpus import make_messages, make_morse, make_text
+from decode import decode_from_morse, decode_from_morse_tree, iter_decode
+from encode import encode_to_morse, iter_encode
+from morse_cache import WordCache
+from morse_check import iter_morse_problems, iter_text_problems
+from morse_segment import Segmenter
+from morse_utils import CHUNK_SIZE, read_chunks_from_file, validate_english_text, validate_morse_code, write_chunks_to_file
+
+# Input sizes, in characters, that can be selected by name
+SIZES = {
+    "short": 64,
+    "1MB": 1 << 20,
+    "10MB": 10 << 20,
+    "100MB": 100 << 20,
+}
+
+# Sizes benchmarked when none are given
+DEFAULT_SIZES = ["short", "1MB"]
+
+# Directory holding encode.py and decode.py, run by the cold start benchmarks
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Minimum time one timing sample should take, so that short inputs are run
+# often enough per sample to be measured reliably
+_MIN_SAMPLE_TIME = 0.2
+
+
+def _prepare_encode(size, workdir):
+    text = make_text(size)
+    return lambda: encode_to_morse(text), len(text)
+
+
+def _prepare_encode_skip_unknown(size, workdir):
+    text = make_text(size, unknown=True)
+    return lambda: encode_to_morse(text, skip_unknown=True), len(text)
+
+
+def _prepare_decode(size, workdir):
+    morse_code = make_morse(size)
+    return lambda: decode_from_morse(morse_code), len(morse_code)
+
+
+def _prepare_encode_cached(size, workdir):
+    text = make_text(size)
+    cache = WordCache()
+    return lambda: encode_to_morse(text, cache=cache), len(text)
+
+
+def _prepare_decode_cached(size, workdir):
+    morse_code = make_morse(size)
+    cache = WordCache()
+    return lambda: decode_from_morse(morse_code, cache=cache), len(morse_code)
+
+
+def _prepare_decode_tree(size, workdir):
+    morse_code = make_morse(size)
+    return lambda: decode_from_morse_tree(morse_code), len(morse_code)
+
+
+def _prepare_validate_english_text(size, workdir):
+    text = make_text(size)
+    return lambda: validate_english_text(text), len(text)
+
+
+def _prepare_validate_morse_code(size, workdir):
+    morse_code = make_morse(size)
+    return lambda: validate_morse_code(morse_code), len(morse_code)
+
+
+def _chunked(text):
+    """Splits text into chunks as read_chunks_from_file would"""
+    return [text[start:start + CHUNK_SIZE] for start in range(0, len(text), CHUNK_SIZE)]
+
+
+def _prepare_check_text(size, workdir):
+    chunks = _chunked(make_text(size))
+    return lambda: list(iter_text_problems(chunks)), sum(map(len, chunks))
+
+
+def _prepare_check_morse(size, workdir):
+    chunks = _chunked(make_morse(size))
+    return lambda: list(iter_morse_problems(chunks)), sum(map(len, chunks))
+
+
+def _prepare_file_round_trip(size, workdir):
+    text = make_text(size)
+    text_path = os.path.join(workdir, "round_trip.txt")
+    morse_path = os.path.join(workdir, "round_trip.morse")
+    # The decoded text goes to its own file, so that every repeat encodes the same input
+    out_path = os.path.join(workdir, "round_trip.out.txt")
+    with open(text_path, "w") as f:
+        f.write(text)
+
+    def round_trip():
+        write_chunks_to_file(morse_path, iter_encode(read_chunks_from_file(text_path)))
+        write_chunks_to_file(out_path, iter_decode(read_chunks_from_file(morse_path)))
+
+    return round_trip, len(text)
+
+
+def _prepare_numpy_encode(size, workdir):
+    from morse_numpy import encode_array
+    messages = make_messages(max(1, size // 25))
+    return lambda: encode_array(messages), sum(map(len, messages))
+
+
+def _prepare_numpy_decode(size, workdir):
+    from morse_numpy import decode_array, encode_array
+    morse_codes = encode_array(make_messages(max(1, size // 100)))
+    return lambda: decode_array(morse_codes), sum(map(len, morse_codes))
+
+
+def _prepare_segment(size, workdir):
+    # Segmentation does far more work per symbol than decoding, so it runs on
+    # a sixteenth of the input size, with the words of the text as word list
+    text = make_text(max(SIZES["short"], size // 16))
+    segmenter = Segmenter(text.split())
+    morse_code = encode_to_morse(text).replace(" ", "").replace("/", "")
+    return lambda: segmenter.segment(morse_code), len(morse_code)
+
+
+def _cold_start(module, message):
+    """
+    Builds a benchmark of running a command-line tool on one short message.
+
+    The tool is started as a module, as the console scripts start it, so the
+    time covers interpreter startup, imports and the translation itself. It
+    does not depend on the input size, so only the short size is run.
+    """
+    def prepare(size, workdir):
+        if size != SIZES["short"]:
+            return None
+        command = [sys.executable, "-m", module, message]
+        return lambda: subprocess.run(command, cwd=_ROOT, stdout=subprocess.DEVNULL, check=True), len(message)
+
+    return prepare
+
+
+# Benchmark name mapped to a function that takes the input size and a scratch
+# directory, and returns the callable to time and the input size in characters,
+# or None if the case does not run at that size
+CASES = {
+    "encode": _prepare_encode,
+    "encode_skip_unknown": _prepare_encode_skip_unknown,
+    "decode": _prepare_decode,
+    "decode_tree": _prepare_decode_tree,
+    "encode_cached": _prepare_encode_cached,
+    "decode_cached": _prepare_decode_cached,
+    "validate_english_text": _prepare_validate_english_text,
+    "validate_morse_code": _prepare_validate_morse_code,
+    "check_text": _prepare_check_text,
+    "check_morse": _prepare_check_morse,
+    "file_round_trip": _prepare_file_round_trip,
+    "numpy_encode_array": _prepare_numpy_encode,
+    "numpy_decode_array": _prepare_numpy_decode,
+    "segment_gapless": _prepare_segment,
+    "cold_start_encode": _cold_start("encode", "SOS"),
+    "cold_start_decode": _cold_start("decode", "... --- ..."),
+}
+
+
+def measure(func, input_size, repeat=3):
+    """
+    Measures the throughput and peak memory of a function.
+
+    Args:
+        func (callable): Function to benchmark, called without arguments
+        input_size (int): Number of characters func processes per call
+        repeat (int): Number of timing samples; the fastest one is reported
+
+    Returns:
+        dict: seconds per call, throughput in MB/s and peak memory in bytes
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= _MIN_SAMPLE_TIME:
+            break
+        number *= 10 if elapsed < _MIN_SAMPLE_TIME / 10 else 2
+    samples = [elapsed] + timer.repeat(repeat - 1, number) if repeat > 1 else [elapsed]
+    seconds = min(samples) / number
+
+    # Memory is traced in a separate call, as tracing slows allocation down
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": seconds,
+        "mb_per_s": input_size / seconds / 1e6,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(workdir, names=None, sizes=None, repeat=3):
+    """
+    Runs benchmark cases over a range of input sizes.
+
+    Args:
+        workdir (str): Scratch directory for file benchmarks
+        names (list of str): Cases to run, defaults to all of CASES
+        sizes (list of str): Keys of SIZES to run, defaults to DEFAULT_SIZES
+        repeat (int): Number of timing samples per benchmark
+
+    Yields:
+        dict: One result per case and size, with name, size, input_bytes,
+            seconds, mb_per_s and peak_bytes
+    """
+    for name in names or CASES:
+        for size in sizes or DEFAULT_SIZES:
+            try:
+                prepared = CASES[name](SIZES[size], workdir)
+            except ImportError:
+                # Optional dependency not installed
+                continue
+            if prepared is None:
+                continue
+            func, input_size = prepared
+            result = {"name": name, "size": size, "input_bytes": input_size}
+            result.update(measure(func, input_size, repeat))
+            yield result
+
+
+def load_baseline(path):
+    """
+    Loads stored benchmark results.
+
+    Args:
+        path (str): Path to a JSON file written by save_baseline
+
+    Returns:
+        dict: Results keyed by "name/size"
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    """
+    Stores benchmark results for later comparison.
+
+    Args:
+        path (str): Path to the JSON file to write
+        results (list of dict): Results from run_benchmarks
+    """
+    baseline = {f"{result['name']}/{result['size']}": result for result in results}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(results, baseline, tolerance=0.1):
+    """
+    Compares benchmark results against a baseline.
+
+    Args:
+        results (list of dict): Results from run_benchmarks
+        baseline (dict): Results from load_baseline
+        tolerance (float): Allowed relative loss of throughput, or growth of peak memory
+
+    Returns:
+        list: Messages describing each regression
+    """
+    regressions = []
+    for result in results:
+        key = f"{result['name']}/{result['size']}"
+        if key not in baseline:
+            continue
+        before = baseline[key]
+        if result["mb_per_s"] < before["mb_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: throughput {result['mb_per_s']:.2f} MB/s, baseline {before['mb_per_s']:.2f} MB/s"
+            )
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: peak memory {result['peak_bytes']} bytes, baseline {before['peak_bytes']} bytes"
+            )
+    return regressions
@@ -0,0 +1,6 @@
+"""
+Configuration shared by the test suite.
+"""
+
+# Differential fuzzing of the translation engines (see morse_fuzz.py)
+pytest_plugins = ["morse_fuzz"]
@@ -3,80 +3,606 @@
 Morse Code Decoder - Converts Morse code to English text
 """
 
-import argparse
 import sys
-import re
-from morse_utils import MORSE_TO_CHAR, validate_morse_code, read_from_file, write_to_file
+from functools import partial
+from morse_batch import PARALLEL_BLOCK_SIZE, pool_starmap, run_batch
+from morse_cache import WordCache
+from morse_tables import get_table, table_names
+from morse_utils import CHUNK_SIZE, CODE_RE, read_chunks_from_file, write_chunks_into, write_chunks_to_file
 
-def decode_from_morse(morse_code):
+def _invalid_code_error(code, offset):
+    """Builds the error raised for a letter code that matches no character"""
+    return ValueError(f"Morse code '{code}' does not match any character (at offset {offset})")
+
+def _decode_block(morse_code, offset, is_first, is_last, cache=None, table=None):
+    """
+    Converts a block of Morse code that starts and ends at letter boundaries.
+    
+    Args:
+        morse_code (str): Letter codes separated by spaces and slashes, without
+            leading whitespace if is_first or trailing whitespace if is_last
+        offset (int): Position of the block in the whole message, for errors
+        is_first (bool): Whether the block opens the message
+        is_last (bool): Whether the block closes the message
+        cache (WordCache): Optional cache of word translations to reuse
+        table (CodeTable): Code table to decode with, None for the default one
+        
+    Returns:
+        str: Decoded English text
+        
+    Raises:
+        ValueError: If a code is invalid, or the cache was built for another table
+    """
+    table = get_table(table)
+    if cache is not None:
+        cache.check_table(table)
+    
+    # A separator can neither open nor close the message
+    if is_first and morse_code.startswith('/'):
+        raise _invalid_code_error('/', offset)
+    
+    if cache is not None and not (is_last and morse_code.endswith('/')):
+        try:
+            return ' '.join(map(cache.decode_word, morse_code.split('/')))
+        except KeyError:
+            # Fall through so that the error names the offending code
+            pass
+    
+    # Pad every word separator with spaces, however it was written, so that a
+    # single split yields letter codes, "/" for word gaps and "" for padding
+    tokens = morse_code.replace('/', ' / ').split(' ')
+    try:
+        decoded = ''.join(map(table.decode_lookup.__getitem__, tokens))
+    except KeyError:
+        for match in CODE_RE.finditer(morse_code):
+            if match.group() not in table.morse_to_char:
+                raise _invalid_code_error(match.group(), offset + match.start()) from None
+        raise
+    
+    if is_last and morse_code.endswith('/'):
+        raise _invalid_code_error('/', offset + len(morse_code) - 1)
+    return decoded
+
+def decode_from_morse(morse_code, cache=None, table=None):
     """
     Converts Morse code to English text.
     
     Args:
         morse_code (str): Morse code to be decoded
+        cache (WordCache): Optional cache of word translations to reuse, built for the same table
+        table: Name of a code table, or a CodeTable (default: Latin)
         
     Returns:
         str: Decoded English text
     """
-    valid, error_msg = validate_morse_code(morse_code)
-    if not valid:
-        raise ValueError(error_msg)
+    if not morse_code:
+        raise ValueError("Input Morse code is empty")
+    
+    # Leading and trailing whitespace is ignored
+    offset = len(morse_code) - len(morse_code.lstrip())
+    return _decode_block(morse_code.strip(), offset, True, True, cache, get_table(table))
+
+def decode_into(morse_code, writer, cache=None, table=None, encoding=None):
+    """
+    Converts Morse code to English text written straight to a writer.
+    
+    The Morse code is decoded CHUNK_SIZE characters at a time and each piece
+    of text is written as soon as it is produced, so the whole text is never
+    built in memory. What is written is the same as what decode_from_morse
+    returns.
+    
+    Args:
+        morse_code (str): Morse code to be decoded
+        writer: bytearray to append to, binary file object such as an
+            io.BufferedWriter, or text file object
+        cache (WordCache): Optional cache of word translations to reuse, built for the same table
+        table: Name of a code table, or a CodeTable (default: Latin)
+        encoding (str): Text encoding for a bytearray or binary file, defaults to the one used by open()
+        
+    Returns:
+        int: Number of characters of text written
+        
+    Raises:
+        ValueError: As decode_from_morse does; the text decoded before the
+            error has already been written
+    """
+    chunks = (morse_code[start:start + CHUNK_SIZE] for start in range(0, len(morse_code), CHUNK_SIZE))
+    return write_chunks_into(writer, iter_decode(chunks, cache, table), encoding)
+
+def decode_from_morse_tree(morse_code, table=None):
+    """
+    Converts Morse code to English text by walking the Morse binary tree.
+    
+    Symbols are read one at a time and only a tree index is kept per letter,
+    so no substring is created for each letter code. The result and errors are
+    the same as those of decode_from_morse.
+    
+    Args:
+        morse_code (str): Morse code to be decoded
+        table: Name of a code table, or a CodeTable (default: Latin)
+        
+    Returns:
+        str: Decoded English text
+    """
+    if not morse_code:
+        raise ValueError("Input Morse code is empty")
+    
+    table = get_table(table)
+    morse_code_stripped = morse_code.strip()
+    tree = table.tree
+    tree_size = len(tree)
+    decoded = []
+    index = 1
+    
+    # A trailing space flushes the last letter
+    for symbol in morse_code_stripped + ' ':
+        if symbol == '.':
+            index = 2 * index
+        elif symbol == '-':
+            index = 2 * index + 1
+        elif symbol == ' ' or symbol == '/':
+            if index > 1:
+                char = tree[index] if index < tree_size else None
+                if char is None:
+                    break
+                decoded.append(char)
+                index = 1
+            if symbol == '/':
+                decoded.append(' ')
+        else:
+            break
+    else:
+        if not morse_code_stripped.startswith('/') and not morse_code_stripped.endswith('/'):
+            return ''.join(decoded)
+    
+    # Let the table-driven decoder find and report the first error
+    offset = len(morse_code) - len(morse_code.lstrip())
+    return _decode_block(morse_code_stripped, offset, True, True, table=table)
+
+# Number of symbols of an invalid code kept by an IncrementalDecoder for its error
+_MAX_ERROR_CODE = 64
+
+class IncrementalDecoder:
+    """
+    Decodes a live stream of Morse code symbols as they arrive.
+    
+    Each letter is returned by feed() as soon as the gap after it is seen,
+    and flush() ends the message. Only a tree index and a few offsets are
+    kept per stream, so thousands of streams can be decoded side by side.
+    The decoded text and errors are the same as those of decode_from_morse
+    on the whole message; an error is raised as soon as it is certain, and
+    an invalid code longer than 64 symbols is reported by its first 64.
+    """
+    
+    __slots__ = ('_tree', '_index', '_code_start', '_offset', '_is_empty', '_started',
+                 '_last_slash', '_run_start', '_run_text', '_run_end', '_run_stripped')
+    
+    def __init__(self, table=None):
+        """
+        Args:
+            table: Name of a code table, or a CodeTable (default: Latin)
+        """
+        self._tree = get_table(table).tree
+        self.reset()
+    
+    def reset(self):
+        """Forgets the current message and starts a new one"""
+        self._index = 1          # Position in the tree of the code being read
+        self._code_start = 0     # Offset of the code being read
+        self._offset = 0         # Number of symbols fed so far
+        self._is_empty = True
+        self._started = False    # Whether anything but whitespace was fed
+        self._last_slash = None  # Offset of a separator not followed by a code yet
+        # A code holding symbols other than dots and dashes, which is only
+        # valid if nothing but whitespace follows it until the message ends
+        self._run_start = None   # Offset of the code, None if there is none
+        self._run_text = ''      # Its first symbols, up to _MAX_ERROR_CODE of them
+        self._run_end = None     # Offset of the gap that ended it, None until then
+        self._run_stripped = None  # Offset after its last symbol other than whitespace, None if it has none
+    
+    def feed(self, symbols):
+        """
+        Decodes the next symbols of the message.
+        
+        Args:
+            symbols (str): Any number of dots, dashes, spaces and slashes
+            
+        Returns:
+            str: The letters and word gaps completed by these symbols
+        """
+        decoded = []
+        self._is_empty = self._is_empty and not symbols
+        for offset, symbol in enumerate(symbols, self._offset):
+            if self._run_start is not None:
+                self._extend_run(offset, symbol)
+            elif symbol == '.' or symbol == '-':
+                if self._index == 1:
+                    self._code_start = offset
+                self._index = 2 * self._index + (symbol == '-')
+                self._started = True
+                self._last_slash = None
+            elif symbol == ' ' or symbol == '/':
+                if not self._started:
+                    # Leading whitespace is ignored, but a separator cannot open the message
+                    if symbol == '/':
+                        raise _invalid_code_error('/', offset)
+                    continue
+                if self._index > 1:
+                    decoded.append(self._letter())
+                if symbol == '/':
+                    decoded.append(' ')
+                    self._last_slash = offset
+            elif symbol.isspace():
+                # Trailing whitespace is ignored, so whitespace other than a
+                # space is only an error if more symbols follow
+                if self._started:
+                    self._start_run(offset, symbol)
+            else:
+                self._started = True
+                self._start_run(offset, symbol)
+                self._run_stripped = offset + 1
+        self._offset += len(symbols)
+        return ''.join(decoded)
+    
+    def flush(self):
+        """
+        Ends the message and resets the decoder for the next one.
+        
+        Returns:
+            str: The last letter, if the message did not end with a gap
+        """
+        try:
+            if self._run_stripped is not None:
+                self._raise_error(self._run_stripped)
+            if self._is_empty:
+                raise ValueError("Input Morse code is empty")
+            decoded = self._letter() if self._index > 1 else ''
+            if self._last_slash is not None:
+                raise _invalid_code_error('/', self._last_slash)
+            return decoded
+        finally:
+            self.reset()
+    
+    def _letter(self):
+        """Returns the letter at the current tree index and starts a new code"""
+        index = self._index
+        tree = self._tree
+        char = tree[index] if index < len(tree) else None
+        if char is None:
+            # Read the code back from the path through the tree
+            code = bin(index)[3:].replace('0', '.').replace('1', '-')
+            raise _invalid_code_error(code, self._code_start)
+        self._index = 1
+        return char
+    
+    def _start_run(self, offset, symbol):
+        """Starts a code holding a symbol other than a dot or a dash, including the dots and dashes before it"""
+        if self._index > 1:
+            self._run_start = self._code_start
+            text = bin(self._index)[3:].replace('0', '.').replace('1', '-')[:_MAX_ERROR_CODE] + symbol
+        else:
+            self._run_start = offset
+            text = symbol
+        self._run_text = text[:_MAX_ERROR_CODE]
+    
+    def _extend_run(self, offset, symbol):
+        """Reads a symbol following the start of a code holding symbols other than dots and dashes"""
+        if self._run_end is None:
+            if symbol == ' ' or symbol == '/':
+                self._run_end = offset
+            else:
+                if len(self._run_text) < _MAX_ERROR_CODE:
+                    self._run_text += symbol
+                if not symbol.isspace():
+                    # Whitespace followed by more of the code is inside it
+                    self._run_stripped = offset + 1
+        # Until more than whitespace follows the code, that whitespace may
+        # turn out to be trailing, and not part of the code
+        if self._run_end is not None and not symbol.isspace():
+            self._raise_error(self._run_end)
+    
+    def _raise_error(self, end):
+        """Raises the error for the invalid code, which ends at offset end"""
+        raise _invalid_code_error(self._run_text[:end - self._run_start], self._run_start)
+
+def _iter_blocks(chunks, block_size):
+    """
+    Regroups chunks of Morse code into blocks that end at letter boundaries.
     
-    # Normalize the morse code string
-    morse_code = morse_code.strip()
+    Args:
+        chunks (iterable of str): Morse code to be decoded, in pieces of any size
+        block_size (int): Minimum number of characters gathered before a block is cut
+        
+    Yields:
+        tuple: (morse_code, offset, is_first, is_last) arguments for _decode_block
+    """
+    is_empty = True
+    is_first = True
+    pending = []  # Pieces of input not handed out yet
+    pending_size = 0
+    offset = 0    # Position of pending in the whole message
     
-    # Replace any combination of spaces and slashes with a standard word separator
-    morse_code = re.sub(r'\s*/\s*', ' / ', morse_code)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        is_empty = False
+        
+        if is_first and not pending:
+            # Leading whitespace is ignored
+            body = chunk.lstrip()
+            offset += len(chunk) - len(body)
+            chunk = body
+            if not chunk:
+                continue
+        
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < block_size:
+            continue
+        
+        # Trailing whitespace might turn out to end the message, so only cut
+        # at the last separator followed by something else, and never so
+        # early that the first block would be empty
+        end = len(chunk.rstrip())
+        boundary = max(chunk.rfind(' ', 0, end), chunk.rfind('/', 0, end))
+        if boundary < 0 or (boundary == 0 and len(pending) == 1):
+            continue
+        
+        pending[-1] = chunk[:boundary]
+        morse_code = ''.join(pending)
+        yield morse_code, offset, is_first, False
+        is_first = False
+        offset += len(morse_code)
+        pending = [chunk[boundary:]]
+        pending_size = len(pending[0])
     
-    words = []
-    for word in morse_code.split(' / '):
-        letters = []
-        for letter in word.strip().split(' '):
-            if letter:  # Skip empty strings
-                letters.append(MORSE_TO_CHAR.get(letter, ''))
-        words.append(''.join(letters))
+    if is_empty:
+        raise ValueError("Input Morse code is empty")
     
-    return ' '.join(words)
+    yield ''.join(pending).rstrip(), offset, is_first, True
+
+def iter_decode(chunks, cache=None, table=None):
+    """
+    Converts Morse code to English text incrementally.
+    
+    Letter codes and word separators split across chunk boundaries are handled,
+    so joining the output gives the same result as decode_from_morse on the
+    joined input. Only the current chunk and the code still being read are held
+    in memory.
+    
+    Args:
+        chunks (iterable of str): Morse code to be decoded, in pieces of any size
+        cache (WordCache): Optional cache of word translations to reuse, built for the same table
+        table: Name of a code table, or a CodeTable (default: Latin)
+        
+    Yields:
+        str: Consecutive pieces of the decoded English text
+    """
+    table = get_table(table)
+    for args in _iter_blocks(chunks, 0):
+        decoded = _decode_block(*args, cache=cache, table=table)
+        if decoded:
+            yield decoded
+
+def parallel_decode(chunks, jobs=None, block_size=PARALLEL_BLOCK_SIZE, table=None):
+    """
+    Converts Morse code to English text on several cores.
+    
+    The input is cut at letter boundaries into blocks of about block_size
+    characters, which are decoded in a pool of processes and reassembled in
+    order. The output and errors are the same as those of iter_decode.
+    
+    Args:
+        chunks (iterable of str): Morse code to be decoded, in pieces of any size
+        jobs (int): Number of worker processes, defaults to the number of CPUs
+        block_size (int): Approximate number of characters per block
+        table: Name of a code table, or a CodeTable (default: Latin)
+        
+    Yields:
+        str: Consecutive pieces of the decoded English text
+    """
+    table = get_table(table)
+    blocks = (args + (None, table) for args in _iter_blocks(chunks, block_size))
+    for decoded in pool_starmap(_decode_block, blocks, jobs):
+        if decoded:
+            yield decoded
+
+def _report_corrections(pieces, recorder=None):
+    """
+    Writes every correction made by the recovering decoder to stderr.
+    
+    Args:
+        pieces (iterable of tuple): (decoded text, corrections) from iter_decode_recovering
+        recorder (Recorder): Optional morse_stats.Recorder counting the repaired codes
+        
+    Yields:
+        str: The decoded text
+    """
+    for decoded, corrections in pieces:
+        for correction in corrections:
+            print(f"Recovered '{correction.code}' at offset {correction.offset} as "
+                  f"'{correction.replacement}' ({correction.kind})", file=sys.stderr)
+        if recorder is not None:
+            recorder.add_unknown(sum(correction.kind != 'dropped' for correction in corrections))
+        if decoded:
+            yield decoded
+
+def _iter_segmented(chunks, words_path, k, table):
+    """Segments the whole of the gapless input, yielding the candidates one per line"""
+    # Imported here, as only --gapless needs it
+    from morse_segment import Segmenter, load_word_list
+    words = load_word_list(words_path) if words_path else None
+    candidates = Segmenter(words, table).segment(''.join(chunks), k)
+    yield '\n'.join(candidate.text for candidate in candidates)
+
+def _is_single_message(argv):
+    """Whether the command line is nothing but one message to translate, as argparse would read it"""
+    return len(argv) == 1 and argv[0] != '' and (argv[0][0] != '-' or ' ' in argv[0])
 
 def main():
     """Main function for CLI operation"""
+    argv = sys.argv[1:]
+    if _is_single_message(argv):
+        # The most common use by far: skip building the option parser, which
+        # takes longer than translating a short message
+        try:
+            print(decode_from_morse(argv[0]))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+    
+    # Imported here, so that the common case above does not pay for it
+    import argparse
+    from morse_audio import DEFAULT_WPM
+    from morse_check import DEFAULT_MAX_ERRORS
+    from morse_recover import DEFAULT_PLACEHOLDER, STRATEGIES
+    from morse_timing import UNITS
+    
     parser = argparse.ArgumentParser(description='Convert Morse code to English text')
     
     parser.add_argument('morse', nargs='?', help='Morse code to decode')
-    parser.add_argument('--input', '-i', help='Input file containing Morse code to decode')
-    parser.add_argument('--output', '-o', help='Output file to write decoded text to')
+    parser.add_argument('--input', '-i', help='Input file containing Morse code to decode ("-" for stdin)')
+    parser.add_argument('--output', '-o', help='Output file to write decoded text to ("-" for stdout)')
+    parser.add_argument('--table', choices=table_names(), default='latin',
+                       help='Code table to translate with (default: %(default)s)')
+    parser.add_argument('--format', choices=['text', 'packed', 'timing'], default='text',
+                       help='Format of --input: Morse code text, the packed binary format written by '
+                            'encode.py --format packed, or the keying durations written by '
+                            'encode.py --format timing (default: %(default)s)')
+    parser.add_argument('--wpm', type=float, default=DEFAULT_WPM,
+                       help='Character speed in words per minute for --format timing (default: %(default)s)')
+    parser.add_argument('--farnsworth', type=float, metavar='WPM',
+                       help='Slower overall speed the gaps of --format timing were stretched to')
+    parser.add_argument('--unit', choices=UNITS, default='ms',
+                       help='Unit of the durations of --format timing: milliseconds, or dots '
+                            '(default: %(default)s)')
+    parser.add_argument('--wav', metavar='FILE', help='Input WAV file with a recording of Morse code to decode')
+    parser.add_argument('--tone', type=float,
+                       help='Tone frequency in Hz for --wav (default: found from the recording)')
+    parser.add_argument('--batch', metavar='DIR',
+                       help='Translate every file in DIR, writing results to --out-dir')
+    parser.add_argument('--out-dir', metavar='DIR', help='Output directory for --batch')
+    parser.add_argument('--jobs', '-j', type=int,
+                       help='Number of worker processes for --batch (default: number of CPUs), '
+                            'or for translating a single --input file in parallel')
+    parser.add_argument('--cache-size', type=int, metavar='N',
+                       help='Reuse the translations of up to N distinct words, for repetitive input')
+    parser.add_argument('--recover', action='store_true',
+                       help='Repair codes that match no character instead of stopping, reporting each repair on stderr')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='nearest',
+                       help='How --recover repairs a code: "nearest" replaces it with the nearest valid code '
+                            'or splits run-together letters, "placeholder" always uses the placeholder '
+                            '(default: %(default)s)')
+    parser.add_argument('--placeholder', default=DEFAULT_PLACEHOLDER, metavar='TEXT',
+                       help='Text decoded for a code --recover cannot repair (default: %(default)s)')
+    parser.add_argument('--gapless', action='store_true',
+                       help='Split Morse code received without letter and word gaps into the most likely text')
+    parser.add_argument('--words', metavar='FILE',
+                       help='Word list for --gapless, one word per line, optionally followed by its count')
+    parser.add_argument('--candidates', type=int, default=1, metavar='K',
+                       help='Number of --gapless candidates to print, most likely first (default: %(default)s)')
+    parser.add_argument('--check', action='store_true',
+                       help='Only check the input, printing every invalid code with its line and column')
+    parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, metavar='N',
+                       help='Number of problems --check reports before stopping, 0 for all (default: %(default)s)')
+    parser.add_argument('--lines', action='store_true',
+                       help='With --check, treat line breaks as gaps instead of reporting them')
+    parser.add_argument('--stats', action='store_true',
+                       help='Report the time and volume of each stage, unknown codes and peak memory on stderr')
+    parser.add_argument('--profile', metavar='FILE',
+                       help='Write a cProfile profile of the run to FILE, to read with "python -m pstats FILE"')
     
     args = parser.parse_args()
     
-    # Get input Morse code
+    if args.words and not args.gapless:
+        parser.error('--words requires --gapless')
+    if args.stats and args.batch:
+        parser.error('--stats cannot be used with --batch')
+    
+    if args.profile:
+        from morse_stats import run_profiled
+        return run_profiled(args.profile, _run, parser, args)
+    return _run(parser, args)
+
+def _run(parser, args):
+    """
+    Runs the command line once its arguments are parsed.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser of the arguments, to report usage errors
+        args (argparse.Namespace): Parsed arguments
+        
+    Returns:
+        int: Exit status
+    """
+    if args.batch:
+        if not args.out_dir:
+            parser.error('--batch requires --out-dir')
+        return run_batch(partial(iter_decode, table=args.table), args.batch, args.out_dir, args.jobs)
+    
+    recorder = None
+    if args.stats:
+        # Imported here, as it is only needed when instrumenting
+        from morse_stats import Recorder
+        recorder = Recorder()
+    
+    # Get input Morse code; the modules of each option are imported in its
+    # branch, as only that option needs them
     if args.morse:
-        input_morse = args.morse
+        if args.format != 'text':
+            parser.error(f'--format {args.format} requires --input')
+        input_chunks = [args.morse]
+    elif args.input and args.format == 'packed':
+        from morse_packed import read_packed_chunks
+        input_chunks = read_packed_chunks(args.input)
+    elif args.input and args.format == 'timing':
+        from morse_timing import iter_timing_morse, parse_timing
+        input_chunks = iter_timing_morse(parse_timing(read_chunks_from_file(args.input)),
+                                         args.wpm, args.farnsworth, args.unit)
     elif args.input:
-        try:
-            input_morse = read_from_file(args.input)
-        except (FileNotFoundError, IOError) as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return 1
+        input_chunks = read_chunks_from_file(args.input)
+    elif args.wav:
+        from morse_audio import iter_wav_morse
+        input_chunks = iter_wav_morse(args.wav, args.tone)
     else:
         parser.print_help()
         return 0
     
-    # Decode Morse code to text
+    if recorder is not None:
+        input_chunks = recorder.wrap('read', input_chunks)
+    
+    # Decode Morse code to text and output it as it is produced, so that
+    # memory use does not depend on the size of the input
     try:
-        decoded_text = decode_from_morse(input_morse)
-    except ValueError as e:
+        if args.check:
+            from morse_check import iter_morse_problems, report_problems
+            return report_problems(iter_morse_problems(input_chunks, args.table, args.lines), args.max_errors or None)
+        elif args.gapless:
+            # The whole message is needed to rank the candidates
+            text_chunks = _iter_segmented(input_chunks, args.words, args.candidates, args.table)
+        elif args.recover:
+            from morse_recover import iter_decode_recovering
+            text_chunks = _report_corrections(iter_decode_recovering(
+                input_chunks, args.strategy, args.placeholder, table=args.table), recorder)
+        elif args.input and args.jobs and args.jobs > 1:
+            text_chunks = parallel_decode(input_chunks, jobs=args.jobs, table=args.table)
+        else:
+            cache = WordCache(args.cache_size, args.table) if args.cache_size else None
+            text_chunks = iter_decode(input_chunks, cache=cache, table=args.table)
+        if recorder is not None:
+            text_chunks = recorder.wrap('decode', text_chunks, consumer='write')
+        if args.output and args.output != '-':
+            write_chunks_to_file(args.output, text_chunks)
+        else:
+            write_chunks_into(sys.stdout, text_chunks)
+            sys.stdout.write('\n')
+    except (IOError, ValueError) as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
-    
-    # Output decoded text
-    if args.output:
-        try:
-            write_to_file(args.output, decoded_text)
-        except IOError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return 1
-    else:
-        print(decoded_text)
+    finally:
+        if recorder is not None:
+            print(recorder.report(), file=sys.stderr)
     
     return 0
 
@@ -3,101 +3,376 @@
 Morse Code Encoder - Converts English text to Morse code
 """
 
-import argparse
 import sys
-from morse_utils import CHAR_TO_MORSE, validate_english_text, read_from_file, write_to_file
+from functools import partial
+from morse_batch import PARALLEL_BLOCK_SIZE, pool_starmap, run_batch
+from morse_cache import WordCache
+from morse_tables import get_table, table_names
+from morse_utils import CHUNK_SIZE, read_chunks_from_file, write_chunks_into, write_chunks_to_file
 
-def encode_to_morse(text, skip_unknown=False):
+def _prepare_text(text, skip_unknown, table):
+    """
+    Upper-cases text and checks that it can be encoded.
+    
+    Args:
+        text (str): Text to be prepared
+        skip_unknown (bool): If True, runs of unknown characters become spaces instead of raising an error
+        table (CodeTable): Code table to encode with
+        
+    Returns:
+        str: Upper-cased text containing only supported characters and spaces
+    """
+    text = text.upper()
+    char = table.find_unsupported_char(text)
+    if char is not None:
+        if not skip_unknown:
+            raise ValueError(f"Character '{char}' cannot be converted to Morse code")
+        # Any run of unsupported characters (whitespace included) splits words,
+        # which is what turns Hello©World into two words
+        text = table.replace_unknown(text)
+    return text
+
+def _encode_prepared(text, table):
+    """
+    Converts text returned by _prepare_text to Morse code.
+    
+    Args:
+        text (str): Prepared text
+        table (CodeTable): Code table to encode with
+        
+    Returns:
+        str: Morse code representation
+    """
+    # Collapse spaces so that each remaining space is exactly one word boundary
+    if '  ' in text or text[:1] == ' ' or text[-1:] == ' ':
+        text = ' '.join(text.split())
+    
+    return ' '.join(map(table.encode_lookup.__getitem__, table.tokens(text)))
+
+def encode_to_morse(text, skip_unknown=False, cache=None, table=None):
     """
     Converts English text to Morse code.
     
     Args:
         text (str): Text to be encoded
         skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        cache (WordCache): Optional cache of word translations to reuse, built for the same table
+        table: Name of a code table, or a CodeTable (default: Latin)
         
     Returns:
         str: Morse code representation
     """
-    if not skip_unknown:
-        valid, error_msg = validate_english_text(text)
-        if not valid:
-            raise ValueError(error_msg)
-    
-    words = text.upper().split()
-    morse_words = []
-    
-    for word in words:
-        # Special handling for Hello©World case - split on invalid chars
-        if skip_unknown:
-            # Temporarily mark positions of invalid chars
-            marked_word = ""
-            for char in word:
-                if char in CHAR_TO_MORSE:
-                    marked_word += char
-                else:
-                    marked_word += " "
-            
-            # Remove duplicate spaces that might be created
-            while "  " in marked_word:
-                marked_word = marked_word.replace("  ", " ")
-            
-            # Now treat as separate sub-words
-            sub_words = marked_word.split()
-        else:
-            sub_words = [word]
+    if not skip_unknown and not text:
+        raise ValueError("Input text is empty")
+    
+    return _encode_block(text, skip_unknown, cache, get_table(table))
+
+def encode_into(text, writer, skip_unknown=False, cache=None, table=None, encoding=None):
+    """
+    Converts English text to Morse code written straight to a writer.
+    
+    The text is encoded CHUNK_SIZE characters at a time and each piece of
+    Morse code is written as soon as it is produced, so the whole Morse code
+    is never built in memory. What is written is the same as what
+    encode_to_morse returns.
+    
+    Args:
+        text (str): Text to be encoded
+        writer: bytearray to append to, binary file object such as an
+            io.BufferedWriter, or text file object
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        cache (WordCache): Optional cache of word translations to reuse, built for the same table
+        table: Name of a code table, or a CodeTable (default: Latin)
+        encoding (str): Text encoding for a bytearray or binary file, defaults to the one used by open()
+        
+    Returns:
+        int: Number of characters of Morse code written
+        
+    Raises:
+        ValueError: As encode_to_morse does; the Morse code of the text before
+            the error has already been written
+    """
+    chunks = (text[start:start + CHUNK_SIZE] for start in range(0, len(text), CHUNK_SIZE))
+    return write_chunks_into(writer, iter_encode(chunks, skip_unknown, cache, table), encoding)
+
+def _encode_block(text, skip_unknown, cache=None, table=None):
+    """
+    Converts a block of text that starts and ends at word boundaries.
+    
+    Args:
+        text (str): Block of text to be encoded
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        cache (WordCache): Optional cache of word translations to reuse
+        table (CodeTable): Code table to encode with, None for the default one
+        
+    Returns:
+        str: Morse code representation, empty if the block contains no words
+        
+    Raises:
+        ValueError: If a character cannot be encoded, or the cache was built for another table
+    """
+    table = get_table(table)
+    if cache is not None:
+        cache.check_table(table)
+        try:
+            if skip_unknown:
+                return ' / '.join(filter(None, map(cache.encode_word_skipping, text.split())))
+            return ' / '.join(map(cache.encode_word, filter(None, text.split(' '))))
+        except KeyError:
+            # Fall through so that the error names the offending character
+            pass
+    
+    return _encode_prepared(_prepare_text(text, skip_unknown, table), table)
+
+def _iter_blocks(chunks, block_size, skip_unknown):
+    """
+    Regroups chunks of text into blocks that end at whitespace.
+    
+    Args:
+        chunks (iterable of str): Text to be encoded, in pieces of any size
+        block_size (int): Minimum number of characters gathered before a block is cut
+        skip_unknown (bool): Passed through for each block
+        
+    Yields:
+        tuple: (text, skip_unknown) arguments for _encode_block
+    """
+    is_empty = True
+    pending = []  # Pieces of input not handed out yet
+    pending_size = 0
+    
+    for chunk in chunks:
+        if not chunk:
+            continue
+        is_empty = False
+        
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < block_size:
+            continue
         
-        for sub_word in sub_words:
-            morse_letters = []
-            for char in sub_word:
-                if char in CHAR_TO_MORSE:
-                    morse_letters.append(CHAR_TO_MORSE[char])
-            
-            if morse_letters:  # Only add if there's at least one valid letter
-                morse_words.append(' '.join(morse_letters))
-    
-    return ' / '.join(morse_words)
+        boundary = max(chunk.rfind(' '), chunk.rfind('\n'))
+        if boundary < 0:
+            continue
+        
+        pending[-1] = chunk[:boundary + 1]
+        yield ''.join(pending), skip_unknown
+        pending = [chunk[boundary + 1:]]
+        pending_size = len(pending[0])
+    
+    if is_empty and not skip_unknown:
+        raise ValueError("Input text is empty")
+    
+    yield ''.join(pending), skip_unknown
+
+def _join_words(morse_blocks):
+    """Joins the Morse code of consecutive blocks with word separators, skipping empty blocks"""
+    separator = ''
+    for morse_code in morse_blocks:
+        if morse_code:
+            yield separator + morse_code
+            separator = ' / '
+
+def iter_encode(chunks, skip_unknown=False, cache=None, table=None):
+    """
+    Converts English text to Morse code incrementally.
+    
+    Words split across chunk boundaries are handled, so joining the output gives
+    the same result as encode_to_morse on the joined input. Only the current
+    chunk and the word still being read are held in memory.
+    
+    Args:
+        chunks (iterable of str): Text to be encoded, in pieces of any size
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        cache (WordCache): Optional cache of word translations to reuse, built for the same table
+        table: Name of a code table, or a CodeTable (default: Latin)
+        
+    Yields:
+        str: Consecutive pieces of the Morse code representation
+    """
+    table = get_table(table)
+    blocks = _iter_blocks(chunks, 0, skip_unknown)
+    yield from _join_words(_encode_block(*args, cache=cache, table=table) for args in blocks)
+
+def parallel_encode(chunks, skip_unknown=False, jobs=None, block_size=PARALLEL_BLOCK_SIZE, table=None):
+    """
+    Converts English text to Morse code on several cores.
+    
+    The input is cut at whitespace into blocks of about block_size characters,
+    which are encoded in a pool of processes and reassembled in order. The
+    output and errors are the same as those of iter_encode.
+    
+    Args:
+        chunks (iterable of str): Text to be encoded, in pieces of any size
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        jobs (int): Number of worker processes, defaults to the number of CPUs
+        block_size (int): Approximate number of characters per block
+        table: Name of a code table, or a CodeTable (default: Latin)
+        
+    Yields:
+        str: Consecutive pieces of the Morse code representation
+    """
+    table = get_table(table)
+    blocks = (args + (None, table) for args in _iter_blocks(chunks, block_size, skip_unknown))
+    yield from _join_words(pool_starmap(_encode_block, blocks, jobs))
+
+def _is_single_message(argv):
+    """Whether the command line is nothing but one message to translate, as argparse would read it"""
+    return len(argv) == 1 and argv[0] != '' and (argv[0][0] != '-' or ' ' in argv[0])
 
 def main():
     """Main function for CLI operation"""
+    argv = sys.argv[1:]
+    if _is_single_message(argv):
+        # The most common use by far: skip building the option parser, which
+        # takes longer than translating a short message
+        try:
+            print(encode_to_morse(argv[0]))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+    
+    # Imported here, so that the common case above does not pay for it
+    import argparse
+    from morse_audio import DEFAULT_SAMPLE_RATE, DEFAULT_TONE, DEFAULT_WPM
+    from morse_check import DEFAULT_MAX_ERRORS
+    from morse_timing import UNITS
+    
     parser = argparse.ArgumentParser(description='Convert English text to Morse code')
     
     parser.add_argument('text', nargs='?', help='Text to encode to Morse code')
-    parser.add_argument('--input', '-i', help='Input file containing text to encode')
-    parser.add_argument('--output', '-o', help='Output file to write Morse code to')
+    parser.add_argument('--input', '-i', help='Input file containing text to encode ("-" for stdin)')
+    parser.add_argument('--output', '-o', help='Output file to write Morse code to ("-" for stdout)')
+    parser.add_argument('--batch', metavar='DIR',
+                       help='Translate every file in DIR, writing results to --out-dir')
+    parser.add_argument('--out-dir', metavar='DIR', help='Output directory for --batch')
+    parser.add_argument('--jobs', '-j', type=int,
+                       help='Number of worker processes for --batch (default: number of CPUs), '
+                            'or for translating a single --input file in parallel')
+    parser.add_argument('--cache-size', type=int, metavar='N',
+                       help='Reuse the translations of up to N distinct words, for repetitive input')
     parser.add_argument('--skip-unknown', '-s', action='store_true', 
                        help='Skip characters that cannot be converted to Morse code')
+    parser.add_argument('--table', choices=table_names(), default='latin',
+                       help='Code table to translate with (default: %(default)s)')
+    parser.add_argument('--format', choices=['text', 'packed', 'timing'], default='text',
+                       help='Output format: Morse code text, the packed binary format with two bits '
+                            'per symbol, or keying durations, positive for key-down and negative for '
+                            'key-up (default: %(default)s)')
+    parser.add_argument('--wav', metavar='FILE', help='Render the Morse code as audio to a WAV file')
+    parser.add_argument('--wpm', type=float, default=DEFAULT_WPM,
+                       help='Character speed in words per minute for --wav and --format timing '
+                            '(default: %(default)s)')
+    parser.add_argument('--farnsworth', type=float, metavar='WPM',
+                       help='Slower overall speed for --wav and --format timing, stretching the gaps '
+                            'between letters and words')
+    parser.add_argument('--unit', choices=UNITS, default='ms',
+                       help='Unit of the durations of --format timing: milliseconds, or dots '
+                            '(default: %(default)s)')
+    parser.add_argument('--tone', type=float, default=DEFAULT_TONE,
+                       help='Tone frequency in Hz for --wav (default: %(default)s)')
+    parser.add_argument('--sample-rate', type=int, default=DEFAULT_SAMPLE_RATE,
+                       help='Sample rate in Hz for --wav (default: %(default)s)')
+    parser.add_argument('--check', action='store_true',
+                       help='Only check the input, printing every invalid character with its line and column')
+    parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, metavar='N',
+                       help='Number of problems --check reports before stopping, 0 for all (default: %(default)s)')
+    parser.add_argument('--lines', action='store_true',
+                       help='With --check, treat line breaks as gaps instead of reporting them')
+    parser.add_argument('--stats', action='store_true',
+                       help='Report the time and volume of each stage, unknown characters and peak memory on stderr')
+    parser.add_argument('--profile', metavar='FILE',
+                       help='Write a cProfile profile of the run to FILE, to read with "python -m pstats FILE"')
     
     args = parser.parse_args()
     
+    if args.stats and args.batch:
+        parser.error('--stats cannot be used with --batch')
+    
+    if args.profile:
+        from morse_stats import run_profiled
+        return run_profiled(args.profile, _run, parser, args)
+    return _run(parser, args)
+
+def _run(parser, args):
+    """
+    Runs the command line once its arguments are parsed.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser of the arguments, to report usage errors
+        args (argparse.Namespace): Parsed arguments
+        
+    Returns:
+        int: Exit status
+    """
+    if args.batch:
+        if not args.out_dir:
+            parser.error('--batch requires --out-dir')
+        translate = partial(iter_encode, skip_unknown=args.skip_unknown, table=args.table)
+        return run_batch(translate, args.batch, args.out_dir, args.jobs)
+    
+    recorder = None
+    if args.stats:
+        # Imported here, as it is only needed when instrumenting
+        from morse_stats import Recorder
+        recorder = Recorder()
+    
     # Get input text
     if args.text:
-        input_text = args.text
+        input_chunks = [args.text]
     elif args.input:
-        try:
-            input_text = read_from_file(args.input)
-        except (FileNotFoundError, IOError) as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return 1
+        input_chunks = read_chunks_from_file(args.input)
     else:
         parser.print_help()
         return 0
     
-    # Encode text to Morse code
+    if recorder is not None:
+        # Unknown characters are only skipped, rather than an error, with --skip-unknown
+        table = get_table(args.table)
+        unknown = (lambda chunk: table.count_unsupported_chars(chunk.upper())) if args.skip_unknown else None
+        input_chunks = recorder.wrap('read', input_chunks, unknown=unknown)
+    
+    # Encode text to Morse code and output it as it is produced, so that
+    # memory use does not depend on the size of the input
     try:
-        morse_code = encode_to_morse(input_text, skip_unknown=args.skip_unknown)
-    except ValueError as e:
+        # The modules of each option are imported in its branch, as only that
+        # option needs them
+        if args.check:
+            from morse_check import iter_text_problems, report_problems
+            return report_problems(iter_text_problems(input_chunks, args.table, args.lines), args.max_errors or None)
+        elif args.input and args.jobs and args.jobs > 1:
+            morse_chunks = parallel_encode(input_chunks, skip_unknown=args.skip_unknown, jobs=args.jobs,
+                                          table=args.table)
+        else:
+            cache = WordCache(args.cache_size, args.table) if args.cache_size else None
+            morse_chunks = iter_encode(input_chunks, skip_unknown=args.skip_unknown, cache=cache, table=args.table)
+        if recorder is not None:
+            morse_chunks = recorder.wrap('encode', morse_chunks, consumer='write')
+        if args.wav:
+            from morse_audio import write_wav
+            write_wav(args.wav, morse_chunks, args.wpm, args.farnsworth, args.tone, args.sample_rate)
+        elif args.format == 'packed':
+            from morse_packed import write_packed
+            write_packed(args.output or '-', morse_chunks)
+        elif args.format == 'timing':
+            from morse_timing import format_timing, iter_timing
+            timing_chunks = format_timing(iter_timing(morse_chunks, args.wpm, args.farnsworth, args.unit))
+            if args.output and args.output != '-':
+                write_chunks_to_file(args.output, timing_chunks)
+            else:
+                write_chunks_into(sys.stdout, timing_chunks)
+                sys.stdout.write('\n')
+        elif args.output and args.output != '-':
+            write_chunks_to_file(args.output, morse_chunks)
+        else:
+            write_chunks_into(sys.stdout, morse_chunks)
+            sys.stdout.write('\n')
+    except (IOError, ValueError) as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
-    
-    # Output Morse code
-    if args.output:
-        try:
-            write_to_file(args.output, morse_code)
-        except IOError as e:
-            print(f"Error: {e}", file=sys.stderr)
-            return 1
-    else:
-        print(morse_code)
+    finally:
+        if recorder is not None:
+            print(recorder.report(), file=sys.stderr)
     
     return 0
 
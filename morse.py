@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Morse Code Tool - Entry point for commands that are not a single translation
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+from morse_cache import DEFAULT_CACHE_SIZE
+from morse_server import (
+    DEFAULT_MAX_PENDING, DEFAULT_MAX_REQUEST_SIZE, DEFAULT_OFFLOAD_SIZE, DEFAULT_PORT,
+    AsyncMorseServer, make_server
+)
+
+async def _serve_async(args):
+    """Runs the asyncio translation server until SIGINT or SIGTERM"""
+    server = AsyncMorseServer(args.socket, args.host, args.port, args.cache_size,
+                              max_request_size=args.max_request_size, offload_size=args.offload_size,
+                              max_pending=args.max_pending, workers=args.workers)
+    try:
+        await server.start()
+    except OSError as e:
+        print(f"Error: cannot listen: {e}", file=sys.stderr)
+        return 1
+    
+    address = args.socket or "%s:%d" % server.address
+    print(f"Listening on {address}", file=sys.stderr, flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+    await server.shutdown()
+    return 0
+
+def serve(args):
+    """Runs the translation server until interrupted"""
+    if args.use_async:
+        return asyncio.run(_serve_async(args))
+    
+    try:
+        server = make_server(args.socket, args.host, args.port, args.cache_size)
+    except OSError as e:
+        print(f"Error: cannot listen: {e}", file=sys.stderr)
+        return 1
+    
+    with server:
+        address = args.socket or "%s:%d" % server.server_address[:2]
+        print(f"Listening on {address}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+def main():
+    """Main function for CLI operation"""
+    parser = argparse.ArgumentParser(prog='morse', description='Morse code tools')
+    commands = parser.add_subparsers(dest='command')
+    
+    serve_parser = commands.add_parser('serve', help='Run a translation server (line-delimited JSON)')
+    serve_parser.add_argument('--socket', metavar='PATH', help='Listen on a Unix domain socket at PATH')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on for TCP (default: %(default)s)')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                             help='Port to listen on for TCP (default: %(default)s)')
+    serve_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, metavar='N',
+                             help='Number of word translations kept in memory, 0 to disable (default: %(default)s)')
+    serve_parser.add_argument('--async', dest='use_async', action='store_true',
+                             help='Use the asyncio server, for many concurrent connections')
+    serve_parser.add_argument('--max-request-size', type=int, default=DEFAULT_MAX_REQUEST_SIZE, metavar='BYTES',
+                             help='Longest request accepted by --async (default: %(default)s)')
+    serve_parser.add_argument('--offload-size', type=int, default=DEFAULT_OFFLOAD_SIZE, metavar='BYTES',
+                             help='Requests longer than this run in worker processes with --async '
+                                  '(default: %(default)s)')
+    serve_parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING, metavar='N',
+                             help='Requests queued per connection before reading pauses with --async '
+                                  '(default: %(default)s)')
+    serve_parser.add_argument('--workers', type=int, metavar='N',
+                             help='Number of worker processes for --async (default: number of CPUs)')
+    serve_parser.set_defaults(func=serve)
+    
+    args = parser.parse_args()
+    
+    if not args.command:
+        parser.print_help()
+        return 0
+    
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
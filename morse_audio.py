@@ -0,0 +1,452 @@
+"""
+Renders Morse code as audio in WAV files, and reads it back.
+
+Timing follows the PARIS standard: at W words per minute a dot lasts
+1.2 / W seconds, a dash three dots, and the gaps inside a letter, between
+letters and between words one, three and seven dots. With Farnsworth timing
+the letters keep their speed but the gaps between letters and words are
+stretched so that the overall speed is the slower Farnsworth rate.
+
+One sample buffer is computed per Morse symbol when rendering starts, so
+writing the audio is only a matter of copying those buffers to the file, a
+bounded batch of them at a time.
+
+Reading splits the audio into short windows and measures the strength of the
+tone in each with a single-frequency DFT, the block form of a Goertzel filter.
+The resulting runs of tone and silence are classified as dots, dashes and gaps
+against timing estimates that follow the sender's speed.
+"""
+
+import math
+import sys
+from array import array
+from itertools import chain, islice
+from operator import mul
+
+from morse_utils import open_replacing
+
+DEFAULT_WPM = 20
+DEFAULT_TONE = 600
+DEFAULT_SAMPLE_RATE = 44100
+
+# Peak amplitude of the tone, as a fraction of full scale
+_AMPLITUDE = 0.8
+
+# Length of the fade in and out of each tone, which avoids audible clicks
+_RAMP_SECONDS = 0.005
+
+# Units of PARIS, the standard word, spent inside letters and between them
+_PARIS_LETTER_UNITS = 31
+_PARIS_GAP_UNITS = 19
+
+# Bytes of audio gathered before they are written, which bounds the memory
+# used by rendering whatever the size of the chunks of Morse code
+_WRITE_BYTES = 1 << 20
+
+
+def element_durations(wpm=DEFAULT_WPM, farnsworth_wpm=None):
+    """
+    Computes the length of a dot and of the gaps between letters and words.
+
+    Args:
+        wpm (int): Speed at which letters are sent, in words per minute
+        farnsworth_wpm (int): Slower overall speed to stretch the gaps to, if any
+
+    Returns:
+        tuple: (dot, letter_gap, word_gap) in seconds
+
+    Raises:
+        ValueError: If a speed is not positive, or the Farnsworth speed exceeds wpm
+    """
+    if wpm <= 0:
+        raise ValueError("Speed must be a positive number of words per minute")
+    dot = 1.2 / wpm
+    if farnsworth_wpm is None or farnsworth_wpm == wpm:
+        return dot, 3 * dot, 7 * dot
+    if not 0 < farnsworth_wpm < wpm:
+        raise ValueError("Farnsworth speed must be positive and lower than the character speed")
+    gap_unit = (60 / farnsworth_wpm - _PARIS_LETTER_UNITS * dot) / _PARIS_GAP_UNITS
+    return dot, 3 * gap_unit, 7 * gap_unit
+
+
+def _tone(seconds, tone, sample_rate):
+    """Generates a sine tone with raised-cosine ramps as 16-bit samples"""
+    count = round(seconds * sample_rate)
+    ramp = min(round(_RAMP_SECONDS * sample_rate), count // 2)
+    step = 2 * math.pi * tone / sample_rate
+    peak = _AMPLITUDE * 32767
+    samples = array("h", (round(peak * math.sin(step * i)) for i in range(count)))
+    for i in range(ramp):
+        gain = 0.5 - 0.5 * math.cos(math.pi * i / ramp)
+        samples[i] = round(samples[i] * gain)
+        samples[count - 1 - i] = round(samples[count - 1 - i] * gain)
+    return samples
+
+
+def _silence(seconds, sample_rate):
+    """Generates silence as 16-bit samples"""
+    return array("h", bytes(2 * round(seconds * sample_rate)))
+
+
+def build_symbol_buffers(wpm=DEFAULT_WPM, farnsworth_wpm=None, tone=DEFAULT_TONE,
+                         sample_rate=DEFAULT_SAMPLE_RATE):
+    """
+    Builds the audio of each symbol of encoder output.
+
+    Every dot and dash is followed by the gap inside a letter. A space adds
+    what is missing for a gap between letters, and a word separator, which
+    the encoder writes as " / ", what is missing for a gap between words.
+
+    Args:
+        wpm (int): Speed at which letters are sent, in words per minute
+        farnsworth_wpm (int): Slower overall speed to stretch the gaps to, if any
+        tone (float): Frequency of the tone in Hz
+        sample_rate (int): Samples per second
+
+    Returns:
+        dict: Symbol mapped to 16-bit little-endian mono samples as bytes
+    """
+    if not 0 < tone < sample_rate / 2:
+        raise ValueError("Tone frequency must be positive and below half the sample rate")
+    dot, letter_gap, word_gap = element_durations(wpm, farnsworth_wpm)
+    buffers = {
+        ".": _tone(dot, tone, sample_rate) + _silence(dot, sample_rate),
+        "-": _tone(3 * dot, tone, sample_rate) + _silence(dot, sample_rate),
+        " ": _silence(letter_gap - dot, sample_rate),
+        "/": _silence(word_gap - 2 * letter_gap + dot, sample_rate),
+    }
+    if sys.byteorder == "big":
+        for samples in buffers.values():
+            samples.byteswap()
+    return {symbol: samples.tobytes() for symbol, samples in buffers.items()}
+
+
+def write_wav(file_path, morse_chunks, wpm=DEFAULT_WPM, farnsworth_wpm=None, tone=DEFAULT_TONE,
+              sample_rate=DEFAULT_SAMPLE_RATE):
+    """
+    Renders Morse code to a WAV file, one chunk at a time.
+
+    As with write_chunks_to_file, the audio is written through
+    morse_utils.open_replacing, so the target is only replaced once every
+    chunk has been rendered.
+
+    Args:
+        file_path (str): Path to the output WAV file
+        morse_chunks (iterable of str): Morse code as written by the encoder
+        wpm (int): Speed at which letters are sent, in words per minute
+        farnsworth_wpm (int): Slower overall speed to stretch the gaps to, if any
+        tone (float): Frequency of the tone in Hz
+        sample_rate (int): Samples per second
+
+    Returns:
+        float: Length of the audio in seconds
+
+    Raises:
+        IOError: If there's an error writing to the file
+        ValueError: If the timing is invalid, or from the chunks themselves
+    """
+    # Imported here, so that the command-line tools only load it for --wav
+    import wave
+
+    buffers = build_symbol_buffers(wpm, farnsworth_wpm, tone, sample_rate)
+    render = buffers.__getitem__
+    with open_replacing(file_path) as f, wave.open(f, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        pending = []  # Symbol buffers not written yet
+        pending_size = 0
+        for chunk in morse_chunks:
+            for samples in map(render, chunk):
+                pending.append(samples)
+                pending_size += len(samples)
+                if pending_size >= _WRITE_BYTES:
+                    wav.writeframesraw(b"".join(pending))
+                    pending = []
+                    pending_size = 0
+        wav.writeframesraw(b"".join(pending))
+        frames = wav.getnframes()
+    return frames / sample_rate
+
+
+# Length of the analysis windows, in seconds; a dot at 40 WPM spans six
+_WINDOW_SECONDS = 0.005
+
+# Frames read from the WAV file at a time
+_BLOCK_FRAMES = 1 << 16
+
+# Range and step of the frequencies tried when the tone is not given, in Hz
+_TONE_SEARCH = range(200, 2001, 10)
+
+# Longest stretch of tone used to find its frequency, in seconds
+_TONE_SEARCH_SECONDS = 0.05
+
+# Weight of each window in the running average levels of tone and silence
+_LEVEL_ADAPT_RATE = 0.02
+
+# Number of consecutive windows needed to switch between tone and silence
+_DEBOUNCE_WINDOWS = 2
+
+# Number of marks gathered before the first estimate of the dot length
+_WARMUP_MARKS = 16
+
+# Weight of each new run in the running estimates of the dot and letter gap,
+# so that the decoder follows a sender who speeds up or slows down
+_ADAPT_RATE = 0.1
+
+
+def _read_samples(wav, block_frames):
+    """
+    Reads a WAV file as blocks of signed samples of its first channel.
+
+    Args:
+        wav (wave.Wave_read): Open WAV file
+        block_frames (int): Frames read at a time
+
+    Yields:
+        array: Samples of one block
+    """
+    width = wav.getsampwidth()
+    channels = wav.getnchannels()
+    if width not in (1, 2):
+        raise ValueError(f"Unsupported WAV sample width: {8 * width} bits")
+    while True:
+        data = wav.readframes(block_frames)
+        if not data:
+            return
+        if width == 1:
+            # 8-bit WAV samples are unsigned
+            samples = array("h", (byte - 128 for byte in data))
+        else:
+            samples = array("h", data)
+            if sys.byteorder == "big":
+                samples.byteswap()
+        yield samples[::channels] if channels > 1 else samples
+
+
+def _tone_tables(tone, sample_rate, length):
+    """Builds the cosine and sine tables of a single-frequency DFT over one window"""
+    step = 2 * math.pi * tone / sample_rate
+    return ([math.cos(step * i) for i in range(length)],
+            [math.sin(step * i) for i in range(length)])
+
+
+def _tone_power(window, tables):
+    """Measures the power of the tone in one window of samples"""
+    cos_table, sin_table = tables
+    real = sum(map(mul, window, cos_table))
+    imag = sum(map(mul, window, sin_table))
+    return real * real + imag * imag
+
+
+def _find_tone(windows, sample_rate):
+    """
+    Finds the frequency of the tone in the loudest stretch of some windows.
+
+    Args:
+        windows (list of array): Consecutive windows of samples
+        sample_rate (int): Samples per second
+
+    Returns:
+        float: The frequency in Hz, or None if the windows are silent
+    """
+    energies = [sum(map(mul, window, window)) for window in windows]
+    loudest = max(energies, default=0)
+    if not loudest:
+        return None
+
+    # Take the longest run of loud windows, up to _TONE_SEARCH_SECONDS of it
+    best_start, best_length, start = 0, 0, None
+    for index, energy in enumerate(energies + [0]):
+        if energy > loudest / 4:
+            start = index if start is None else start
+        elif start is not None:
+            if index - start > best_length:
+                best_start, best_length = start, index - start
+            start = None
+    limit = max(1, round(_TONE_SEARCH_SECONDS * sample_rate / len(windows[0])))
+    segment = array("h")
+    for window in windows[best_start:best_start + min(best_length, limit)]:
+        segment.extend(window)
+
+    return max(_TONE_SEARCH, key=lambda tone: _tone_power(segment, _tone_tables(tone, sample_rate, len(segment))))
+
+
+def _iter_windows(blocks, length):
+    """Regroups blocks of samples into windows of a fixed length, dropping the last partial one"""
+    pending = array("h")
+    for block in blocks:
+        pending.extend(block)
+        end = len(pending) - len(pending) % length
+        for start in range(0, end, length):
+            yield pending[start:start + length]
+        del pending[:end]
+
+
+def _iter_key_runs(windows, sample_rate, tone=None):
+    """
+    Turns windows of samples into runs of tone and silence.
+
+    A window holds tone when its tone power, on a logarithmic scale, is
+    above the midpoint between the average levels of tone and of silence.
+    Both averages follow the signal, so fading and changes in the noise are
+    tracked.
+
+    Args:
+        windows (iterable of array): Consecutive windows of samples
+        sample_rate (int): Samples per second
+        tone (float): Frequency of the tone in Hz, found from the audio if None
+
+    Yields:
+        tuple: (is_tone, number of windows) for each run, starting with tone
+    """
+    # Leading silence carries no information; the second of audio after it
+    # is used to find the tone and the levels of tone and silence
+    windows = iter(windows)
+    for window in windows:
+        if any(window):
+            break
+    else:
+        return
+    head = [window] + list(islice(windows, round(1 / _WINDOW_SECONDS)))
+    if tone is None:
+        tone = _find_tone(head, sample_rate)
+    tables = _tone_tables(tone, sample_rate, len(window))
+
+    def level_of(window):
+        return math.log10(_tone_power(window, tables) + 1)
+
+    # Start from the two clusters of levels in the head
+    levels = list(map(level_of, head))
+    floor, peak = min(levels), max(levels)
+    for _ in range(8):
+        threshold = (floor + peak) / 2
+        quiet = [level for level in levels if level <= threshold]
+        loud = [level for level in levels if level > threshold]
+        floor = sum(quiet) / len(quiet) if quiet else floor
+        peak = sum(loud) / len(loud) if loud else peak
+
+    is_tone = started = False
+    length = 0
+    flips = 0  # Consecutive windows that disagree with is_tone
+    for level in chain(levels, map(level_of, windows)):
+        # Require a clear margin over silence, so that noise alone is never tone
+        on = peak - floor > 1 and level > (floor + peak) / 2
+        if on:
+            peak += _LEVEL_ADAPT_RATE * (level - peak)
+        else:
+            floor += _LEVEL_ADAPT_RATE * (level - floor)
+        if on == is_tone:
+            # A change shorter than _DEBOUNCE_WINDOWS is noise
+            length += flips + 1
+            flips = 0
+            continue
+        flips += 1
+        if flips == _DEBOUNCE_WINDOWS:
+            # Silence before the first tone is not a gap
+            if started:
+                yield is_tone, length
+            started = True
+            is_tone, length, flips = on, flips, 0
+    # Nor is silence after the last tone
+    if is_tone:
+        yield True, length
+
+
+def _iter_symbols(runs):
+    """
+    Classifies runs of tone and silence as Morse code symbols.
+
+    The first runs are held back until _WARMUP_MARKS tones have been seen, to
+    estimate the dot from the shortest runs and the letter gap from the
+    shortest silence longer than two dots. Both estimates then follow the
+    runs as they are classified. Measuring the letter gap separately is what
+    copes with Farnsworth timing, where gaps are stretched but dots are not.
+
+    Args:
+        runs (iterable of tuple): (is_tone, length) runs from _iter_key_runs
+
+    Yields:
+        str: ".", "-", " " between letters and " / " between words
+    """
+    runs = iter(runs)
+    warmup = []
+    marks = 0
+    for run in runs:
+        warmup.append(run)
+        marks += run[0]
+        if marks >= _WARMUP_MARKS:
+            break
+    if not warmup:
+        return
+
+    lengths = [length for _, length in warmup]
+    shortest = min(lengths)
+    short = [length for length in lengths if length <= 2 * shortest]
+    dot = sum(short) / len(short)
+    long_gaps = [length for is_tone, length in warmup if not is_tone and length > 2 * dot]
+    letter_gap = min(long_gaps, default=3 * dot)
+
+    for is_tone, length in chain(warmup, runs):
+        if is_tone:
+            if length > 2 * dot:
+                yield "-"
+                dot += _ADAPT_RATE * (length / 3 - dot)
+            else:
+                yield "."
+                dot += _ADAPT_RATE * (length - dot)
+        elif length <= 2 * dot:
+            # Gap between the dots and dashes of one letter
+            dot += _ADAPT_RATE * (length - dot)
+        elif length < letter_gap * 5 / 3:
+            # Halfway between a letter gap and a word gap, which is 7 / 3 as long
+            yield " "
+            letter_gap += _ADAPT_RATE * (length - letter_gap)
+        else:
+            yield " / "
+            letter_gap += _ADAPT_RATE * (length * 3 / 7 - letter_gap)
+
+
+def iter_wav_morse(file_path, tone=None, block_frames=_BLOCK_FRAMES):
+    """
+    Reads Morse code from a recording of a tone, one chunk at a time.
+
+    The file is read in blocks, and only the current block and the runs held
+    back to estimate the speed are kept in memory.
+
+    Args:
+        file_path (str): Path to a 8 or 16-bit PCM WAV file
+        tone (float): Frequency of the tone in Hz, found from the audio if None
+        block_frames (int): Frames read from the file at a time
+
+    Yields:
+        str: Consecutive chunks of Morse code, as the encoder writes it
+
+    Raises:
+        FileNotFoundError: If the file is not found
+        IOError: If there's an error reading the file
+        ValueError: If the file is not a PCM WAV file
+    """
+    import wave
+
+    try:
+        wav = wave.open(file_path, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file not found: {file_path}")
+    except (wave.Error, EOFError):
+        raise ValueError(f"Not a PCM WAV file: {file_path}")
+    except IOError:
+        raise IOError(f"Error reading file: {file_path}")
+
+    with wav:
+        sample_rate = wav.getframerate()
+        window_length = max(1, round(_WINDOW_SECONDS * sample_rate))
+        windows = _iter_windows(_read_samples(wav, block_frames), window_length)
+        symbols = []
+        for symbol in _iter_symbols(_iter_key_runs(windows, sample_rate, tone)):
+            symbols.append(symbol)
+            if len(symbols) >= 4096:
+                yield "".join(symbols)
+                symbols = []
+        if symbols:
+            yield "".join(symbols)
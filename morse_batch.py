@@ -0,0 +1,147 @@
+"""
+Batch and parallel translation across a pool of processes.
+"""
+
+import os
+import sys
+from collections import deque
+
+from morse_utils import read_chunks_from_file, write_chunks_to_file
+
+# Number of input characters handed to a worker at a time when one large input
+# is translated in parallel
+PARALLEL_BLOCK_SIZE = 1 << 20
+
+
+def pool_starmap(func, iterable, jobs=None, backlog=2):
+    """
+    Applies a function to argument tuples in a pool of processes.
+
+    Unlike Executor.map, the input is consumed lazily: at most jobs * backlog
+    tasks are in flight at once, so a huge input is never held in memory.
+
+    Args:
+        func (callable): Picklable module-level function
+        iterable (iterable of tuple): Argument tuples for func
+        jobs (int): Number of worker processes, defaults to the number of CPUs
+        backlog (int): Number of tasks queued per worker
+
+    Yields:
+        Results of func, in input order. An exception raised by func is raised
+        here when its result is reached.
+    """
+    # Imported here, as multiprocessing would slow down the start of every command
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for args in iterable:
+                pending.append(executor.submit(func, *args))
+                if len(pending) >= jobs * backlog:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def translate_file(translate, input_path, output_path):
+    """
+    Translates one file into another, streaming its content.
+
+    Args:
+        translate (callable): Streaming translator such as encode.iter_encode
+        input_path (str): Path to the input file
+        output_path (str): Path to the output file
+
+    Returns:
+        tuple: (input_path, error_message), where error_message is None on success
+    """
+    try:
+        write_chunks_to_file(output_path, translate(read_chunks_from_file(input_path)))
+    except (IOError, ValueError) as e:
+        return input_path, str(e)
+    return input_path, None
+
+
+def _translate_file_task(task):
+    """Unpacks a (translate, input_path, output_path) task for the process pool"""
+    return translate_file(*task)
+
+
+def translate_directory(translate, input_dir, output_dir, jobs=None):
+    """
+    Translates every file in a directory into a file of the same name in another.
+
+    Files are handed out to a pool of worker processes, and a file that cannot
+    be read, written or translated is reported without stopping the others.
+    Subdirectories are not descended into.
+
+    Args:
+        translate (callable): Picklable streaming translator such as encode.iter_encode
+        input_dir (str): Directory containing the files to translate
+        output_dir (str): Directory to write the translated files to, created if needed
+        jobs (int): Number of worker processes, defaults to the number of CPUs;
+            1 translates in the current process
+
+    Yields:
+        tuple: (input_path, error_message) for each file, in file name order
+
+    Raises:
+        ValueError: If output_dir is input_dir, which would translate every file onto itself
+    """
+    if os.path.realpath(input_dir) == os.path.realpath(output_dir):
+        raise ValueError(f"Output directory is the input directory: {output_dir}")
+    names = sorted(
+        name for name in os.listdir(input_dir)
+        if os.path.isfile(os.path.join(input_dir, name))
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [
+        (translate, os.path.join(input_dir, name), os.path.join(output_dir, name))
+        for name in names
+    ]
+
+    if jobs == 1:
+        yield from map(_translate_file_task, tasks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Hand out files in batches so that tens of thousands of small files
+        # do not each pay for a round trip to a worker
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        yield from executor.map(_translate_file_task, tasks, chunksize=chunksize)
+
+
+def run_batch(translate, input_dir, output_dir, jobs=None):
+    """
+    Translates a directory for the command line, reporting errors per file.
+
+    Args:
+        translate (callable): Picklable streaming translator such as encode.iter_encode
+        input_dir (str): Directory containing the files to translate
+        output_dir (str): Directory to write the translated files to
+        jobs (int): Number of worker processes
+
+    Returns:
+        int: Exit code, 1 if any file failed and 0 otherwise
+    """
+    total = failed = 0
+    try:
+        for input_path, error_msg in translate_directory(translate, input_dir, output_dir, jobs):
+            total += 1
+            if error_msg is not None:
+                failed += 1
+                print(f"Error: {input_path}: {error_msg}", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Translated {total - failed} of {total} files", file=sys.stderr)
+    return 1 if failed else 0
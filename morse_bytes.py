@@ -0,0 +1,130 @@
+"""
+Bytes interface to the encoder and decoder.
+
+Accepts bytes, bytearray, memoryview and mmap buffers holding UTF-8 text and
+produces UTF-8 (ASCII for Morse code), either as bytes, into a caller-provided
+buffer, or straight to a file descriptor. The input is read through a
+memoryview one chunk at a time and the output written as it is produced, so
+neither is ever copied whole into a str.
+"""
+
+import io
+
+from decode import iter_decode
+from encode import iter_encode
+from morse_utils import iter_buffer_chunks, write_chunks_into, write_chunks_to_fd
+
+
+class _BufferWriter(io.RawIOBase):
+    """Raw writer filling a preallocated buffer from its start"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        end = self.position + len(data)
+        if end > len(self._view):
+            raise ValueError(f"Output buffer too small: more than {len(self._view)} bytes needed")
+        self._view[self.position:end] = data
+        self.position = end
+        return len(data)
+
+
+def _write_output(chunks, out):
+    """
+    Writes chunks of text as UTF-8 into a new bytes object or a writable buffer.
+
+    Args:
+        chunks (iterable of str): Text to write
+        out: Writable buffer, or None to return a new bytes object
+
+    Returns:
+        bytes or int: The bytes, or the number of bytes written to out
+
+    Raises:
+        ValueError: If out is too small, or from the chunks themselves
+    """
+    if out is None:
+        result = io.BytesIO()
+        write_chunks_into(result, chunks, encoding="utf-8")
+        return result.getvalue()
+
+    writer = _BufferWriter(out)
+    write_chunks_into(writer, chunks, encoding="utf-8")
+    return writer.position
+
+
+def encode_bytes(data, skip_unknown=False, out=None, table=None):
+    """
+    Converts UTF-8 encoded English text to Morse code.
+
+    Args:
+        data: bytes, bytearray, memoryview or mmap holding UTF-8 text
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        out: Optional writable buffer to write the Morse code into
+        table: Name of a code table, or a CodeTable (default: Latin)
+
+    Returns:
+        bytes or int: ASCII Morse code, or the number of bytes written to out
+
+    Raises:
+        ValueError: If the text cannot be encoded, or out is too small
+    """
+    chunks = iter_buffer_chunks(data, encoding="utf-8")
+    return _write_output(iter_encode(chunks, skip_unknown=skip_unknown, table=table), out)
+
+
+def decode_bytes(data, out=None, table=None):
+    """
+    Converts ASCII Morse code to English text.
+
+    Args:
+        data: bytes, bytearray, memoryview or mmap holding Morse code
+        out: Optional writable buffer to write the text into
+        table: Name of a code table, or a CodeTable (default: Latin)
+
+    Returns:
+        bytes or int: UTF-8 text, or the number of bytes written to out
+
+    Raises:
+        ValueError: If the Morse code is invalid, or out is too small
+    """
+    chunks = iter_buffer_chunks(data, encoding="utf-8")
+    return _write_output(iter_decode(chunks, table=table), out)
+
+
+def encode_buffer_to_fd(data, fd, skip_unknown=False, table=None):
+    """
+    Converts UTF-8 encoded English text to Morse code written to a file descriptor.
+
+    The buffer is translated one chunk at a time, so a memory-mapped file of
+    any size is processed in constant memory.
+
+    Args:
+        data: bytes, bytearray, memoryview or mmap holding UTF-8 text
+        fd (int): File descriptor open for writing
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+        table: Name of a code table, or a CodeTable (default: Latin)
+    """
+    chunks = iter_buffer_chunks(data, encoding="utf-8")
+    write_chunks_to_fd(fd, iter_encode(chunks, skip_unknown=skip_unknown, table=table), encoding="ascii")
+
+
+def decode_buffer_to_fd(data, fd, table=None):
+    """
+    Converts Morse code to English text written to a file descriptor.
+
+    The buffer is translated one chunk at a time, so a memory-mapped file of
+    any size is processed in constant memory.
+
+    Args:
+        data: bytes, bytearray, memoryview or mmap holding Morse code
+        fd (int): File descriptor open for writing
+        table: Name of a code table, or a CodeTable (default: Latin)
+    """
+    chunks = iter_buffer_chunks(data, encoding="utf-8")
+    write_chunks_to_fd(fd, iter_decode(chunks, table=table), encoding="utf-8")
@@ -0,0 +1,103 @@
+"""
+Word-level translation cache for repetitive traffic.
+
+Call signs, Q-codes and fixed phrases repeat constantly, so translating each
+distinct word once and reusing the result saves most of the per-character
+work. One cache can be shared by the encoder and the decoder.
+"""
+
+from functools import lru_cache, partial
+
+from morse_tables import get_table
+
+# Number of words kept when no size is given
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _encode_word(table, word):
+    """Converts one word of supported characters, raising KeyError otherwise"""
+    return ' '.join(map(table.char_to_morse.__getitem__, table.tokens(word.upper())))
+
+
+def _encode_word_skipping(table, word):
+    """Converts one whitespace-free token, dropping unsupported characters"""
+    # Unsupported characters split words, as they do in the encoder
+    words = table.replace_unknown(word.upper()).split()
+    return ' / '.join(_encode_word(table, word) for word in words)
+
+
+def _decode_word(table, morse_code):
+    """Converts the letter codes between two word separators, raising KeyError if one is invalid"""
+    return ''.join(table.morse_to_char[code] for code in morse_code.split(' ') if code)
+
+
+_TRANSLATORS = {
+    "encode": _encode_word,
+    "encode_skip_unknown": _encode_word_skipping,
+    "decode": _decode_word,
+}
+
+
+def _translate(table, kind, word):
+    """Translates one word with the translator of the given kind"""
+    return _TRANSLATORS[kind](table, word)
+
+
+class WordCache:
+    """
+    Bounded cache of word translations with least-recently-used eviction.
+
+    Only successful translations are stored, so a word that cannot be
+    translated raises KeyError every time, and the caller reports the error
+    as it would without a cache.
+
+    Attributes:
+        table (CodeTable): Code table the words are translated with
+        encode_word (callable): Converts one word without spaces to letter
+            codes separated by single spaces; raises KeyError if the word
+            contains an unsupported character
+        encode_word_skipping (callable): Converts one token without whitespace,
+            skipping unsupported characters; returns "" if no word is left
+        decode_word (callable): Converts the letter codes between two word
+            separators to text; raises KeyError if a code is invalid
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, table=None):
+        """
+        Args:
+            maxsize (int): Maximum number of words kept, shared by all directions
+            table: Name of the code table to translate with, or a CodeTable (default: Latin)
+        """
+        self.table = get_table(table)
+        self._translate = lru_cache(maxsize=maxsize)(partial(_translate, self.table))
+        # Partials rather than methods, so that a cache hit runs no Python code
+        self.encode_word = partial(self._translate, "encode")
+        self.encode_word_skipping = partial(self._translate, "encode_skip_unknown")
+        self.decode_word = partial(self._translate, "decode")
+
+    def check_table(self, table):
+        """
+        Checks that the cache translates with a given table.
+
+        Args:
+            table (CodeTable): Code table of the translation the cache is used for
+
+        Raises:
+            ValueError: If the cache was built for another table
+        """
+        if table is not self.table:
+            raise ValueError(f"Word cache built for the {self.table.name} table "
+                             f"cannot be used with the {table.name} table")
+
+    def stats(self):
+        """
+        Reports how well the cache is doing.
+
+        Returns:
+            CacheInfo: Named tuple of hits, misses, maxsize and currsize
+        """
+        return self._translate.cache_info()
+
+    def clear(self):
+        """Empties the cache and resets the statistics"""
+        self._translate.cache_clear()
@@ -0,0 +1,289 @@
+"""
+Validation of large inputs without translating them.
+
+The input is streamed block by block and checked without building any output.
+Text is scanned with a precompiled character class that only matches what is
+invalid, so it is not upper-cased first, and the letter codes of each block of
+Morse code are checked as a set. Only blocks holding problems are searched
+for their positions, and every problem is reported with its line and column,
+not just the first one.
+
+Whitespace follows the rules of the translators: inside a message only plain
+spaces separate words or letter codes, so a line break is an invalid
+character of text, or part of an invalid code of Morse code. With lines=True
+(--lines on the command line), line breaks and other whitespace are treated
+as gaps instead, to check line-oriented files that the translators would
+only accept once joined into one line.
+"""
+
+import re
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+from morse_tables import get_table
+
+Problem = namedtuple("Problem", ["line", "column", "offset", "found", "message"])
+Problem.__doc__ = """
+An invalid character or code found in the input.
+
+Attributes:
+    line (int): Line of the problem, from 1
+    column (int): Column of the problem in its line, from 1
+    offset (int): Position of the problem in the whole input
+    found (str): The invalid character or code
+    message (str): Description of the problem, as the translator would raise it
+"""
+
+# Number of problems reported by the command-line tools before they stop
+DEFAULT_MAX_ERRORS = 100
+
+_CODE_RE = re.compile(r"[^ /]+")
+_LINE_CODE_RE = re.compile(r"[^\s/]+")
+_NON_SPACE_RE = re.compile(r"\S")
+_SEPARATOR_MESSAGE = "Morse code '/' does not match any character"
+
+
+@lru_cache(maxsize=None)
+def text_pattern(table, lines=False):
+    """
+    Compiles the pattern finding characters a table cannot encode.
+
+    Both cases of every symbol are allowed, so the text need not be
+    upper-cased first. Multi-character symbols are matched whole, outside of
+    group 1, so that the characters inside them are not taken for invalid ones.
+
+    Args:
+        table (CodeTable): Code table to check against
+        lines (bool): Whether all whitespace is allowed, rather than plain spaces only
+
+    Returns:
+        re.Pattern: Pattern whose matches with group 1 set are invalid characters
+    """
+    chars = "".join(char for char in table.char_to_morse if len(char) == 1)
+    chars = re.escape("".join(sorted(set(chars + chars.lower()))))
+    spaces = "\\s" if lines else " "
+    symbols = sorted((char for char in table.char_to_morse if len(char) > 1), key=len, reverse=True)
+    if not symbols:
+        return re.compile(f"([^{spaces}{chars}])")
+    alternatives = "|".join(map(re.escape, symbols))
+    return re.compile(f"(?i:{alternatives})|([^{spaces}{chars}])")
+
+
+@lru_cache(maxsize=None)
+def morse_tokens(table):
+    """
+    Lists every token that Morse code of a table split on spaces can hold.
+
+    Args:
+        table (CodeTable): Code table to check against
+
+    Returns:
+        frozenset: The letter codes of the table, the word separator, and the
+            empty token found between consecutive spaces
+    """
+    return frozenset(table.morse_to_char).union(["/", ""])
+
+
+def _iter_blocks(chunks, gaps=" \n/"):
+    """
+    Regroups chunks of input into blocks that end with a gap, so that no
+    word or letter code is split between blocks.
+
+    Args:
+        chunks (iterable of str): Input in pieces of any size
+        gaps (str): Characters at which a block may end
+
+    Yields:
+        tuple: (block, offset of the block in the whole input)
+    """
+    pending = []
+    offset = 0
+    for chunk in chunks:
+        cut = max(map(chunk.rfind, gaps)) + 1
+        if not cut:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:cut])
+        block = "".join(pending)
+        yield block, offset
+        offset += len(block)
+        pending = [chunk[cut:]]
+    yield "".join(pending), offset
+
+
+class _Lines:
+    """Turns offsets into lines and columns as a scan moves forward through the input"""
+
+    __slots__ = ("line", "line_start", "block", "block_offset", "counted")
+
+    def __init__(self):
+        self.line = 1
+        self.line_start = 0  # Offset of the start of the current line
+        self.block = ""
+        self.block_offset = 0
+        self.counted = 0     # Position in block up to which line breaks are counted
+
+    def start_block(self, block, offset):
+        """Counts the line breaks left in the previous block and moves to the next one"""
+        self.advance(len(self.block))
+        self.block = block
+        self.block_offset = offset
+        self.counted = 0
+
+    def advance(self, position):
+        """Counts the line breaks in the current block up to position"""
+        breaks = self.block.count("\n", self.counted, position)
+        if breaks:
+            self.line += breaks
+            self.line_start = self.block_offset + self.block.rindex("\n", self.counted, position) + 1
+        self.counted = position
+
+    def problem(self, position, found, message):
+        """Builds the Problem at a position of the current block"""
+        self.advance(position)
+        offset = self.block_offset + position
+        return Problem(self.line, offset - self.line_start + 1, offset, found, message)
+
+
+def iter_text_problems(chunks, table=None, lines=False):
+    """
+    Finds every character of a text that cannot be converted to Morse code.
+
+    Args:
+        chunks (iterable of str): Text to be checked, in pieces of any size
+        table: Name of a code table, or a CodeTable (default: Latin)
+        lines (bool): Whether line breaks and other whitespace are allowed, as
+            gaps between words, rather than plain spaces only
+
+    Yields:
+        Problem: Each problem, in input order
+    """
+    table = get_table(table)
+    pattern = text_pattern(table, lines)
+    lines = _Lines()
+    is_empty = True
+    for block, offset in _iter_blocks(chunks):
+        is_empty = is_empty and not block
+        lines.start_block(block, offset)
+        for match in pattern.finditer(block):
+            char = match.group(1)
+            if char is None:
+                continue
+            # Rare characters upper-case to supported ones, as "ß" does to "SS";
+            # the message names the character as upper-cased by the translator
+            unsupported = table.find_unsupported_char(char.upper())
+            if unsupported is not None:
+                yield lines.problem(match.start(), char, f"Character '{unsupported}' cannot be converted to Morse code")
+    if is_empty:
+        yield Problem(1, 1, 0, "", "Input text is empty")
+
+
+def _code_message(code):
+    """Describes a letter code that does not match any character"""
+    return f"Morse code '{code}' does not match any character"
+
+
+def iter_morse_problems(chunks, table=None, lines=False):
+    """
+    Finds every letter code of Morse code that does not match any character.
+
+    Whitespace opening or closing the input is ignored, as the decoder
+    ignores it, and a word separator opening or closing the input is reported.
+
+    Args:
+        chunks (iterable of str): Morse code to be checked, in pieces of any size
+        table: Name of a code table, or a CodeTable (default: Latin)
+        lines (bool): Whether line breaks and other whitespace separate letter
+            codes, rather than being part of an invalid code
+
+    Yields:
+        Problem: Each problem, in input order
+    """
+    table = get_table(table)
+    tokens = morse_tokens(table)
+    code_re = _LINE_CODE_RE if lines else _CODE_RE
+    split = str.split if lines else lambda block: block.split(" ")
+    positions = _Lines()
+    is_empty = True
+    is_first = True
+    opening = None  # Offset of a word separator opening the input
+    closing = None  # Problem for the word separator the input ends with so far
+    # Invalid codes that reach into whitespace which may turn out to close the
+    # input, as Problems for the code without that whitespace stripped
+    held = []
+    for block, offset in _iter_blocks(chunks, "\n /" if lines else " /"):
+        is_empty = is_empty and not block
+        positions.start_block(block, offset)
+        end = len(block.rstrip())
+        if not end:
+            # Whitespace only, which may still be followed by more codes
+            if not is_first and not lines:
+                held += _invalid_codes(code_re, block, 0, len(block), positions, table)
+            continue
+        # More codes follow, so the whitespace in held codes is part of them
+        yield from held
+        held = []
+
+        start = 0
+        if is_first:
+            is_first = False
+            start = _NON_SPACE_RE.search(block).start()
+            if block[start] == "/":
+                opening = offset + start
+                yield positions.problem(start, "/", _SEPARATOR_MESSAGE)
+        # Most blocks are valid, which a set of their tokens shows at C speed;
+        # only the others are searched code by code
+        if not tokens.issuperset(split(block[start:])):
+            for problem in _invalid_codes(code_re, block, start, len(block), positions, table):
+                if problem.offset - offset + len(problem.found) > end:
+                    held.append(problem)
+                else:
+                    yield problem
+        closing = positions.problem(end - 1, "/", _SEPARATOR_MESSAGE) if block[end - 1] == "/" else None
+
+    if is_empty:
+        yield Problem(1, 1, 0, "", "Input Morse code is empty")
+        return
+    # The input ends with the whitespace of the held codes, which the decoder strips
+    for problem in held:
+        code = problem.found.rstrip()
+        if code and code not in table.morse_to_char:
+            yield problem._replace(found=code, message=_code_message(code))
+    if closing is not None and closing.offset != opening:
+        yield closing
+
+
+def _invalid_codes(code_re, block, start, end, positions, table):
+    """Lists a Problem for every letter code of block[start:end] that does not match any character"""
+    return [positions.problem(match.start(), match.group(), _code_message(match.group()))
+            for match in code_re.finditer(block, start, end) if match.group() not in table.morse_to_char]
+
+
+def report_problems(problems, max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Prints problems one per line to stdout, as line:column: message, and a
+    count of them to stderr.
+
+    Args:
+        problems (iterable of Problem): Problems to print, such as from iter_text_problems
+        max_errors (int): Number of problems after which to stop, or None for all
+
+    Returns:
+        int: Exit status, 1 if any problem was found and 0 otherwise
+    """
+    count = 0
+    for problem in problems:
+        if max_errors is not None and count == max_errors:
+            print(f"Stopped after {_plural(count, 'problem')}", file=sys.stderr)
+            return 1
+        print(f"{problem.line}:{problem.column}: {problem.message}")
+        count += 1
+    if count:
+        print(f"Found {_plural(count, 'problem')}", file=sys.stderr)
+    return 1 if count else 0
+
+
+def _plural(count, noun):
+    """Formats a count of a noun, such as 1 problem or 2 problems"""
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
@@ -0,0 +1,443 @@
+"""
+Differential fuzzing of the translation engines, as a pytest plugin.
+
+Every engine registered here must translate exactly as encode_to_morse and
+decode_from_morse do, raising the same errors with the same messages, for
+any input. Random and adversarial inputs are generated from a seed, fed to
+the reference and to every other engine, and the first input on which one
+of them differs is shrunk to a small example before it is reported.
+Round-trip invariants between the encoder, the decoder and the other
+formats are checked the same way.
+
+Load the plugin with "pytest -p morse_fuzz" (the repository's conftest.py
+does so), which adds two options:
+
+    --fuzz-budget SECONDS   time each fuzz test runs for
+    --fuzz-seed N           seed of the inputs, to repeat a failing run
+
+A faster engine is checked by registering it with register_encoder or
+register_decoder before the fuzz tests run.
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from decode import IncrementalDecoder, decode_from_morse, decode_from_morse_tree, decode_into, iter_decode, parallel_decode
+from encode import encode_into, encode_to_morse, iter_encode, parallel_encode
+from morse_cache import WordCache
+from morse_numpy import decode_array, encode_array
+from morse_packed import pack, unpack
+from morse_tables import get_table
+from morse_timing import iter_timing, iter_timing_morse
+
+try:
+    import pytest
+except ImportError:
+    # The generators and checks work without pytest; only the plugin needs it
+    pytest = None
+
+# Seconds each fuzz test runs for, unless --fuzz-budget is given
+DEFAULT_BUDGET = 1.0
+
+# Seconds spent shrinking a failing input before it is reported
+SHRINK_SECONDS = 10.0
+
+REFERENCE = "reference"
+
+Engine = namedtuple("Engine", ["name", "translate", "every"])
+Engine.__doc__ = """
+A translation engine checked against the reference.
+
+Attributes:
+    name (str): Name the engine is registered under
+    translate (callable): translate(text, skip_unknown) for an encoder, or
+        translate(morse_code) for a decoder, returning the whole output
+    every (int): The engine is run on one generated input in every, for
+        engines too slow to run on all of them
+"""
+
+_ENCODERS = {}
+_DECODERS = {}
+
+# Sizes that inputs are cut into for the streaming engines, in turn, so that
+# words, codes and separators are split at every position
+_CHUNK_SIZES = (1, 7, 2, 64, 3, 4096, 5)
+
+
+def register_encoder(name, translate, every=1):
+    """
+    Adds an encoder to be checked against encode_to_morse.
+
+    Args:
+        name (str): Name of the engine, which replaces any engine of that name
+        translate (callable): Called as translate(text, skip_unknown), returns Morse code
+        every (int): Run the engine on one generated input in every
+    """
+    _ENCODERS[name] = Engine(name, translate, every)
+
+
+def register_decoder(name, translate, every=1):
+    """
+    Adds a decoder to be checked against decode_from_morse.
+
+    Args:
+        name (str): Name of the engine, which replaces any engine of that name
+        translate (callable): Called as translate(morse_code), returns text
+        every (int): Run the engine on one generated input in every
+    """
+    _DECODERS[name] = Engine(name, translate, every)
+
+
+def encoders():
+    """Returns the registered encoders by name, the reference first"""
+    return dict(_ENCODERS)
+
+
+def decoders():
+    """Returns the registered decoders by name, the reference first"""
+    return dict(_DECODERS)
+
+
+def _split(text):
+    """Cuts text into pieces of varying sizes, in a fixed order"""
+    pieces = []
+    start = 0
+    while start < len(text):
+        size = _CHUNK_SIZES[len(pieces) % len(_CHUNK_SIZES)]
+        pieces.append(text[start:start + size])
+        start += size
+    return pieces
+
+
+def _encode_into(text, skip_unknown):
+    out = bytearray()
+    encode_into(text, out, skip_unknown, encoding="ascii")
+    return out.decode("ascii")
+
+
+def _decode_into(morse_code):
+    out = bytearray()
+    decode_into(morse_code, out, encoding="utf-8")
+    return out.decode("utf-8")
+
+
+def _decode_incrementally(morse_code):
+    decoder = IncrementalDecoder()
+    return "".join(map(decoder.feed, _split(morse_code))) + decoder.flush()
+
+
+# Shared between calls, so that words cached from one input are reused on the next
+_cache = WordCache(256)
+
+register_encoder(REFERENCE, encode_to_morse)
+register_encoder("stream", lambda text, skip_unknown: "".join(iter_encode(_split(text), skip_unknown)))
+register_encoder("cache", lambda text, skip_unknown: encode_to_morse(text, skip_unknown, cache=_cache))
+register_encoder("into", _encode_into)
+register_encoder("numpy", lambda text, skip_unknown: encode_array([text], skip_unknown)[0])
+register_encoder("parallel", lambda text, skip_unknown: "".join(
+    parallel_encode(_split(text), skip_unknown, jobs=2, block_size=16)), every=50)
+
+register_decoder(REFERENCE, decode_from_morse)
+register_decoder("tree", decode_from_morse_tree)
+register_decoder("stream", lambda morse_code: "".join(iter_decode(_split(morse_code))))
+register_decoder("cache", lambda morse_code: decode_from_morse(morse_code, cache=_cache))
+register_decoder("incremental", _decode_incrementally)
+register_decoder("into", _decode_into)
+register_decoder("numpy", lambda morse_code: decode_array([morse_code])[0])
+register_decoder("parallel", lambda morse_code: "".join(
+    parallel_decode(_split(morse_code), jobs=2, block_size=16)), every=50)
+
+
+# Pieces that generated inputs are made of. Whitespace other than spaces is
+# rejected by the encoder unless unknown characters are skipped, and splits
+# words when they are, as any unknown character does.
+_WORDS = ("HELLO", "World", "sos", "CQ", "de", "W1AW", "73", "Hello©World", "ok.", "(a+b)=c")
+_WHITESPACE = (" ", " ", " ", "  ", "   ", "\t", "\n", "\r\n", "\xa0", " ")
+_UNKNOWN = ("©", "#", "ß", "é", "\U0001f600", "\x00", "ﬁ", "<", "~")
+_INVALID_CODES = ("......", "-------", ".-.-..-.", "..--..-", "x", "·", "_", "-- -.-")
+_GAPS = (" ", " ", " ", "  ", " / ", " / ", "/", " /", "/ ", "//", " / / ", "   /   ")
+_EDGES = ("", "", "", " ", "  ", "/", " / ", "\t", "\n")
+
+
+def _size(rng):
+    """Draws the length of an input: mostly short, sometimes long, rarely huge"""
+    roll = rng.random()
+    if roll < 0.8:
+        return rng.randrange(0, 40)
+    if roll < 0.98:
+        return rng.randrange(40, 3000)
+    return rng.randrange(1 << 16, 1 << 18)
+
+
+def random_text(rng, size=None, clean=None):
+    """
+    Generates text to encode.
+
+    Args:
+        rng (random.Random): Source of randomness
+        size (int): Approximate number of characters, drawn from rng if None
+        clean (bool): Whether the text should only hold supported characters
+            and spaces, drawn from rng if None
+
+    Returns:
+        str: The text
+    """
+    size = _size(rng) if size is None else size
+    clean = rng.random() < 0.5 if clean is None else clean
+    chars = [char for char in get_table().char_to_morse if len(char) == 1]
+    chars += [char.lower() for char in chars if char.isalpha()]
+    pieces = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.45:
+            piece = rng.choice(chars)
+        elif roll < 0.65:
+            piece = rng.choice(_WORDS)
+            if clean:
+                piece = piece.replace("©", " ")
+        elif roll < 0.9 or clean:
+            piece = " " * rng.randrange(1, 4) if clean else rng.choice(_WHITESPACE)
+        else:
+            piece = rng.choice(_UNKNOWN)
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def random_morse(rng, size=None, clean=None):
+    """
+    Generates Morse code to decode, with pathological spacing.
+
+    Args:
+        rng (random.Random): Source of randomness
+        size (int): Approximate number of characters, drawn from rng if None
+        clean (bool): Whether every code should be valid and every word
+            separator inside the message, drawn from rng if None
+
+    Returns:
+        str: The Morse code
+    """
+    size = _size(rng) if size is None else size
+    clean = rng.random() < 0.5 if clean is None else clean
+    codes = list(get_table().morse_to_char)
+    pieces = []
+    length = 0
+    while length < size:
+        if pieces:
+            pieces.append(rng.choice(_GAPS))
+        if not clean and rng.random() < 0.02:
+            pieces.append(rng.choice(_INVALID_CODES))
+        else:
+            pieces.append(rng.choice(codes))
+        length += len(pieces[-1]) + 2
+    if clean:
+        return " " * rng.randrange(3) + "".join(pieces) + " " * rng.randrange(3)
+    return rng.choice(_EDGES) + "".join(pieces) + rng.choice(_EDGES)
+
+
+def outcome(translate, *args):
+    """
+    Runs a translation, turning its result or error into a comparable value.
+
+    Returns:
+        tuple: ("ok", result), ("error", message) for a ValueError, or
+            ("crash", description) for any other exception
+    """
+    try:
+        return "ok", translate(*args)
+    except ValueError as e:
+        return "error", str(e)
+    except Exception as e:
+        return "crash", f"{type(e).__name__}: {e}"
+
+
+def _describe(result):
+    """Shortens an outcome for a failure report"""
+    kind, value = result
+    value = repr(value)
+    return f"{kind} {value[:200] + '...' if len(value) > 200 else value}"
+
+
+def _compare(engines, args, case):
+    """Runs every engine on the same arguments, returning the first difference from the reference"""
+    expected = outcome(engines[REFERENCE].translate, *args)
+    for engine in engines.values():
+        if engine.name == REFERENCE or case % engine.every:
+            continue
+        result = outcome(engine.translate, *args)
+        if result != expected:
+            return f"engine {engine.name!r} gave {_describe(result)}, reference gave {_describe(expected)}"
+    return None
+
+
+def check_encoders(text, case=0, engines=None):
+    """
+    Checks that every encoder translates text as the reference does, with
+    and without skip_unknown.
+
+    Args:
+        text (str): Text to encode
+        case (int): Number of the generated input, to pick the engines that
+            run on one input in several
+        engines (dict): Engines by name, with a "reference" one (default: the registered encoders)
+
+    Returns:
+        str: Description of the first difference, or None if there is none
+    """
+    engines = _ENCODERS if engines is None else engines
+    return _compare(engines, (text, False), case) or _compare(engines, (text, True), case)
+
+
+def check_decoders(morse_code, case=0, engines=None):
+    """
+    Checks that every decoder translates Morse code as the reference does.
+
+    Args:
+        morse_code (str): Morse code to decode
+        case (int): Number of the generated input, to pick the engines that
+            run on one input in several
+        engines (dict): Engines by name, with a "reference" one (default: the registered decoders)
+
+    Returns:
+        str: Description of the first difference, or None if there is none
+    """
+    return _compare(_DECODERS if engines is None else engines, (morse_code,), case)
+
+
+def check_round_trips(text, case=0):
+    """
+    Checks the invariants that tie the encoder, the decoder and the other formats together.
+
+    - Decoding the Morse code of text gives the text upper-cased, with every
+      run of unknown characters and whitespace turned into one space and no
+      space at the edges.
+    - Encoding decoded text, then decoding it again, only collapses spaces.
+    - The packed format and keying timelines convert back to the same Morse code.
+
+    Args:
+        text (str): Text to start from; unknown characters are skipped
+        case (int): Unused, for the same signature as the other checks
+
+    Returns:
+        str: Description of the first invariant that does not hold, or None
+    """
+    morse_code = encode_to_morse(text, skip_unknown=True)
+    if not morse_code:
+        return None
+    expected = " ".join(get_table().replace_unknown(text.upper()).split())
+    decoded = decode_from_morse(morse_code)
+    if decoded != expected:
+        return f"decode(encode(text)) is {decoded!r}, expected {expected!r}"
+    if decode_from_morse(encode_to_morse(decoded)) != decoded:
+        return "decode(encode(decode(morse))) changed the text"
+    if unpack(pack(morse_code)) != morse_code:
+        return "unpack(pack(morse)) changed the Morse code"
+    for unit in ("ms", "units"):
+        timed = "".join(iter_timing_morse(iter_timing([morse_code], unit=unit), unit=unit))
+        if timed != morse_code:
+            return f"keying timeline in {unit} read back as {timed[:200]!r}"
+    return None
+
+
+class FuzzFailure(AssertionError):
+    """An input on which an engine differs from the reference, or an invariant does not hold"""
+
+
+def shrink(value, fails, seconds=SHRINK_SECONDS):
+    """
+    Deletes as much of a failing input as possible while it still fails.
+
+    Slices are deleted from the largest down to single characters, so most
+    inputs shrink to a few characters; a huge input may be left longer when
+    time runs out.
+
+    Args:
+        value (str): Input on which fails returns True
+        fails (callable): Called as fails(input), True while the input still fails
+        seconds (float): Time after which the smallest input found so far is returned
+
+    Returns:
+        str: The smallest failing input found
+    """
+    deadline = time.monotonic() + seconds
+    size = len(value) // 2
+    while size and time.monotonic() < deadline:
+        start = 0
+        while start < len(value) and time.monotonic() < deadline:
+            candidate = value[:start] + value[start + size:]
+            if fails(candidate):
+                value = candidate
+            else:
+                start += size
+        size //= 2
+    return value
+
+
+def run_fuzz(check, generate, budget=DEFAULT_BUDGET, seed=None):
+    """
+    Checks inputs drawn from a generator until the time budget runs out.
+
+    The inputs only depend on the seed, so a failure is repeated by running
+    again with the seed it reports, whatever the budget.
+
+    Args:
+        check (callable): Called as check(input, case), returns a description of a failure or None
+        generate (callable): Called as generate(rng), returns an input
+        budget (float): Seconds to run for; at least one input is checked
+        seed (int): Seed of the inputs, drawn at random if None
+
+    Returns:
+        int: Number of inputs checked
+
+    Raises:
+        FuzzFailure: For the first failing input, shrunk, with the seed
+    """
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    rng = random.Random(seed)
+    deadline = time.monotonic() + budget
+    case = 0
+    while not case or time.monotonic() < deadline:
+        value = generate(rng)
+        failure = check(value, case)
+        if failure is not None:
+            value = shrink(value, lambda candidate: check(candidate, case) is not None)
+            raise FuzzFailure(f"{check(value, case)}\n  input: {value!r}\n  (seed {seed}, input {case})")
+        case += 1
+    return case
+
+
+def pytest_addoption(parser):
+    """Adds the fuzzing options to pytest"""
+    group = parser.getgroup("fuzz", "differential fuzzing of the translation engines")
+    group.addoption("--fuzz-budget", type=float, default=DEFAULT_BUDGET, metavar="SECONDS",
+                    help=f"Seconds each fuzz test runs for (default: {DEFAULT_BUDGET})")
+    group.addoption("--fuzz-seed", type=int, metavar="N",
+                    help="Seed of the generated inputs, to repeat a run (default: random)")
+
+
+def pytest_configure(config):
+    """Draws the seed of the session, so that every fuzz test reports the same one"""
+    if config.getoption("fuzz_seed") is None:
+        config.option.fuzz_seed = random.randrange(1 << 32)
+
+
+def pytest_report_header(config):
+    """Shows the fuzzing budget and seed at the top of the test session"""
+    return f"fuzz: {config.getoption('fuzz_budget')}s per test, seed {config.getoption('fuzz_seed')}"
+
+
+if pytest is not None:
+    @pytest.fixture
+    def fuzz(request):
+        """
+        Runs a check against generated inputs, with the budget and seed of the session.
+
+        Returns:
+            callable: fuzz(check, generate), as run_fuzz, returning the number of inputs checked
+        """
+        budget = request.config.getoption("fuzz_budget")
+        seed = request.config.getoption("fuzz_seed")
+        return lambda check, generate: run_fuzz(check, generate, budget, seed)
@@ -0,0 +1,282 @@
+"""
+Optional NumPy backend for encoding and decoding many short messages at once.
+
+The messages are concatenated into one array of code points and translated
+with lookup arrays and offset/length buffers, so the per-character work runs
+inside NumPy. When NumPy is not installed the functions fall back to calling
+encode_to_morse / decode_from_morse once per message.
+"""
+
+from decode import decode_from_morse
+from encode import encode_to_morse
+from morse_utils import CHAR_TO_MORSE, MORSE_TREE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Code points at or above this value are never supported and share one slot
+# in the lookup arrays
+_ASCII_LIMIT = 128
+_TABLE_SIZE = _ASCII_LIMIT + 1
+
+# Word-boundary prefixes written before a letter: none for the first letter of
+# a message, a letter gap within a word, and a word gap after a boundary
+_PREFIXES = ("", " ", " / ")
+
+# Key of the piece written between two messages. Neither Morse code nor the
+# characters it decodes to contain a newline, so the joined output can be
+# split back into messages on it.
+_ROW_END_KEY = len(_PREFIXES) * _TABLE_SIZE
+
+
+def _build_encode_tables():
+    """
+    Builds the encoder lookup arrays.
+
+    Pieces are indexed by prefix kind * _TABLE_SIZE + code point, plus
+    _ROW_END_KEY for the separator between messages.
+
+    Returns:
+        tuple: (supported, pieces, offsets, lengths), where pieces holds every
+            piece back to back as ASCII bytes
+    """
+    supported = np.zeros(_TABLE_SIZE, dtype=bool)
+    offsets = np.zeros(_ROW_END_KEY + 1, dtype=np.intp)
+    lengths = np.zeros(_ROW_END_KEY + 1, dtype=np.intp)
+    pieces = bytearray(b"\n")
+    lengths[_ROW_END_KEY] = 1
+    for char, code in CHAR_TO_MORSE.items():
+        supported[ord(char)] = True
+        for kind, prefix in enumerate(_PREFIXES):
+            key = kind * _TABLE_SIZE + ord(char)
+            offsets[key] = len(pieces)
+            lengths[key] = len(prefix) + len(code)
+            pieces += (prefix + code).encode("ascii")
+    return supported, np.frombuffer(bytes(pieces), dtype=np.uint8), offsets, lengths
+
+
+def _build_decode_tree():
+    """
+    Builds MORSE_TREE as an array of ASCII codes, 0 where no character exists.
+
+    Returns:
+        numpy.ndarray: Character codes indexed by tree path
+    """
+    return np.array([ord(char) if char else 0 for char in MORSE_TREE], dtype=np.uint8)
+
+
+if np is not None:
+    _SUPPORTED, _PIECES, _PIECE_OFFSETS, _PIECE_LENGTHS = _build_encode_tables()
+    _TREE = _build_decode_tree()
+    # Longest code the tree can hold; longer codes are invalid
+    _TREE_DEPTH = len(_TREE).bit_length() - 2
+
+
+def _join_rows(rows, joined=None):
+    """
+    Concatenates messages, separated by spaces, into one array of code points.
+
+    Args:
+        rows (list of str): Messages to concatenate
+        joined (str): The messages already joined with spaces, if available
+
+    Returns:
+        tuple: (code points as uint8 for ASCII text and uint32 otherwise,
+            boolean array marking the separators between messages,
+            position of the separator after each message)
+    """
+    if joined is None:
+        joined = " ".join(rows)
+    if joined.isascii():
+        code_points = np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+    else:
+        code_points = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+
+    row_lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+    row_ends = np.cumsum(row_lengths + 1) - 1
+    is_row_end = np.zeros(len(code_points), dtype=bool)
+    is_row_end[row_ends[:-1]] = True
+    return code_points, is_row_end, row_ends
+
+
+def _first_bad_row(row_ends, *position_arrays):
+    """
+    Finds the first message containing any of the given positions.
+
+    Args:
+        row_ends (numpy.ndarray): Position of the separator after each message
+        position_arrays (numpy.ndarray): Positions of problems in the joined messages
+
+    Returns:
+        int: Index of the first message with a problem, or None
+    """
+    first = [int(positions.min()) for positions in position_arrays if len(positions)]
+    return int(np.searchsorted(row_ends, min(first))) if first else None
+
+
+def _gather_pieces(keys):
+    """
+    Concatenates the encoder pieces for a sequence of table keys.
+
+    Args:
+        keys (numpy.ndarray): Indexes into the encoder lookup arrays
+
+    Returns:
+        str: ASCII text of all pieces
+    """
+    lengths = _PIECE_LENGTHS[keys]
+    ends = np.cumsum(lengths)
+    # Every output byte is copied from its piece's offset in _PIECES, shifted
+    # by how far that byte is from the start of its piece in the output
+    sources = np.repeat(_PIECE_OFFSETS[keys] - (ends - lengths), lengths)
+    sources += np.arange(len(sources))
+    return _PIECES[sources].tobytes().decode("ascii")
+
+
+def encode_array(texts, skip_unknown=False):
+    """
+    Converts many English texts to Morse code at once.
+
+    Args:
+        texts (iterable of str): Texts to be encoded, such as a list or NumPy array
+        skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+
+    Returns:
+        list: Morse code of each text, as encode_to_morse would return it
+
+    Raises:
+        ValueError: The error encode_to_morse raises for the first text that cannot be encoded
+    """
+    texts = list(texts)
+    if np is None:
+        return [encode_to_morse(text, skip_unknown=skip_unknown) for text in texts]
+    if not texts:
+        return []
+
+    joined = " ".join(texts).upper()
+    if len(joined) == sum(map(len, texts)) + len(texts) - 1:
+        code_points, is_row_end, row_ends = _join_rows(texts, joined)
+    else:
+        # Some characters upper-case to more than one character
+        code_points, is_row_end, row_ends = _join_rows([text.upper() for text in texts])
+    lookup = np.minimum(code_points, _ASCII_LIMIT)
+    is_valid = _SUPPORTED[lookup]
+
+    if not skip_unknown:
+        is_empty = np.fromiter(map(len, texts), dtype=np.intp, count=len(texts)) == 0
+        is_invalid = ~is_valid & (code_points != ord(" "))
+        bad_row = _first_bad_row(row_ends, row_ends[is_empty], np.flatnonzero(is_invalid))
+        if bad_row is not None:
+            # Let the reference encoder raise its own error for that text
+            encode_to_morse(texts[bad_row], skip_unknown=skip_unknown)
+
+    # Each supported character is written as a prefix plus its code. The prefix
+    # is nothing for the first letter of a text, and a word gap when the
+    # character before it is a space or an unknown character.
+    items = np.flatnonzero(is_valid | is_row_end)
+    is_letter = is_valid[items]
+    follows_letter = np.zeros(len(items), dtype=bool)
+    follows_letter[1:] = is_letter[:-1]
+    follows_gap = ~is_valid[items - 1]
+    kinds = np.where(follows_letter, np.where(follows_gap, 2, 1), 0)
+    keys = np.where(is_letter, kinds * _TABLE_SIZE + lookup[items], _ROW_END_KEY)
+
+    return _gather_pieces(keys).split("\n")
+
+
+def _find_bad_separators(is_slash, is_space, is_row_end):
+    """
+    Finds word separators that open or close a message.
+
+    Args:
+        is_slash (numpy.ndarray): Marks word separators
+        is_space (numpy.ndarray): Marks spaces, including those between messages
+        is_row_end (numpy.ndarray): Marks the separators between messages
+
+    Returns:
+        numpy.ndarray: Positions of the offending separators
+    """
+    size = len(is_slash)
+    bad = [np.zeros(0, dtype=np.intp)]
+    for step in (-1, 1):
+        # Walk outwards from every separator over spaces until something other
+        # than a space, or the edge of the message, is reached
+        candidates = np.flatnonzero(is_slash)
+        distance = 1
+        while len(candidates):
+            neighbours = candidates + step * distance
+            outside = (neighbours < 0) | (neighbours >= size)
+            neighbours = np.clip(neighbours, 0, size - 1)
+            at_edge = outside | is_row_end[neighbours]
+            bad.append(candidates[at_edge])
+            candidates = candidates[~at_edge & is_space[neighbours]]
+            distance += 1
+    return np.concatenate(bad)
+
+
+def decode_array(morse_codes):
+    """
+    Converts many Morse code messages to English text at once.
+
+    Args:
+        morse_codes (iterable of str): Messages to be decoded, such as a list or NumPy array
+
+    Returns:
+        list: Text of each message, as decode_from_morse would return it
+
+    Raises:
+        ValueError: The error decode_from_morse raises for the first message that cannot be decoded
+    """
+    morse_codes = list(morse_codes)
+    if np is None:
+        return [decode_from_morse(morse_code) for morse_code in morse_codes]
+    if not morse_codes:
+        return []
+
+    code_points, is_row_end, row_ends = _join_rows(morse_codes)
+    is_morse = (code_points == ord(".")) | (code_points == ord("-")) | (code_points == ord("/")) | (code_points == ord(" "))
+    if not is_morse.all():
+        # Only leading and trailing whitespace other than spaces is allowed, so
+        # strip every message; anything left over is reported below
+        code_points, is_row_end, row_ends = _join_rows([morse_code.strip() for morse_code in morse_codes])
+    is_dash = code_points == ord("-")
+    is_symbol = is_dash | (code_points == ord("."))
+    is_slash = code_points == ord("/")
+    is_space = code_points == ord(" ")
+    is_invalid = ~(is_symbol | is_slash | is_space)
+
+    # Walk every letter code down the tree at once: a code of n symbols sits at
+    # 2 ** n plus the binary number spelled by its dashes
+    starts = is_symbol.copy()
+    starts[1:] &= ~is_symbol[:-1]
+    ends = is_symbol.copy()
+    ends[:-1] &= ~is_symbol[1:]
+    code_ends = np.flatnonzero(ends)
+    code_lengths = code_ends - np.flatnonzero(starts) + 1
+    indexes = np.ones(len(code_ends), dtype=np.intp) << np.minimum(code_lengths, _TREE_DEPTH)
+    for shift in range(_TREE_DEPTH):
+        indexes += (is_dash[np.maximum(code_ends - shift, 0)] & (code_lengths > shift)).astype(np.intp) << shift
+    indexes[code_lengths > _TREE_DEPTH] = 0
+    chars = _TREE[indexes]
+
+    is_empty = np.fromiter(map(len, morse_codes), dtype=np.intp, count=len(morse_codes)) == 0
+    bad_row = _first_bad_row(
+        row_ends,
+        row_ends[is_empty],
+        _find_bad_separators(is_slash, is_space, is_row_end),
+        np.flatnonzero(is_invalid),
+        code_ends[chars == 0],
+    )
+    if bad_row is not None:
+        # Let the reference decoder raise its own error for that message
+        decode_from_morse(morse_codes[bad_row])
+
+    # Every letter code emits its character where it ends, every word separator
+    # emits a space, and every message but the last ends with a newline
+    emitted = np.zeros(len(code_points), dtype=np.uint8)
+    emitted[code_ends] = chars
+    emitted[is_slash] = ord(" ")
+    emitted[is_row_end] = ord("\n")
+    return emitted[emitted != 0].tobytes().decode("ascii").split("\n")
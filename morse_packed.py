@@ -0,0 +1,296 @@
+"""
+Packed binary format for Morse code.
+
+Each symbol takes two bits: 0 for a dot, 1 for a dash, 2 for the gap between
+letters and 3 for the gap between words. Four symbols are packed per byte,
+first symbol in the high bits, and the last byte is padded with zeros.
+
+The data is preceded by a 12-byte header: the magic bytes b"MRS", a format
+version byte, and the number of symbols as an unsigned 64-bit big-endian
+integer.
+
+Encoder output converts to the packed form and back unchanged. Other spacing
+is normalized (runs of spaces become one letter gap and each "/" one word
+gap), which does not change what the Morse code decodes to.
+"""
+
+import re
+import shutil
+import struct
+import sys
+import tempfile
+
+from morse_utils import CHUNK_SIZE, open_replacing
+
+MAGIC = b"MRS"
+VERSION = 1
+
+_HEADER = struct.Struct(">3sBQ")
+
+# Number of packed bytes held in memory before the symbols written to standard
+# output are spooled to a temporary file instead
+_SPOOL_SIZE = 1 << 20
+
+# Word separators with whatever spaces surround them, and runs of spaces
+_WORD_GAP_RE = re.compile(r" */ *")
+_LETTER_GAP_RE = re.compile(r"  +")
+
+# Base-4 digit of each symbol, once separators are reduced to one character
+_TO_DIGITS = str.maketrans(".- /", "0123")
+_INVALID_SYMBOL_RE = re.compile(r"[^.\- /]")
+
+# Characters that may end a chunk in the middle of a gap
+_GAP_CHARS = " /\t\n\r\x0b\x0c"
+
+# The four symbols held by each possible byte
+_BYTE_SYMBOLS = [
+    "".join(".- /"[(byte >> shift) & 3] for shift in (6, 4, 2, 0)) for byte in range(256)
+]
+
+
+def _to_digits(morse_code):
+    """
+    Reduces Morse code to one base-4 digit per symbol.
+
+    Args:
+        morse_code (str): Morse code with separators that are not split
+
+    Returns:
+        str: Digits "0" to "3"
+
+    Raises:
+        ValueError: If the Morse code contains a character other than ".- /"
+    """
+    match = _INVALID_SYMBOL_RE.search(morse_code)
+    if match:
+        raise ValueError(f"Character '{match.group()}' is not a Morse code symbol")
+    symbols = _LETTER_GAP_RE.sub(" ", _WORD_GAP_RE.sub("/", morse_code))
+    return symbols.translate(_TO_DIGITS)
+
+
+def _pack_digits(digits):
+    """Packs base-4 digits into bytes, padding the last byte with zeros"""
+    padding = -len(digits) % 4
+    digits += "0" * padding
+    # A base-4 number converts to bytes in linear time
+    return int(digits or "0", 4).to_bytes(len(digits) // 4, "big")
+
+
+def _unpack_bytes(data):
+    """Unpacks bytes into single-character symbols, four per byte"""
+    return "".join(map(_BYTE_SYMBOLS.__getitem__, data))
+
+
+def _expand(symbols):
+    """Turns single-character symbols back into the encoder's Morse code"""
+    # Consecutive word gaps share the space between them
+    return symbols.replace("/", " / ").replace("  ", " ")
+
+
+def pack(morse_code):
+    """
+    Converts Morse code to the packed binary format.
+
+    Args:
+        morse_code (str): Morse code made of ".", "-", spaces and "/"
+
+    Returns:
+        bytes: Header followed by the packed symbols
+
+    Raises:
+        ValueError: If the Morse code contains any other character
+    """
+    digits = _to_digits(morse_code.strip())
+    return _HEADER.pack(MAGIC, VERSION, len(digits)) + _pack_digits(digits)
+
+
+def _parse_header(header):
+    """
+    Checks a header and returns the number of symbols it announces.
+
+    Raises:
+        ValueError: If the header is not that of a supported packed file
+    """
+    if len(header) < _HEADER.size:
+        raise ValueError("Packed Morse code is truncated")
+    magic, version, count = _HEADER.unpack(header[:_HEADER.size])
+    if magic != MAGIC:
+        raise ValueError("Input is not packed Morse code")
+    if version != VERSION:
+        raise ValueError(f"Unsupported packed Morse code version: {version}")
+    return count
+
+
+def unpack(data):
+    """
+    Converts the packed binary format back to Morse code.
+
+    Args:
+        data: bytes-like object holding a header and packed symbols
+
+    Returns:
+        str: Morse code as the encoder writes it
+
+    Raises:
+        ValueError: If the data is not packed Morse code, or is truncated
+    """
+    data = memoryview(data)
+    count = _parse_header(data)
+    body = data[_HEADER.size:]
+    if len(body) * 4 < count:
+        raise ValueError("Packed Morse code is truncated")
+    return _expand(_unpack_bytes(body[:(count + 3) // 4])[:count]).strip(" ")
+
+
+def _iter_digit_chunks(morse_chunks):
+    """
+    Converts chunks of Morse code to base-4 digits, one chunk at a time.
+
+    Gaps at the end of a chunk are held back until the next chunk, so that a
+    separator split across chunks is reduced as a whole.
+
+    Args:
+        morse_chunks (iterable of str): Consecutive chunks of Morse code
+
+    Yields:
+        str: Digits "0" to "3"
+    """
+    pending = ""
+    is_first = True
+    for chunk in morse_chunks:
+        text = pending + chunk
+        body = text.rstrip(_GAP_CHARS)
+        pending = text[len(body):]
+        if is_first:
+            body = body.lstrip()
+        if body:
+            is_first = False
+            yield _to_digits(body)
+    tail = pending.strip()
+    if tail:
+        yield _to_digits(tail)
+
+
+def _write_symbols(f, morse_chunks):
+    """
+    Writes the packed symbols of Morse code to a binary file, one chunk at a time.
+
+    Args:
+        f: Binary file to write to, after the header
+        morse_chunks (iterable of str): Morse code to pack
+
+    Returns:
+        int: Number of symbols written
+
+    Raises:
+        ValueError: If the Morse code contains a character other than ".- /"
+    """
+    count = 0
+    carry = ""  # Digits left over that do not fill a byte yet
+    for digits in _iter_digit_chunks(morse_chunks):
+        count += len(digits)
+        digits = carry + digits
+        end = len(digits) - len(digits) % 4
+        f.write(_pack_digits(digits[:end]))
+        carry = digits[end:]
+    f.write(_pack_digits(carry))
+    return count
+
+
+def _write_spooled(f, morse_chunks):
+    """
+    Writes Morse code in the packed binary format to a file that cannot be rewound.
+
+    The header needs the symbol count, so the packed symbols are spooled, in
+    memory up to 1 MiB and in a temporary file beyond, and copied out in
+    chunks once they are counted.
+
+    Args:
+        f: Binary file to write to
+        morse_chunks (iterable of str): Morse code to pack
+
+    Raises:
+        ValueError: If the Morse code contains a character other than ".- /"
+    """
+    with tempfile.SpooledTemporaryFile(_SPOOL_SIZE) as spool:
+        count = _write_symbols(spool, morse_chunks)
+        spool.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, count))
+        shutil.copyfileobj(spool, f, CHUNK_SIZE)
+
+
+def write_packed(file_path, morse_chunks):
+    """
+    Writes Morse code to a file in the packed binary format, streaming it.
+
+    The symbol count in the header is filled in once every chunk is packed.
+    As with write_chunks_to_file, the file is written through
+    morse_utils.open_replacing, so the target is only replaced once it is
+    complete. Standard output and other files that cannot be rewound to fill
+    in the header are written through a spool instead.
+
+    Args:
+        file_path (str): Path to the output file, or "-" for standard output
+        morse_chunks (iterable of str): Morse code to pack
+
+    Raises:
+        IOError: If there's an error writing to the file
+        ValueError: If the Morse code contains a character other than ".- /"
+    """
+    if file_path == "-":
+        _write_spooled(sys.stdout.buffer, morse_chunks)
+        sys.stdout.buffer.flush()
+        return
+
+    with open_replacing(file_path) as f:
+        if not f.seekable():
+            _write_spooled(f, morse_chunks)
+            return
+        f.write(_HEADER.pack(MAGIC, VERSION, 0))
+        count = _write_symbols(f, morse_chunks)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, count))
+
+
+def read_packed_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Reads a packed Morse code file lazily, one chunk at a time.
+
+    Args:
+        file_path (str): Path to the input file, or "-" for standard input
+        chunk_size (int): Number of bytes unpacked per chunk
+
+    Yields:
+        str: Consecutive chunks of Morse code as the encoder writes it
+
+    Raises:
+        FileNotFoundError: If the file is not found
+        IOError: If there's an error reading the file
+        ValueError: If the file is not packed Morse code, or is truncated
+    """
+    if file_path == "-":
+        # Standard input is left open, as it belongs to the caller
+        yield from _iter_unpacked(sys.stdin.buffer, chunk_size)
+        return
+
+    try:
+        f = open(file_path, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file not found: {file_path}")
+    except IOError:
+        raise IOError(f"Error reading file: {file_path}")
+
+    with f:
+        yield from _iter_unpacked(f, chunk_size)
+
+
+def _iter_unpacked(f, chunk_size):
+    """Reads the header and packed symbols of a binary file, yielding chunks of Morse code"""
+    remaining = _parse_header(f.read(_HEADER.size))
+    while remaining:
+        data = f.read(min(chunk_size, (remaining + 3) // 4))
+        if not data:
+            raise ValueError("Packed Morse code is truncated")
+        symbols = _unpack_bytes(data)[:remaining]
+        remaining -= len(symbols)
+        yield _expand(symbols)
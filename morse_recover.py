@@ -0,0 +1,292 @@
+"""
+Error-tolerant decoding of noisy Morse code.
+
+Instead of stopping at the first code that matches no character, every
+unknown code is repaired and the repair is reported with its offset. A code
+is either replaced with the nearest valid code, looked up in an index of every
+string within a small edit distance of a valid code, or split into several
+valid codes when letters were run together, whichever takes fewer edits.
+Codes that cannot be repaired, and codes that contain characters other than
+dots and dashes, are replaced with a placeholder.
+
+Blocks without errors are decoded with the same table lookups as
+decode_from_morse, so the work stays linear in the size of the input and
+only blocks with errors take the slower path.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from morse_tables import get_table
+
+# Strategies for unknown codes: repair them where possible, or always use the placeholder
+STRATEGIES = ("nearest", "placeholder")
+
+DEFAULT_PLACEHOLDER = "*"
+
+# Largest edit distance at which a code is replaced with the nearest valid one
+MAX_DISTANCE = 2
+
+# Number of characters gathered before a block is cut; an error only sends
+# the block it is in through the slower path
+_BLOCK_SIZE = 1 << 14
+
+_GAP_CHARS = " /\t\n\r\x0b\x0c"
+_TOKEN_RE = re.compile(r"/|[^\s/]+")
+# Matches the gaps before a code, so that a block can be cut where a code starts
+_CUT_RE = re.compile(r"[\s/]+(?=[^\s/])")
+_SYMBOLS_RE = re.compile(r"[.-]+")
+
+Correction = namedtuple("Correction", ["offset", "code", "replacement", "kind"])
+Correction.__doc__ = """
+A repair made while decoding.
+
+Attributes:
+    offset (int): Position of the code in the input
+    code (str): The code as it was received
+    replacement (str): Text decoded in its place
+    kind (str): "nearest" for the closest valid code, "split" for several
+        letters that were run together, "placeholder" for a code that could not
+        be repaired, or "dropped" for a word separator opening or closing the message
+"""
+
+
+def _edits(code):
+    """Returns every string one deletion, substitution or insertion of a symbol away from code"""
+    variants = []
+    for i in range(len(code) + 1):
+        for symbol in ".-":
+            variants.append(code[:i] + symbol + code[i:])
+        if i < len(code):
+            variants.append(code[:i] + code[i + 1:])
+            variants.append(code[:i] + ("-" if code[i] == "." else ".") + code[i + 1:])
+    return variants
+
+
+@lru_cache(maxsize=None)
+def nearest_index(table):
+    """
+    Maps every string of dots and dashes near a valid code to that code.
+
+    The index is built once per table, by a breadth-first search outwards from
+    the valid codes, so looking up a received code is a single dict access.
+    Ties between equally near codes are broken in a fixed order, favouring
+    codes listed earlier in the table.
+
+    Args:
+        table (CodeTable): Code table to index
+
+    Returns:
+        dict: String mapped to (nearest valid code, edit distance), for every
+            string within MAX_DISTANCE edits of a valid code
+    """
+    max_length = max(map(len, table.morse_to_char)) + MAX_DISTANCE
+    index = {code: (code, 0) for code in table.morse_to_char}
+    frontier = list(index)
+    for distance in range(1, MAX_DISTANCE + 1):
+        next_frontier = []
+        for variant_of in frontier:
+            target = index[variant_of][0]
+            for variant in _edits(variant_of):
+                if variant and len(variant) <= max_length and variant not in index:
+                    index[variant] = (target, distance)
+                    next_frontier.append(variant)
+        frontier = next_frontier
+    return index
+
+
+def split_code(code, table):
+    """
+    Splits letters that were run together into the fewest valid codes.
+
+    Args:
+        code (str): Dots and dashes received without the gaps between letters
+        table (CodeTable): Code table to split with
+
+    Returns:
+        list: Valid codes that make up code, or None if it cannot be split
+    """
+    morse_to_char = table.morse_to_char
+    depth = max(map(len, morse_to_char))
+    # pieces[end] is the fewest codes that make up code[:end], and starts[end]
+    # where the last of them starts
+    pieces = [0] + [None] * len(code)
+    starts = [0] * (len(code) + 1)
+    for end in range(1, len(code) + 1):
+        for start in range(max(0, end - depth), end):
+            if pieces[start] is not None and code[start:end] in morse_to_char:
+                if pieces[end] is None or pieces[start] + 1 < pieces[end]:
+                    pieces[end] = pieces[start] + 1
+                    starts[end] = start
+    if pieces[-1] is None:
+        return None
+
+    codes = []
+    end = len(code)
+    while end:
+        codes.append(code[starts[end]:end])
+        end = starts[end]
+    return codes[::-1]
+
+
+def recover_code(code, table=None, strategy="nearest", placeholder=DEFAULT_PLACEHOLDER):
+    """
+    Repairs one code that matches no character.
+
+    Args:
+        code (str): The unknown code
+        table: Name of a code table, or a CodeTable (default: Latin)
+        strategy (str): "nearest" to repair the code where possible, or
+            "placeholder" to always replace it with the placeholder
+        placeholder (str): Text decoded for a code that is not repaired
+
+    Returns:
+        tuple: (replacement text, kind of correction, as in Correction)
+    """
+    table = get_table(table)
+    if strategy == "placeholder" or not _SYMBOLS_RE.fullmatch(code):
+        return placeholder, "placeholder"
+
+    nearest = nearest_index(table).get(code)
+    codes = split_code(code, table)
+    # Each gap put back counts as one edit, like a changed symbol
+    if codes is not None and (nearest is None or len(codes) - 1 < nearest[1]):
+        return "".join(map(table.morse_to_char.__getitem__, codes)), "split"
+    if nearest is not None:
+        return table.morse_to_char[nearest[0]], "nearest"
+    return placeholder, "placeholder"
+
+
+def _iter_blocks(chunks):
+    """
+    Regroups chunks of Morse code into blocks that end just before a code.
+
+    Every separator inside a block but the last is followed by a code, so only
+    the last block can end with separators that close the message.
+
+    Yields:
+        tuple: (block, offset of the block in the whole message, is_last)
+    """
+    pending = []
+    pending_size = 0
+    needed = _BLOCK_SIZE  # Characters to gather before looking for a cut
+    offset = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < needed:
+            continue
+
+        text = "".join(pending)
+        start = 0
+        while len(text) - start >= _BLOCK_SIZE:
+            match = _CUT_RE.search(text, start + _BLOCK_SIZE)
+            if match is None:
+                break
+            yield text[start:match.end()], offset + start, False
+            start = match.end()
+        offset += start
+        pending = [text[start:]]
+        pending_size = len(pending[0])
+        # Without any gap, wait for twice as much input before joining it again
+        needed = _BLOCK_SIZE if start else 2 * pending_size
+    yield "".join(pending), offset, True
+
+
+def _decode_block(block, offset, table, strategy, placeholder):
+    """
+    Decodes a block of Morse code, repairing the codes that match no character.
+
+    Returns:
+        tuple: (decoded text, list of Correction)
+    """
+    try:
+        return "".join(map(table.decode_lookup.__getitem__, block.replace("/", " / ").split())), []
+    except KeyError:
+        pass
+
+    decoded = []
+    corrections = []
+    for match in _TOKEN_RE.finditer(block):
+        code = match.group()
+        char = table.decode_lookup.get(code)
+        if char is None:
+            char, kind = recover_code(code, table, strategy, placeholder)
+            corrections.append(Correction(offset + match.start(), code, char, kind))
+        decoded.append(char)
+    return "".join(decoded), corrections
+
+
+def _dropped_separators(gaps, offset):
+    """Returns a correction for every word separator in a run of gaps"""
+    return [Correction(offset + i, "/", "", "dropped") for i, char in enumerate(gaps) if char == "/"]
+
+
+def iter_decode_recovering(chunks, strategy="nearest", placeholder=DEFAULT_PLACEHOLDER, table=None):
+    """
+    Converts noisy Morse code to text incrementally, repairing unknown codes.
+
+    Any whitespace separates letters, and word separators opening or closing
+    the message are dropped. Valid input decodes as it does with iter_decode.
+
+    Args:
+        chunks (iterable of str): Morse code to be decoded, in pieces of any size
+        strategy (str): "nearest" to repair unknown codes where possible, or
+            "placeholder" to replace every unknown code with the placeholder
+        placeholder (str): Text decoded for a code that is not repaired
+        table: Name of a code table, or a CodeTable (default: Latin)
+
+    Yields:
+        tuple: (decoded text, list of Correction made in it), block by block
+
+    Raises:
+        ValueError: If the input is empty, or the strategy is unknown
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown recovery strategy: {strategy}")
+    table = get_table(table)
+
+    is_first = True
+    for block, offset, is_last in _iter_blocks(chunks):
+        corrections = []
+        if is_first:
+            if is_last and not block:
+                raise ValueError("Input Morse code is empty")
+            body = block.lstrip(_GAP_CHARS)
+            corrections += _dropped_separators(block[:len(block) - len(body)], offset)
+            offset += len(block) - len(body)
+            block = body
+            is_first = False
+        tail = []
+        if is_last:
+            body = block.rstrip(_GAP_CHARS)
+            tail = _dropped_separators(block[len(body):], offset + len(body))
+            block = body
+        decoded, found = _decode_block(block, offset, table, strategy, placeholder)
+        yield decoded, corrections + found + tail
+
+
+def decode_recovering(morse_code, strategy="nearest", placeholder=DEFAULT_PLACEHOLDER, table=None):
+    """
+    Converts noisy Morse code to text, repairing unknown codes.
+
+    Args:
+        morse_code (str): Morse code to be decoded
+        strategy (str): "nearest" to repair unknown codes where possible, or
+            "placeholder" to replace every unknown code with the placeholder
+        placeholder (str): Text decoded for a code that is not repaired
+        table: Name of a code table, or a CodeTable (default: Latin)
+
+    Returns:
+        tuple: (decoded text, list of Correction in input order)
+
+    Raises:
+        ValueError: If the input is empty, or the strategy is unknown
+    """
+    decoded = []
+    corrections = []
+    for text, found in iter_decode_recovering([morse_code], strategy, placeholder, table):
+        decoded.append(text)
+        corrections.extend(found)
+    return "".join(decoded), corrections
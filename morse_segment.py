@@ -0,0 +1,305 @@
+"""
+Segmentation of Morse code received without letter and word gaps.
+
+A run of dots and dashes can be split into letters in a great many ways. The
+most likely splits are found with a Viterbi search over the positions of the
+input: every position keeps the k cheapest ways of reaching it, and is
+extended by each letter and, when a word list is given, each word whose code
+starts there, found in one walk down a trie of their codes.
+Letters are scored with unigram letter frequencies, and words with the
+frequencies of the word list, so the work grows linearly with the input.
+"""
+
+import math
+import re
+from array import array
+from bisect import insort
+from collections import namedtuple
+
+from morse_tables import get_table
+
+# Relative frequencies, in percent, of letters in English text. Symbols that
+# are not listed, such as digits and punctuation, are given _RARE_FREQUENCY.
+LETTER_FREQUENCIES = {
+    "E": 12.7, "T": 9.1, "A": 8.2, "O": 7.5, "I": 7.0, "N": 6.7, "S": 6.3,
+    "H": 6.1, "R": 6.0, "D": 4.3, "L": 4.0, "C": 2.8, "U": 2.8, "M": 2.4,
+    "W": 2.4, "F": 2.2, "G": 2.0, "Y": 2.0, "P": 1.9, "B": 1.5, "V": 1.0,
+    "K": 0.8, "J": 0.15, "X": 0.15, "Q": 0.1, "Z": 0.07,
+}
+_RARE_FREQUENCY = 0.01
+
+# Probability that a letter is spelled out rather than part of a listed word
+OOV_PROBABILITY = 1e-5
+
+_INVALID_RE = re.compile(r"[^.\-/\s]")
+_SYMBOL_VALUES = bytes.maketrans(b".-/", b"\x00\x01\x02")
+
+Candidate = namedtuple("Candidate", ["text", "log_probability"])
+Candidate.__doc__ = """
+A way of splitting gapless Morse code into text.
+
+Attributes:
+    text (str): The decoded text
+    log_probability (float): Natural logarithm of its probability under the
+        letter and word frequencies
+"""
+
+# Kinds of token on a path through the input
+_LETTER, _WORD, _GAP = range(3)
+
+
+def load_word_list(file_path):
+    """
+    Reads a word list, with one word per line optionally followed by its count.
+
+    Args:
+        file_path (str): Path to the word list
+
+    Returns:
+        dict: Upper-cased words mapped to their counts, 1 for words without one
+
+    Raises:
+        FileNotFoundError: If the file is not found
+        IOError: If there's an error reading the file
+        ValueError: If a count is not a number
+    """
+    words = {}
+    try:
+        with open(file_path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                fields = line.split()
+                if not fields:
+                    continue
+                try:
+                    count = float(fields[1]) if len(fields) > 1 else 1
+                except ValueError:
+                    raise ValueError(f"Invalid count '{fields[1]}' in word list (at line {line_number})") from None
+                word = fields[0].upper()
+                words[word] = words.get(word, 0) + count
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Word list not found: {file_path}")
+    except IOError:
+        raise IOError(f"Error reading file: {file_path}")
+    return words
+
+
+class Segmenter:
+    """
+    Splits Morse code without gaps into the most likely letters and words.
+
+    Building the letter trie and the word index takes time in proportion to
+    the word list, so a Segmenter is meant to be built once and reused.
+    Without a word list the input is split into letters only, as no word
+    boundaries can be told apart. With one, listed words are preferred and
+    any other letters are spelled out at a cost of OOV_PROBABILITY each.
+    """
+
+    def __init__(self, words=None, table=None, oov_probability=OOV_PROBABILITY):
+        """
+        Args:
+            words: Words to look for, as an iterable of words or a dict mapping
+                words to counts (see load_word_list), or None for letters only
+            table: Name of a code table, or a CodeTable (default: Latin)
+            oov_probability (float): Probability of a letter that is not part
+                of a listed word, used only with a word list
+        """
+        self.table = get_table(table)
+        letter_penalty = 0.0 if words is None else -math.log(oov_probability)
+
+        # Trie of the letter codes and gapless word codes. Node n has its dot
+        # child at _children[2 * n] and its dash child at _children[2 * n + 1],
+        # 0 where there is none, and _entries[n] lists the (cost, token, kind)
+        # of the letters and words spelled by the path to n, cheapest first.
+        self._children = array("i", [0, 0])
+        self._entries = [None]
+        weights = {char: LETTER_FREQUENCIES.get(char, _RARE_FREQUENCY) for char in self.table.morse_to_char.values()}
+        total = sum(weights.values())
+        for code, char in self.table.morse_to_char.items():
+            self._insert(code, (letter_penalty - math.log(weights[char] / total), char, _LETTER))
+
+        if words is not None:
+            counts = words if isinstance(words, dict) else dict.fromkeys(words, 1)
+            encoded = {}
+            for word, count in counts.items():
+                word = word.upper()
+                if not word or count <= 0 or " " in word or self.table.find_unsupported_char(word) is not None:
+                    continue
+                encoded[word] = encoded.get(word, 0) + count
+            total = sum(encoded.values())
+            for word, count in encoded.items():
+                code = "".join(map(self.table.char_to_morse.__getitem__, self.table.tokens(word))).replace(" ", "")
+                self._insert(code, (-math.log(count / total), word, _WORD))
+        for entries in self._entries:
+            if entries is not None:
+                entries.sort()
+
+    def _insert(self, code, entry):
+        """Adds a letter or word, as (cost, token, kind), to the trie under its code"""
+        node = 0
+        for symbol in code:
+            slot = 2 * node + (symbol == "-")
+            if not self._children[slot]:
+                self._children[slot] = len(self._entries)
+                self._children.extend((0, 0))
+                self._entries.append(None)
+            node = self._children[slot]
+        if self._entries[node] is None:
+            self._entries[node] = []
+        self._entries[node].append(entry)
+
+    def segment(self, morse_code, k=1):
+        """
+        Finds the most likely ways of splitting Morse code into text.
+
+        Whitespace is ignored, and a word separator is kept as a space that
+        no letter or word crosses.
+
+        Args:
+            morse_code (str): Dots and dashes, with or without some of their gaps
+            k (int): Number of candidates wanted
+
+        Returns:
+            list: Up to k Candidate, most likely first, with distinct texts
+
+        Raises:
+            ValueError: If the input is empty, contains anything but Morse code,
+                or cannot be split into letters
+        """
+        if not morse_code:
+            raise ValueError("Input Morse code is empty")
+        invalid = _INVALID_RE.search(morse_code)
+        if invalid is not None:
+            raise ValueError(f"Character '{invalid.group()}' is not Morse code (at offset {invalid.start()})")
+        if k < 1:
+            raise ValueError("At least one candidate must be asked for")
+
+        # Dots, dashes and word separators as 0, 1 and 2
+        symbols = "".join(morse_code.split()).encode("ascii").translate(_SYMBOL_VALUES)
+        size = len(symbols)
+        gap = [(0.0, " ", _GAP)]
+        children = self._children
+        trie_entries = self._entries
+
+        # paths[end] holds the k cheapest ways of reaching end, cheapest first,
+        # as (cost, start of the last token, rank of the path it extends,
+        # token, kind of token)
+        paths = [[] for _ in range(size + 1)]
+        paths[0].append((0.0, 0, 0, "", _GAP))
+        extend = _extend_best if k == 1 else _extend
+        for start in range(size):
+            before = paths[start]
+            if not before:
+                continue
+            if symbols[start] == 2:
+                extend(paths, start + 1, start, before, gap, k)
+                continue
+
+            node = 0
+            for end in range(start + 1, size + 1):
+                symbol = symbols[end - 1]
+                if symbol == 2:
+                    break
+                node = children[2 * node + symbol]
+                if not node:
+                    break
+                entries = trie_entries[node]
+                if entries is not None:
+                    extend(paths, end, start, before, entries, k)
+
+        if not paths[size]:
+            raise ValueError("Morse code cannot be split into letters of the code table")
+
+        candidates = []
+        seen = set()
+        for rank, path in enumerate(paths[size]):
+            text = _backtrack(paths, size, rank)
+            if text not in seen:
+                seen.add(text)
+                candidates.append(Candidate(text, -path[0]))
+        return candidates
+
+
+def _extend(paths, end, start, before, entries, k):
+    """
+    Extends the paths reaching a position by tokens, keeping the k cheapest.
+
+    Args:
+        paths (list): Paths reaching every position, cheapest first
+        end (int): Position the tokens end at
+        start (int): Position the tokens start at
+        before (list): Paths reaching start
+        entries (list): (cost, token, kind) of the tokens, cheapest first
+        k (int): Number of paths kept per position
+    """
+    target = paths[end]
+    for cost, token, kind in entries:
+        if len(target) == k and before[0][0] + cost >= target[-1][0]:
+            # Neither this token nor any costlier one improves on the kept paths
+            return
+        for rank, path in enumerate(before):
+            total = path[0] + cost
+            if len(target) == k:
+                if total >= target[-1][0]:
+                    break
+                target.pop()
+            insort(target, (total, start, rank, token, kind))
+
+
+def _extend_best(paths, end, start, before, entries, k):
+    """Does what _extend does when only the cheapest path is kept, in less time"""
+    cost, token, kind = entries[0]
+    total = before[0][0] + cost
+    target = paths[end]
+    if not target or total < target[0][0]:
+        paths[end] = [(total, start, 0, token, kind)]
+
+
+def _backtrack(paths, end, rank):
+    """
+    Rebuilds the text of a path, spacing words apart from what surrounds them.
+
+    Args:
+        paths (list): Paths reaching every position, as built by Segmenter.segment
+        end (int): Position the path ends at
+        rank (int): Rank of the path among those reaching end
+
+    Returns:
+        str: The decoded text
+    """
+    tokens = []
+    while end:
+        _, start, rank, token, kind = paths[end][rank]
+        tokens.append((token, kind))
+        end = start
+
+    pieces = []
+    previous = _GAP
+    for token, kind in reversed(tokens):
+        if pieces and _WORD in (kind, previous) and _GAP not in (kind, previous):
+            pieces.append(" ")
+        pieces.append(token)
+        previous = kind
+    return "".join(pieces)
+
+
+def segment(morse_code, words=None, k=1, table=None):
+    """
+    Finds the most likely ways of splitting Morse code without gaps into text.
+
+    Builds a Segmenter for the call; build one and reuse it to segment many
+    messages with the same word list.
+
+    Args:
+        morse_code (str): Dots and dashes, with or without some of their gaps
+        words: Words to look for, as an iterable or a dict of counts, or None
+        k (int): Number of candidates wanted
+        table: Name of a code table, or a CodeTable (default: Latin)
+
+    Returns:
+        list: Up to k Candidate, most likely first
+
+    Raises:
+        ValueError: If the input is empty, contains anything but Morse code,
+            or cannot be split into letters
+    """
+    return Segmenter(words, table).segment(morse_code, k)
@@ -0,0 +1,426 @@
+"""
+Long-running translation server and a client that reuses its connection.
+
+Keeping one process alive avoids paying for interpreter startup and imports
+on every message. The server listens on a Unix domain socket or a local TCP
+port and speaks line-delimited JSON: each request is one JSON object on one
+line, and each response is one JSON object on one line, in request order.
+
+Requests:
+    {"op": "encode", "text": "SOS", "skip_unknown": false}
+    {"op": "decode", "morse": "... --- ..."}
+
+Responses:
+    {"result": "... --- ..."}
+    {"error": "Character '#' cannot be converted to Morse code"}
+
+Two servers speak this protocol: make_server builds a thread-per-connection
+server, and AsyncMorseServer an asyncio server for many concurrent
+connections with bounded queues, backpressure and a worker pool for large
+requests.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import socketserver
+import stat
+from concurrent.futures import ProcessPoolExecutor
+
+from decode import decode_from_morse
+from encode import encode_to_morse
+from morse_cache import DEFAULT_CACHE_SIZE, WordCache
+
+# Port used when a TCP server is started without one
+DEFAULT_PORT = 7373
+
+# Limits of the asyncio server, in bytes of a request line or in requests
+DEFAULT_MAX_REQUEST_SIZE = 1 << 20
+DEFAULT_OFFLOAD_SIZE = 1 << 16
+DEFAULT_MAX_PENDING = 16
+
+# Connections the kernel may hold waiting to be accepted, so that a burst of
+# clients connecting at once is not reset
+_LISTEN_BACKLOG = 4096
+
+
+def handle_request(request, cache=None):
+    """
+    Carries out one decoded request.
+
+    Args:
+        request (dict): Request object, see the module docstring
+        cache (WordCache): Optional cache of word translations to reuse
+
+    Returns:
+        dict: Response object, with either "result" or "error"
+    """
+    try:
+        op = request.get("op")
+        if op == "encode":
+            result = encode_to_morse(request["text"], bool(request.get("skip_unknown")), cache)
+        elif op == "decode":
+            result = decode_from_morse(request["morse"], cache)
+        else:
+            return {"error": f"Unknown operation: {op}"}
+    except (KeyError, TypeError, AttributeError):
+        return {"error": "Malformed request"}
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"result": result}
+
+
+def _respond(response):
+    """Encodes a response object as a protocol line"""
+    return json.dumps(response).encode("utf-8") + b"\n"
+
+
+def handle_line(line, cache=None):
+    """
+    Carries out one request line and returns the response line.
+
+    Args:
+        line (bytes): One line of the protocol, with or without its newline
+        cache (WordCache): Optional cache of word translations to reuse
+
+    Returns:
+        bytes: The response, terminated by a newline
+    """
+    try:
+        request = json.loads(line)
+    except (ValueError, RecursionError):
+        # Deeply nested arrays or objects exhaust the recursion limit of the parser
+        response = {"error": "Request is not valid JSON"}
+    else:
+        if isinstance(request, dict):
+            response = handle_request(request, cache)
+        else:
+            response = {"error": "Malformed request"}
+    return _respond(response)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serves the requests of one connection until the client disconnects"""
+
+    def setup(self):
+        if self.request.family != getattr(socket, "AF_UNIX", None):
+            # Responses are small; send them without waiting for more data
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().setup()
+
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(handle_line(line, self.server.cache))
+                self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def _remove_stale_socket(socket_path):
+    """
+    Removes a socket file left behind by an earlier server.
+
+    Args:
+        socket_path (str): Path the server is about to listen on
+
+    Raises:
+        FileExistsError: If something other than a socket exists at the path
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"Not a socket, refusing to replace it: {socket_path}")
+    os.remove(socket_path)
+
+
+def make_server(socket_path=None, host="127.0.0.1", port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Creates a translation server, ready for serve_forever().
+
+    Each connection is served by its own thread, and all of them share one
+    word cache.
+
+    Args:
+        socket_path (str): Path of a Unix domain socket to listen on; if None, TCP is used
+        host (str): Address to listen on for TCP
+        port (int): Port to listen on for TCP, 0 for any free port
+        cache_size (int): Size of the shared word cache, 0 to disable it
+
+    Returns:
+        socketserver.BaseServer: The bound server
+
+    Raises:
+        OSError: If the server cannot listen, or a file other than a socket
+            exists at socket_path
+    """
+    if socket_path is not None:
+        _remove_stale_socket(socket_path)
+        server = _UnixServer(socket_path, _RequestHandler)
+    else:
+        server = _TCPServer((host, port), _RequestHandler)
+    server.cache = WordCache(cache_size) if cache_size else None
+    return server
+
+
+class AsyncMorseServer:
+    """
+    asyncio translation server for thousands of concurrent connections.
+
+    Each connection has a bounded queue of requests awaiting a response.
+    When it is full the connection is not read any further, so a client that
+    sends faster than it reads is slowed down by TCP flow control instead of
+    growing the server's memory. Responses are written in request order and
+    each write waits for the socket buffer to drain.
+
+    Requests up to offload_size bytes are translated on the event loop, which
+    is quicker than handing them off. Larger ones run in a pool of worker
+    processes, at most two per worker at a time, so a huge decode never
+    holds up small requests on other connections. Lines longer than
+    max_request_size are discarded unread and answered with an error.
+    """
+
+    def __init__(self, socket_path=None, host="127.0.0.1", port=DEFAULT_PORT,
+                 cache_size=DEFAULT_CACHE_SIZE, max_request_size=DEFAULT_MAX_REQUEST_SIZE,
+                 offload_size=DEFAULT_OFFLOAD_SIZE, max_pending=DEFAULT_MAX_PENDING, workers=None):
+        """
+        Args:
+            socket_path (str): Path of a Unix domain socket to listen on; if None, TCP is used
+            host (str): Address to listen on for TCP
+            port (int): Port to listen on for TCP, 0 for any free port
+            cache_size (int): Size of the word cache for small requests, 0 to disable it
+            max_request_size (int): Longest request line accepted, in bytes
+            offload_size (int): Request lines longer than this run in the worker pool
+            max_pending (int): Requests queued per connection before it stops being read
+            workers (int): Number of worker processes, defaults to the number of CPUs
+        """
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.cache = WordCache(cache_size) if cache_size else None
+        self.max_request_size = max_request_size
+        self.offload_size = offload_size
+        self.max_pending = max_pending
+        self.workers = workers or os.cpu_count() or 1
+        self._server = None
+        self._executor = None
+        self._offload_slots = None
+        self._reads = set()
+        self._connections = set()
+        self._closing = False
+
+    @property
+    def address(self):
+        """The socket path, or the (host, port) pair the server is bound to"""
+        if self.socket_path is not None:
+            return self.socket_path
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self):
+        """
+        Binds the socket and starts accepting connections.
+
+        Raises:
+            OSError: If the server cannot listen, or a file other than a
+                socket exists at socket_path
+        """
+        if self.socket_path is not None:
+            _remove_stale_socket(self.socket_path)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._offload_slots = asyncio.Semaphore(2 * self.workers)
+        # The stream limit is what makes readuntil refuse oversized lines
+        limit = self.max_request_size + 1
+        if self.socket_path is not None:
+            self._server = await asyncio.start_unix_server(self._serve_connection, self.socket_path,
+                                                           limit=limit, backlog=_LISTEN_BACKLOG)
+        else:
+            self._server = await asyncio.start_server(self._serve_connection, self.host, self.port,
+                                                      limit=limit, backlog=_LISTEN_BACKLOG)
+
+    async def shutdown(self, timeout=5.0):
+        """
+        Stops the server gracefully.
+
+        New connections are refused and no further requests are read, but
+        requests already received are answered before their connection closes.
+
+        Args:
+            timeout (float): Seconds to wait for connections to finish
+        """
+        self._closing = True
+        self._server.close()
+        for read in list(self._reads):
+            read.cancel()
+        if self._connections:
+            await asyncio.wait(list(self._connections), timeout=timeout)
+        await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _serve_connection(self, reader, writer):
+        self._connections.add(asyncio.current_task())
+        queue = asyncio.Queue(self.max_pending)
+        responder = asyncio.create_task(self._write_responses(queue, writer))
+        try:
+            while not self._closing and not responder.done():
+                read = asyncio.ensure_future(self._read_line(reader))
+                self._reads.add(read)
+                try:
+                    line = await read
+                except asyncio.CancelledError:
+                    if not read.cancelled():
+                        raise
+                    break
+                finally:
+                    self._reads.discard(read)
+                if line is None:
+                    break
+                if not line or line.strip():
+                    # Blocks while the queue is full, which stops reading
+                    await queue.put(await self._dispatch(line))
+        except ConnectionError:
+            pass
+        finally:
+            await queue.put(None)
+            await responder
+            writer.close()
+            self._connections.discard(asyncio.current_task())
+
+    async def _read_line(self, reader):
+        """
+        Reads one request line.
+
+        Returns:
+            bytes: The line, b"" if it was too long and has been discarded, or
+                None at the end of the stream
+        """
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial or None
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+
+        # Throw the rest of the oversized line away without buffering it
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return b""
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                consumed = e.consumed
+
+    async def _dispatch(self, line):
+        """Starts processing a request and returns a future of its response line"""
+        loop = asyncio.get_running_loop()
+        if not line:
+            response = loop.create_future()
+            response.set_result(_respond({"error": f"Request exceeds {self.max_request_size} bytes"}))
+        elif len(line) <= self.offload_size:
+            response = loop.create_future()
+            response.set_result(handle_line(line, self.cache))
+        else:
+            await self._offload_slots.acquire()
+            response = loop.run_in_executor(self._executor, handle_line, line)
+            response.add_done_callback(lambda _: self._offload_slots.release())
+        return response
+
+    async def _write_responses(self, queue, writer):
+        """Writes response lines in request order until None is queued"""
+        while True:
+            response = await queue.get()
+            if response is None:
+                return
+            try:
+                line = await response
+            except Exception:
+                # A worker process died or the pool was shut down
+                line = _respond({"error": "Request could not be processed"})
+            try:
+                writer.write(line)
+                await writer.drain()
+            except ConnectionError:
+                # The client is gone; keep draining the queue so the reader is not blocked
+                continue
+
+
+class MorseClient:
+    """
+    Client for the translation server that keeps one connection open.
+
+    Usable as a context manager, which closes the connection on exit.
+    """
+
+    def __init__(self, socket_path=None, host="127.0.0.1", port=DEFAULT_PORT):
+        """
+        Args:
+            socket_path (str): Path of the server's Unix domain socket; if None, TCP is used
+            host (str): Address of the server for TCP
+            port (int): Port of the server for TCP
+        """
+        if socket_path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rwb")
+
+    def _call(self, request):
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise IOError("Connection closed by the server")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def encode(self, text, skip_unknown=False):
+        """
+        Converts English text to Morse code on the server.
+
+        Args:
+            text (str): Text to be encoded
+            skip_unknown (bool): If True, unknown characters will be skipped instead of raising an error
+
+        Returns:
+            str: Morse code representation
+        """
+        return self._call({"op": "encode", "text": text, "skip_unknown": skip_unknown})
+
+    def decode(self, morse_code):
+        """
+        Converts Morse code to English text on the server.
+
+        Args:
+            morse_code (str): Morse code to be decoded
+
+        Returns:
+            str: Decoded English text
+        """
+        return self._call({"op": "decode", "morse": morse_code})
+
+    def close(self):
+        """Closes the connection"""
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
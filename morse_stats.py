@@ -0,0 +1,254 @@
+"""
+Instrumentation of translation jobs: where the time goes, and how much is done.
+
+A Recorder times the stages of a job (reading, validating, translating,
+writing) by wrapping the chunk iterators that connect them, so the library
+functions themselves are never touched. When no Recorder is used nothing is
+wrapped, and a job runs exactly as it would without this module.
+"""
+
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where peak memory is not reported
+    resource = None
+
+
+class StageStats:
+    """
+    Running totals for one stage of a job.
+
+    Attributes:
+        name (str): Name of the stage
+        seconds (float): Wall time spent in the stage itself, not counting the
+            stages it pulls its input from
+        chars (int): Characters the stage produced
+        bytes (int): Size of those characters in UTF-8
+        calls (int): Number of chunks produced, or calls timed
+    """
+
+    __slots__ = ("name", "seconds", "chars", "bytes", "calls")
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Name of the stage
+        """
+        self.name = name
+        self.seconds = 0.0
+        self.chars = 0
+        self.bytes = 0
+        self.calls = 0
+
+    def __repr__(self):
+        return f"StageStats({self.name!r}, seconds={self.seconds:.6f}, chars={self.chars}, bytes={self.bytes})"
+
+    @property
+    def chars_per_second(self):
+        """Characters produced per second spent in the stage, or None if no time was measured"""
+        return self.chars / self.seconds if self.seconds > 0 else None
+
+    def count(self, chunk):
+        """Adds a chunk of text or bytes to the totals"""
+        self.calls += 1
+        self.chars += len(chunk)
+        if isinstance(chunk, str) and not chunk.isascii():
+            self.bytes += len(chunk.encode("utf-8", "surrogatepass"))
+        else:
+            self.bytes += len(chunk)
+
+
+class Recorder:
+    """
+    Collects the time, volume and unknown symbols of each stage of a job.
+
+    Stages are timed as they pull chunks from one another, so a stage that
+    consumes another stage's output is only charged for its own work. An
+    optional callback is told about every chunk, to follow a long job as it
+    runs.
+
+    Attributes:
+        stages (dict): StageStats by stage name, in the order they were first wrapped or called
+        unknown (int): Symbols that could not be translated, as counted by
+            the unknown= functions given to wrap, plus those added with add_unknown
+    """
+
+    def __init__(self, callback=None):
+        """
+        Args:
+            callback (callable): Called as callback(stats) with the StageStats
+                of a stage each time it produces a chunk or completes a call
+        """
+        self.stages = {}
+        self.unknown = 0
+        self._callback = callback
+        self._running = []  # Stages timing a chunk right now, innermost last
+        self._started = time.perf_counter()
+
+    def __getitem__(self, name):
+        return self._stage(name)
+
+    def _stage(self, name):
+        """Returns the StageStats of a stage, creating it on first use"""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        return stats
+
+    def _enter(self, stats):
+        """Starts timing a stage, returning the start time"""
+        self._running.append(stats)
+        return time.perf_counter()
+
+    def _leave(self, stats, started):
+        """Stops timing a stage, and takes its time off the stage it ran inside"""
+        elapsed = time.perf_counter() - started
+        self._running.pop()
+        stats.seconds += elapsed
+        if self._running:
+            self._running[-1].seconds -= elapsed
+
+    def wrap(self, name, chunks, consumer=None, unknown=None):
+        """
+        Times the production of chunks by a stage.
+
+        Args:
+            name (str): Name of the stage producing the chunks
+            chunks (iterable): Chunks of text or bytes produced by the stage
+            consumer (str): Name of the stage consuming the chunks, which is
+                charged for the time between chunks; only for the last stage
+                of a job, as nothing times the consumer otherwise
+            unknown (callable): Returns the number of unknown symbols in a chunk
+
+        Returns:
+            iterator: The chunks, unchanged
+        """
+        stats = self._stage(name)
+        consumer_stats = self._stage(consumer) if consumer is not None else None
+        return self._timed(stats, consumer_stats, iter(chunks), unknown)
+
+    def _timed(self, stats, consumer_stats, iterator, unknown):
+        """Yields the chunks of a stage, timing each one (see wrap)"""
+        while True:
+            started = self._enter(stats)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._leave(stats, started)
+
+            stats.count(chunk)
+            if unknown is not None:
+                self.unknown += unknown(chunk)
+            if self._callback is not None:
+                self._callback(stats)
+
+            if consumer_stats is None:
+                yield chunk
+                continue
+            started = self._enter(consumer_stats)
+            try:
+                yield chunk
+            finally:
+                self._leave(consumer_stats, started)
+            consumer_stats.count(chunk)
+            if self._callback is not None:
+                self._callback(consumer_stats)
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        Times one call of a function as a stage, such as validate_english_text.
+
+        The size of the first argument, if it has one, is counted as processed.
+
+        Args:
+            name (str): Name of the stage
+            func (callable): Function to call
+            *args, **kwargs: Arguments of the call
+
+        Returns:
+            The result of the call
+        """
+        stats = self._stage(name)
+        started = self._enter(stats)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._leave(stats, started)
+            if args and isinstance(args[0], (str, bytes, bytearray)):
+                stats.count(args[0])
+            else:
+                stats.calls += 1
+            if self._callback is not None:
+                self._callback(stats)
+
+    def add_unknown(self, count):
+        """Adds to the number of symbols that could not be translated"""
+        self.unknown += count
+
+    def elapsed(self):
+        """Returns the wall time since the recorder was created, in seconds"""
+        return time.perf_counter() - self._started
+
+    def report(self):
+        """
+        Formats the totals as a table.
+
+        Returns:
+            str: One line per stage, then the total time, unknown symbols and
+                the peak memory of the process, if it can be measured
+        """
+        lines = [f"{'stage':<12} {'seconds':>10} {'chars':>12} {'bytes':>12} {'chars/s':>12}"]
+        for stats in self.stages.values():
+            rate = stats.chars_per_second
+            rate = f"{rate:>12.4g}" if rate is not None else f"{'-':>12}"
+            lines.append(f"{stats.name:<12} {stats.seconds:>10.4f} {stats.chars:>12} {stats.bytes:>12} {rate}")
+        lines.append(f"{'total':<12} {self.elapsed():>10.4f}")
+        lines.append(f"unknown symbols: {self.unknown}")
+        peak = peak_memory()
+        if peak is not None:
+            lines.append(f"peak memory: {peak / 1e6:.1f} MB")
+        return "\n".join(lines)
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of the process so far.
+
+    Returns:
+        int: Peak memory in bytes, or None where it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_profiled(path, func, *args, **kwargs):
+    """
+    Runs a function under cProfile and writes the profile to a file.
+
+    The file can be read with pstats, for example with
+    python -m pstats PATH.
+
+    Args:
+        path (str): Path to write the profile to
+        func (callable): Function to profile
+        *args, **kwargs: Arguments of the call
+
+    Returns:
+        The result of the call
+    """
+    # Imported here, as it is only needed when profiling
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
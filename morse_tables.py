@@ -0,0 +1,314 @@
+"""
+Registry of Morse code tables.
+
+Besides the default Latin table, tables for prosigns, Cyrillic, Greek and
+Japanese Wabun are available, and more can be added with register_table.
+A table is only built the first time it is asked for, and its lookup
+structures (translation dicts, validation patterns and decode tree) are
+compiled once and reused by the encoder, the decoder and word caches.
+"""
+
+import re
+
+from morse_utils import CHAR_TO_MORSE, build_morse_tree
+
+DEFAULT_TABLE = "latin"
+
+# Loaders of the registered tables by name, and the tables compiled so far
+_LOADERS = {}
+_TABLES = {}
+
+
+class CodeTable:
+    """
+    A Morse code table compiled into the lookup structures of the engine.
+
+    Characters are upper-cased before they are looked up, so tables list
+    upper-case characters only. A symbol may be longer than one character,
+    as prosigns such as "<SK>" are. When several symbols share a code, the
+    first one listed is the one that code decodes to, and symbols whose code
+    holds several letters (separated by spaces) are only encoded.
+
+    Attributes:
+        name (str): Name the table is registered under
+        char_to_morse (dict): Symbols mapped to their Morse code
+        morse_to_char (dict): Letter codes mapped to the symbol they decode to
+        encode_lookup (dict): char_to_morse plus a space mapped to the word separator "/"
+        decode_lookup (dict): morse_to_char plus "" mapped to "" and "/" mapped
+            to a space, the tokens of splitting "/"-padded Morse code on single spaces
+        tree (list): morse_to_char as a Morse binary tree (see morse_utils.build_morse_tree)
+    """
+
+    def __init__(self, name, char_to_morse):
+        """
+        Args:
+            name (str): Name of the table
+            char_to_morse (dict): Symbols mapped to their Morse code
+        """
+        self.name = name
+        self.char_to_morse = dict(char_to_morse)
+        self.morse_to_char = {}
+        for char, code in self.char_to_morse.items():
+            if " " not in code:
+                self.morse_to_char.setdefault(code, char)
+
+        self.encode_lookup = dict(self.char_to_morse)
+        self.encode_lookup[" "] = "/"
+        self.decode_lookup = dict(self.morse_to_char)
+        self.decode_lookup[""] = ""
+        self.decode_lookup["/"] = " "
+        self.tree = build_morse_tree(self.morse_to_char)
+
+        chars = re.escape("".join(char for char in self.char_to_morse if len(char) == 1))
+        symbols = sorted((char for char in self.char_to_morse if len(char) > 1), key=len, reverse=True)
+        if symbols:
+            # Longer symbols are matched first, and consumed whole, so that the
+            # characters inside them are never taken for unknown ones
+            alternatives = "|".join(map(re.escape, symbols))
+            self._token_re = re.compile(f"{alternatives}|.", re.DOTALL)
+            self._invalid_char_re = re.compile(f"(?:{alternatives})|([^ {chars}])")
+            self._unknown_run_re = re.compile(f"({alternatives})|(?:(?!{alternatives})[^{chars}])+")
+        else:
+            self._token_re = None
+            self._invalid_char_re = re.compile(f"[^ {chars}]")
+            self._unknown_run_re = re.compile(f"[^{chars}]+")
+
+    def __repr__(self):
+        return f"CodeTable({self.name!r})"
+
+    def __reduce__(self):
+        # Worker processes look the table up by name and compile it themselves
+        return get_table, (self.name,)
+
+    def tokens(self, text):
+        """
+        Splits upper-cased text into the symbols of the table.
+
+        Args:
+            text (str): Text made of supported symbols and spaces
+
+        Returns:
+            iterable: The symbols and spaces of the text, in order
+        """
+        return text if self._token_re is None else self._token_re.findall(text)
+
+    def find_unsupported_char(self, text):
+        """
+        Finds the first character that is not part of a symbol of the table.
+
+        Args:
+            text (str): Upper-cased text to be scanned
+
+        Returns:
+            str: The offending character, or None if every character is supported
+        """
+        if self._token_re is None:
+            match = self._invalid_char_re.search(text)
+            return match.group() if match else None
+        for match in self._invalid_char_re.finditer(text):
+            if match.group(1) is not None:
+                return match.group(1)
+        return None
+
+    def count_unsupported_chars(self, text):
+        """
+        Counts the characters, other than whitespace, that are not part of a symbol of the table.
+
+        Args:
+            text (str): Upper-cased text to be scanned
+
+        Returns:
+            int: Number of unsupported characters
+        """
+        if self._token_re is None:
+            return sum(not char.isspace() for char in self._invalid_char_re.findall(text))
+        return sum(not match.group(1).isspace() for match in self._invalid_char_re.finditer(text)
+                   if match.group(1) is not None)
+
+    def replace_unknown(self, text):
+        """
+        Replaces every run of unsupported characters with a space.
+
+        Args:
+            text (str): Upper-cased text
+
+        Returns:
+            str: Text containing only supported symbols and spaces
+        """
+        if self._token_re is None:
+            return self._unknown_run_re.sub(" ", text)
+        return self._unknown_run_re.sub(_keep_symbol, text)
+
+
+def _keep_symbol(match):
+    """Keeps a multi-character symbol and turns a run of unknown characters into a space"""
+    return match.group(1) or " "
+
+
+def register_table(name, loader):
+    """
+    Registers a code table to be built the first time it is asked for.
+
+    Args:
+        name (str): Name of the table, as given to --table
+        loader (callable): Returns a dict mapping upper-case symbols to Morse code
+    """
+    _LOADERS[name] = loader
+    _TABLES.pop(name, None)
+
+
+def table_names():
+    """
+    Lists the registered code tables.
+
+    Returns:
+        list: Names of the tables, sorted
+    """
+    return sorted(_LOADERS)
+
+
+def get_table(table=None):
+    """
+    Returns a compiled code table, building it on first use.
+
+    Args:
+        table: Name of a registered table, a CodeTable, or None for the default table
+
+    Returns:
+        CodeTable: The compiled table
+
+    Raises:
+        ValueError: If no table is registered under that name
+    """
+    if isinstance(table, CodeTable):
+        return table
+    name = DEFAULT_TABLE if table is None else table
+    try:
+        return _TABLES[name]
+    except KeyError:
+        pass
+    if name not in _LOADERS:
+        raise ValueError(f"Unknown code table: {name} (available: {', '.join(table_names())})")
+    compiled = _TABLES[name] = CodeTable(name, _LOADERS[name]())
+    return compiled
+
+
+def _latin():
+    """International Morse code, as in morse_utils.CHAR_TO_MORSE"""
+    return CHAR_TO_MORSE
+
+
+def _with_common(letters):
+    """
+    Adds the digits and punctuation of the Latin table to a table of letters.
+
+    Args:
+        letters (dict): Letters of an alphabet mapped to their Morse code
+
+    Returns:
+        dict: The letters, followed by the Latin symbols other than letters
+            whose codes are not taken by a letter
+    """
+    table = dict(letters)
+    taken = set(letters.values())
+    for char, code in CHAR_TO_MORSE.items():
+        if not char.isalpha() and code not in taken:
+            table[char] = code
+    return table
+
+
+def _prosigns():
+    """International Morse code with procedural signals, which take precedence when decoding"""
+    table = {
+        "<AR>": ".-.-.",
+        "<AS>": ".-...",
+        "<BK>": "-...-.-",
+        "<BT>": "-...-",
+        "<CL>": "-.-..-..",
+        "<CT>": "-.-.-",
+        "<DO>": "-..---",
+        "<HH>": "........",
+        "<KN>": "-.--.",
+        "<SK>": "...-.-",
+        "<SN>": "...-.",
+        "<SOS>": "...---...",
+    }
+    table.update(CHAR_TO_MORSE)
+    return table
+
+
+def _cyrillic():
+    """Russian Morse code"""
+    return _with_common({
+        "А": ".-", "Б": "-...", "В": ".--", "Г": "--.", "Д": "-..", "Е": ".",
+        "Ж": "...-", "З": "--..", "И": "..", "Й": ".---", "К": "-.-", "Л": ".-..",
+        "М": "--", "Н": "-.", "О": "---", "П": ".--.", "Р": ".-.", "С": "...",
+        "Т": "-", "У": "..-", "Ф": "..-.", "Х": "....", "Ц": "-.-.", "Ч": "---.",
+        "Ш": "----", "Щ": "--.-", "Ъ": "--.--", "Ы": "-.--", "Ь": "-..-", "Э": "..-..",
+        "Ю": "..--", "Я": ".-.-", "Ё": ".",
+    })
+
+
+def _greek():
+    """Greek Morse code, with accented letters encoded as the plain ones"""
+    import unicodedata
+
+    table = _with_common({
+        "Α": ".-", "Β": "-...", "Γ": "--.", "Δ": "-..", "Ε": ".", "Ζ": "--..",
+        "Η": "....", "Θ": "-.-.", "Ι": "..", "Κ": "-.-", "Λ": ".-..", "Μ": "--",
+        "Ν": "-.", "Ξ": "-..-", "Ο": "---", "Π": ".--.", "Ρ": ".-.", "Σ": "...",
+        "Τ": "-", "Υ": "-.--", "Φ": "..-.", "Χ": "----", "Ψ": "--.-", "Ω": ".--",
+    })
+    for point in range(0x0386, 0x03B0):
+        base = unicodedata.normalize("NFD", chr(point))[0]
+        if base != chr(point) and base in table:
+            table[chr(point)] = table[base]
+    return table
+
+
+def _wabun():
+    """
+    Japanese Wabun code for katakana.
+
+    Hiragana are encoded as the matching katakana, small kana as the full-size
+    ones, and kana with voicing marks as the plain kana followed by the code
+    of the mark.
+    """
+    import unicodedata
+
+    table = {
+        "イ": ".-", "ロ": ".-.-", "ハ": "-...", "ニ": "-.-.", "ホ": "-..", "ヘ": ".",
+        "ト": "..-..", "チ": "..-.", "リ": "--.", "ヌ": "....", "ル": "-.--.", "ヲ": ".---",
+        "ワ": "-.-", "カ": ".-..", "ヨ": "--", "タ": "-.", "レ": "---", "ソ": "---.",
+        "ツ": ".--.", "ネ": "--.-", "ナ": ".-.", "ラ": "...", "ム": "-", "ウ": "..-",
+        "ヰ": ".-..-", "ノ": "..--", "オ": ".-...", "ク": "...-", "ヤ": ".--", "マ": "-..-",
+        "ケ": "-.--", "フ": "--..", "コ": "----", "エ": "-.---", "テ": ".-.--", "ア": "--.--",
+        "サ": "-.-.-", "キ": "-.-..", "ユ": "-..--", "メ": "-...-", "ミ": "..-.-", "シ": "--.-.",
+        "ヱ": ".--..", "ヒ": "--..-", "モ": "-..-.", "セ": ".---.", "ス": "---.-", "ン": ".-.-.",
+        "゛": "..", "゜": "..--.", "ー": ".--.-", "、": ".-.-.-", "。": ".-.-..",
+        "（": "-.--.-", "）": ".-..-.",
+    }
+    table = _with_common(table)
+    marks = {"゙": table["゛"], "゚": table["゜"]}
+    for start in (0x30A1, 0x3041):  # Katakana, then hiragana
+        for point in range(start, start + 0x56):
+            char = chr(point)
+            kana = chr(point + 0x60) if start == 0x3041 else char
+            if kana in table and char not in table:
+                table[char] = table[kana]
+            name = unicodedata.name(kana, "")
+            if " SMALL " in name and char not in table:
+                full = unicodedata.lookup(name.replace(" SMALL ", " "))
+                if full in table:
+                    table[char] = table[full]
+            base, *mark = unicodedata.normalize("NFD", char)
+            if mark and base in table and mark[0] in marks and char not in table:
+                table[char] = f"{table[base]} {marks[mark[0]]}"
+    return table
+
+
+register_table("latin", _latin)
+register_table("prosigns", _prosigns)
+register_table("cyrillic", _cyrillic)
+register_table("greek", _greek)
+register_table("wabun", _wabun)
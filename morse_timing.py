@@ -0,0 +1,273 @@
+"""
+On/off keying timelines for Morse code, and their reading back.
+
+Morse code as the encoder writes it is turned into run-length timing events:
+alternating key-down and key-up durations, starting with a key-down, in
+milliseconds or in dots ("units"). Timing follows the PARIS standard and the
+Farnsworth stretching of gaps used for audio (see morse_audio). Durations are
+rounded so that the rounding never adds up: every event ends at the exact
+time of the timeline, rounded.
+
+Events are produced one letter code at a time, so a timeline of any length
+can be streamed to a keyer. Reading back classifies each duration against
+thresholds halfway between the expected lengths, so a timeline sent at a
+known speed decodes exactly even with some jitter.
+
+In text form, as written by encode.py --format timing, events are signed
+integers separated by whitespace: positive for key-down and negative for
+key-up.
+"""
+
+import re
+from array import array
+
+from morse_audio import DEFAULT_WPM, element_durations
+
+# Units in which durations are given: milliseconds, or dots
+UNITS = ("ms", "units")
+
+# Number of events gathered into each chunk of Morse code or text produced
+_CHUNK_EVENTS = 4096
+
+_GAP_CHARS = " /\t\n\r\x0b\x0c"
+_SPACE_CHARS = " \t\n\r\x0b\x0c"
+_TOKEN_RE = re.compile(r"[.-]+|/|[^\s/.-]")
+_EVENT_RE = re.compile(r"\S+")
+
+
+def timing_units(wpm=DEFAULT_WPM, farnsworth_wpm=None, unit="ms"):
+    """
+    Computes the length of a dot and of the gaps between letters and words.
+
+    Args:
+        wpm (float): Speed at which letters are sent, in words per minute
+        farnsworth_wpm (float): Slower overall speed to stretch the gaps to, if any
+        unit (str): "ms" for milliseconds, or "units" for dots
+
+    Returns:
+        tuple: (dot, letter_gap, word_gap) in the unit
+
+    Raises:
+        ValueError: If the unit is unknown, a speed is not positive, or the
+            Farnsworth speed exceeds wpm
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown timing unit: {unit}")
+    dot, letter_gap, word_gap = element_durations(wpm, farnsworth_wpm)
+    scale = 1000 if unit == "ms" else 1 / dot
+    return dot * scale, letter_gap * scale, word_gap * scale
+
+
+def _iter_tokens(morse_chunks):
+    """
+    Splits chunks of Morse code into letter codes, word separators and
+    invalid characters, holding back a code split between chunks.
+    """
+    pending = ""
+    for chunk in morse_chunks:
+        text = pending + chunk
+        cut = max(map(text.rfind, _GAP_CHARS)) + 1
+        pending = text[cut:]
+        yield from _TOKEN_RE.findall(text, 0, cut)
+    yield from _TOKEN_RE.findall(pending)
+
+
+def iter_timing(morse_chunks, wpm=DEFAULT_WPM, farnsworth_wpm=None, unit="ms"):
+    """
+    Converts Morse code to keying events, one letter code at a time.
+
+    Any whitespace separates letters, and a word separator opening or closing
+    the Morse code adds no gap, as the key is up before and after a message.
+
+    Args:
+        morse_chunks (iterable of str): Morse code as written by the encoder, in pieces of any size
+        wpm (float): Speed at which letters are sent, in words per minute
+        farnsworth_wpm (float): Slower overall speed to stretch the gaps to, if any
+        unit (str): "ms" for milliseconds, or "units" for dots
+
+    Yields:
+        tuple: (is_down, duration) for each event, alternating and starting
+            with a key-down; durations are integers in the unit
+
+    Raises:
+        ValueError: If the timing is invalid, or the Morse code contains a
+            character other than ".- /" and whitespace
+    """
+    dot, letter_gap, word_gap = timing_units(wpm, farnsworth_wpm, unit)
+    lengths = {".": dot, "-": 3 * dot}
+    clock = 0.0   # Exact time at which the events so far end
+    emitted = 0   # The same time, rounded
+    gap = None    # Key-up time owed before the next element, None before the first
+    for token in _iter_tokens(morse_chunks):
+        if token == "/":
+            if gap is not None:
+                gap = word_gap
+            continue
+        if token[0] not in ".-":
+            raise ValueError(f"Character '{token}' is not a Morse code symbol")
+        for symbol in token:
+            if gap is not None:
+                clock += gap
+                end = round(clock)
+                yield False, end - emitted
+                emitted = end
+            clock += lengths[symbol]
+            end = round(clock)
+            yield True, end - emitted
+            emitted = end
+            gap = dot
+        gap = letter_gap
+
+
+def timing_array(morse_chunks, wpm=DEFAULT_WPM, farnsworth_wpm=None, unit="ms"):
+    """
+    Converts Morse code to a compact buffer of keying durations.
+
+    Args:
+        morse_chunks (iterable of str): Morse code as written by the encoder, in pieces of any size
+        wpm (float): Speed at which letters are sent, in words per minute
+        farnsworth_wpm (float): Slower overall speed to stretch the gaps to, if any
+        unit (str): "ms" for milliseconds, or "units" for dots
+
+    Returns:
+        array: array('H') of durations, key-down at even indexes and key-up at odd ones
+
+    Raises:
+        ValueError: If the timing is invalid, the Morse code contains a
+            character other than ".- /" and whitespace, or a duration does not
+            fit in 16 bits
+    """
+    durations = array("H")
+    try:
+        durations.extend(duration for _, duration in iter_timing(morse_chunks, wpm, farnsworth_wpm, unit))
+    except OverflowError:
+        raise ValueError("Timing event too long for a 16-bit buffer") from None
+    return durations
+
+
+def array_events(durations):
+    """
+    Turns a buffer of durations, as built by timing_array, back into events.
+
+    Args:
+        durations (iterable of int): Durations, key-down at even indexes and key-up at odd ones
+
+    Yields:
+        tuple: (is_down, duration) for each event
+    """
+    is_down = True
+    for duration in durations:
+        yield is_down, duration
+        is_down = not is_down
+
+
+def format_timing(events):
+    """
+    Writes keying events as text, positive for key-down and negative for key-up.
+
+    Args:
+        events (iterable of tuple): (is_down, duration) events, such as from iter_timing
+
+    Yields:
+        str: Consecutive pieces of the events, separated by spaces
+    """
+    separator = ""
+    pieces = []
+    for is_down, duration in events:
+        pieces.append(str(duration) if is_down else f"-{duration}")
+        if len(pieces) == _CHUNK_EVENTS:
+            yield separator + " ".join(pieces)
+            separator = " "
+            pieces = []
+    if pieces:
+        yield separator + " ".join(pieces)
+
+
+def parse_timing(chunks):
+    """
+    Reads keying events written by format_timing, one chunk at a time.
+
+    Args:
+        chunks (iterable of str): Signed durations separated by whitespace, in pieces of any size
+
+    Yields:
+        tuple: (is_down, duration) for each event
+
+    Raises:
+        ValueError: If a piece of the text is not an integer
+    """
+    pending = ""
+    offset = 0  # Position of pending in the whole text
+    for chunk in chunks:
+        text = pending + chunk
+        cut = max(map(text.rfind, _SPACE_CHARS)) + 1
+        yield from _parse_events(text[:cut], offset)
+        offset += cut
+        pending = text[cut:]
+    yield from _parse_events(pending, offset)
+
+
+def _parse_events(text, offset):
+    """Parses the signed durations of a piece of text, whose position in the whole text is offset"""
+    try:
+        values = list(map(int, text.split()))
+    except ValueError:
+        # Only now are the tokens searched, to report where the bad one is
+        for match in _EVENT_RE.finditer(text):
+            try:
+                int(match.group())
+            except ValueError:
+                raise ValueError(f"Invalid timing event '{match.group()}' (at offset {offset + match.start()})") from None
+    # A zero duration is read as a key-down, whatever its sign, which does not
+    # matter as zero durations are skipped when decoding
+    return zip(map((0).__le__, values), map(abs, values))
+
+
+def iter_timing_morse(events, wpm=DEFAULT_WPM, farnsworth_wpm=None, unit="ms"):
+    """
+    Converts keying events back to Morse code, for the decoder.
+
+    Consecutive events of the same kind, and zero durations, are merged, and
+    the key-up time before the first key-down and after the last is ignored.
+    A key-down longer than two dots is a dash, and a key-up is a gap inside a
+    letter, between letters or between words according to which expected
+    length it is nearest to.
+
+    Args:
+        events (iterable of tuple): (is_down, duration) events, such as from iter_timing
+        wpm (float): Speed at which letters were sent, in words per minute
+        farnsworth_wpm (float): Slower overall speed the gaps were stretched to, if any
+        unit (str): "ms" for milliseconds, or "units" for dots
+
+    Yields:
+        str: Consecutive chunks of Morse code, as the encoder writes it
+
+    Raises:
+        ValueError: If the timing is invalid
+    """
+    dot, letter_gap, word_gap = timing_units(wpm, farnsworth_wpm, unit)
+    dash_threshold = 2 * dot
+    letter_threshold = (dot + letter_gap) / 2
+    word_threshold = (letter_gap + word_gap) / 2
+
+    symbols = []
+    is_down = None  # Kind of the current run, None before the first key-down
+    length = 0
+    for down, duration in events:
+        if not duration or (is_down is None and not down):
+            continue
+        if down == is_down:
+            length += duration
+            continue
+        if is_down:
+            symbols.append("-" if length > dash_threshold else ".")
+        elif is_down is not None and length > letter_threshold:
+            symbols.append(" / " if length > word_threshold else " ")
+        if len(symbols) >= _CHUNK_EVENTS:
+            yield "".join(symbols)
+            symbols = []
+        is_down, length = down, duration
+    if is_down:
+        symbols.append("-" if length > dash_threshold else ".")
+    if symbols:
+        yield "".join(symbols)
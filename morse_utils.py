@@ -2,6 +2,19 @@
 Utility functions and mappings for Morse code operations.
 """
 
+import codecs
+import io
+import os
+import re
+import stat
+import sys
+import tempfile
+from contextlib import contextmanager
+from functools import partial
+
+# Number of characters read at a time when streaming files
+CHUNK_SIZE = 1 << 16
+
 # Dictionary mapping characters to Morse code
 CHAR_TO_MORSE = {
     "A": ".-",
@@ -65,6 +78,82 @@ CHAR_TO_MORSE = {
 MORSE_TO_CHAR = {v: k for k, v in CHAR_TO_MORSE.items()}
 
 
+def build_morse_tree(morse_to_char):
+    """
+    Builds the Morse binary tree as a flat list.
+
+    The root is at index 1, and the children of node i are at 2 * i for a dot
+    and 2 * i + 1 for a dash, so a code of n symbols lands in [2 ** n, 2 ** (n + 1)).
+
+    Args:
+        morse_to_char (dict): Letter codes mapped to the characters they decode to
+
+    Returns:
+        list: Characters indexed by code path, None where no character exists
+    """
+    depth = max(len(code) for code in morse_to_char)
+    tree = [None] * (2 << depth)
+    for code, char in morse_to_char.items():
+        index = 1
+        for symbol in code:
+            index = 2 * index + (symbol == "-")
+        tree[index] = char
+    return tree
+
+
+# Morse binary tree: dot goes left, dash goes right (see build_morse_tree)
+MORSE_TREE = build_morse_tree(MORSE_TO_CHAR)
+
+# Precompiled pattern for the validators, built once at import so that the
+# hot paths never loop over characters in Python.
+_SUPPORTED_CHARS = re.escape("".join(CHAR_TO_MORSE))
+
+# Matches the first character that is neither supported nor a plain space
+INVALID_CHAR_RE = re.compile(f"[^ {_SUPPORTED_CHARS}]")
+
+# Matches a single letter code: anything between spaces and word separators
+CODE_RE = re.compile(r"[^ /]+")
+
+
+def find_unsupported_char(text):
+    """
+    Finds the first character that cannot be converted to Morse code.
+
+    Args:
+        text (str): Upper-cased text to be scanned
+
+    Returns:
+        str: The offending character, or None if every character is supported
+    """
+    match = INVALID_CHAR_RE.search(text)
+    return match.group() if match else None
+
+
+def find_invalid_code(morse_code):
+    """
+    Finds the first letter code that does not match any character.
+
+    Leading and trailing whitespace is ignored, as it is by the decoder, but
+    a word separator may not open or close the message.
+
+    Args:
+        morse_code (str): Morse code to be scanned
+
+    Returns:
+        tuple: (offset, code) of the first invalid code, or None if all are valid
+    """
+    start = len(morse_code) - len(morse_code.lstrip())
+    end = len(morse_code.rstrip())
+    if morse_code.startswith("/", start):
+        return start, "/"
+    for match in CODE_RE.finditer(morse_code, start, end):
+        if match.group() not in MORSE_TO_CHAR:
+            return match.start(), match.group()
+    if end > start and morse_code[end - 1] == "/":
+        return end - 1, "/"
+    return None
+
+
 def validate_english_text(text):
     """
     Validates if the input text can be encoded to Morse code.
@@ -78,13 +167,9 @@ def validate_english_text(text):
     if not text:
         return False, "Input text is empty"
 
-    for char in text.upper():
-        # Skip spaces
-        if char == " ":
-            continue
-
-        if char not in CHAR_TO_MORSE:
-            return False, f"Character '{char}' cannot be converted to Morse code"
+    char = find_unsupported_char(text.upper())
+    if char is not None:
+        return False, f"Character '{char}' cannot be converted to Morse code"
 
     return True, ""
 
@@ -102,19 +187,9 @@ def validate_morse_code(morse_code):
     if not morse_code:
         return False, "Input Morse code is empty"
 
-    # Normalize forward slashes by handling any combination of spaces around them
-    morse_code = morse_code.strip()
-    morse_code = morse_code.replace(' / ', '/')  # Remove spaces around slash
-    morse_code = morse_code.replace(' /', '/')   # Remove space before slash
-    morse_code = morse_code.replace('/ ', '/')   # Remove space after slash
-    morse_code = morse_code.replace('/', ' / ')  # Add normalized spacing
-
-    words = morse_code.strip().split(" / ")
-    for word in words:
-        letters = word.split(" ")
-        for letter in letters:
-            if letter and letter not in MORSE_TO_CHAR:
-                return False, f"Morse code '{letter}' does not match any character"
+    invalid = find_invalid_code(morse_code)
+    if invalid is not None:
+        return False, f"Morse code '{invalid[1]}' does not match any character"
 
     return True, ""
 
@@ -158,3 +233,240 @@ def write_to_file(file_path, content):
             f.write(content)
     except IOError:
         raise IOError(f"Error writing to file: {file_path}")
+
+
+def iter_buffer_chunks(buffer, chunk_size=CHUNK_SIZE, encoding=None):
+    """
+    Decodes a buffer of bytes lazily, one chunk at a time.
+
+    Newlines are translated as they are when a file is opened in text mode,
+    and multi-byte characters split across chunk boundaries are handled.
+
+    Args:
+        buffer: bytes, bytearray, memoryview or mmap holding encoded text
+        chunk_size (int): Number of bytes decoded per chunk
+        encoding (str): Text encoding, defaults to the one used by open()
+
+    Yields:
+        str: Consecutive chunks of the decoded text
+    """
+    view = memoryview(buffer)
+    return _decode_byte_chunks(
+        (view[start:start + chunk_size] for start in range(0, len(view), chunk_size)),
+        encoding,
+    )
+
+
+def _preferred_encoding():
+    """Returns the text encoding used by open() by default"""
+    # Imported here, as only file translation needs it and it is slow to import
+    import locale
+    return locale.getpreferredencoding(False)
+
+
+def _decode_byte_chunks(byte_chunks, encoding=None):
+    """Decodes chunks of bytes into text like a file opened in text mode"""
+    decoder = codecs.getincrementaldecoder(encoding or _preferred_encoding())()
+    decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+    for byte_chunk in byte_chunks:
+        text = decoder.decode(byte_chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def read_chunks_from_file(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Reads content from a file lazily, one chunk at a time.
+
+    Regular files are memory-mapped rather than read into memory, so only the
+    chunk being decoded is copied out of the page cache.
+
+    Args:
+        file_path (str): Path to the input file, or "-" for standard input
+        chunk_size (int): Maximum number of characters per chunk
+
+    Yields:
+        str: Consecutive chunks of the file content
+
+    Raises:
+        FileNotFoundError: If the file is not found
+        IOError: If there's an error opening the file
+    """
+    if file_path == "-":
+        yield from iter(partial(sys.stdin.read, chunk_size), "")
+        return
+
+    try:
+        f = open(file_path, "rb")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file not found: {file_path}")
+    except IOError:
+        raise IOError(f"Error reading file: {file_path}")
+
+    import mmap
+
+    with f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files, pipes and other special files cannot be mapped
+            yield from _decode_byte_chunks(iter(partial(f.read, chunk_size), b""))
+            return
+
+        with buffer:
+            yield from iter_buffer_chunks(buffer, chunk_size)
+
+
+@contextmanager
+def open_replacing(file_path):
+    """
+    Opens a binary file whose content replaces a target once it is complete.
+
+    The content is written to a temporary file next to the target, which only
+    replaces the target once the block exits without an error, so an error
+    leaves any existing file untouched. The temporary file gets the mode and,
+    where allowed, the owner of the file it replaces. A symbolic link is
+    followed, so the file it points at is replaced rather than the link, and
+    a target that is not a regular file, such as /dev/null or a pipe, is
+    written to directly.
+
+    Args:
+        file_path (str): Path to the output file
+
+    Yields:
+        file: Binary file object open for writing
+
+    Raises:
+        IOError: If there's an error writing to the file
+    """
+    try:
+        target = os.stat(file_path)
+    except FileNotFoundError:
+        target = None
+    except OSError:
+        raise IOError(f"Error writing to file: {file_path}")
+
+    if target is not None and not stat.S_ISREG(target.st_mode):
+        try:
+            f = open(file_path, "wb")
+        except OSError:
+            raise IOError(f"Error writing to file: {file_path}")
+        with f:
+            yield f
+        return
+
+    path = os.path.realpath(file_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                        dir=os.path.dirname(path))
+    except OSError:
+        raise IOError(f"Error writing to file: {file_path}")
+
+    try:
+        with open(fd, "wb") as f:
+            if target is None:
+                # mkstemp creates the file readable by its owner only, while
+                # open() would have left the mode to the umask
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_path, 0o666 & ~umask)
+            else:
+                os.chmod(tmp_path, stat.S_IMODE(target.st_mode))
+                if (target.st_uid, target.st_gid) != (os.getuid(), os.getgid()):
+                    try:
+                        os.chown(tmp_path, target.st_uid, target.st_gid)
+                    except PermissionError:
+                        pass
+            yield f
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise IOError(f"Error writing to file: {file_path}")
+
+
+def write_chunks_to_file(file_path, chunks):
+    """
+    Writes content to a file one chunk at a time.
+
+    The file is written through open_replacing, so an error raised while
+    producing the chunks leaves any existing file untouched.
+
+    Args:
+        file_path (str): Path to the output file
+        chunks (iterable of str): Content to write
+
+    Raises:
+        IOError: If there's an error writing to the file
+    """
+    with open_replacing(file_path) as f:
+        write_chunks_into(f, chunks)
+
+
+def write_chunks_to_fd(fd, chunks, encoding=None):
+    """
+    Writes content straight to a file descriptor, one chunk at a time.
+
+    Args:
+        fd (int): File descriptor open for writing
+        chunks (iterable of str): Content to write
+        encoding (str): Text encoding, defaults to the one used by open()
+    """
+    encoding = encoding or _preferred_encoding()
+    for chunk in chunks:
+        data = memoryview(chunk.encode(encoding))
+        while data:
+            data = data[os.write(fd, data):]
+
+
+def write_chunks_into(target, chunks, encoding=None):
+    """
+    Writes content to a caller-provided writer, one chunk at a time.
+
+    Each chunk is written as soon as it is produced, so the content is never
+    gathered into one string or list.
+
+    Args:
+        target: bytearray to append to, binary file object such as an
+            io.BufferedWriter, or text file object
+        chunks (iterable of str): Content to write
+        encoding (str): Text encoding for a bytearray or binary file, defaults
+            to the one used by open()
+
+    Returns:
+        int: Number of characters written
+    """
+    count = 0
+    if not isinstance(target, bytearray) and not _is_binary(target):
+        for chunk in chunks:
+            target.write(chunk)
+            count += len(chunk)
+        return count
+
+    encoding = encoding or _preferred_encoding()
+    if isinstance(target, io.RawIOBase):
+        # Unbuffered files may write only part of what they are given
+        for chunk in chunks:
+            data = memoryview(chunk.encode(encoding))
+            while data:
+                data = data[target.write(data):]
+            count += len(chunk)
+        return count
+
+    write = target.extend if isinstance(target, bytearray) else target.write
+    for chunk in chunks:
+        write(chunk.encode(encoding))
+        count += len(chunk)
+    return count
+
+
+def _is_binary(f):
+    """Whether a file object takes bytes rather than text"""
+    return isinstance(f, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(f, "mode", "")
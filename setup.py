@@ -10,13 +10,21 @@ setup(
     description="A Python application to convert English text to Morse code and vice versa",
     url="https://github.com/philipf/morse-code",
     packages=find_packages(include=["."]),
-    py_modules=["encode", "decode", "morse_utils"],
+    py_modules=["encode", "decode", "morse_utils", "morse_audio", "morse_batch", "morse_bytes", "morse_cache", "morse_check", "morse_fuzz", "morse_numpy", "morse_packed", "morse_recover", "morse_segment", "morse_server", "morse_stats", "morse_tables", "morse_timing", "morse"],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.9",
     install_requires=[],
+    extras_require={"numpy": ["numpy"]},
+    entry_points={
+        "console_scripts": [
+            "morse-encode=encode:main",
+            "morse-decode=decode:main",
+            "morse=morse:main",
+        ],
+    },
     tests_require=["pytest>=7.4.0"],
 ) 
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Unit tests for morse_audio.py
+"""
+
+import os
+import random
+import sys
+import wave
+import pytest
+import tempfile
+from array import array
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_audio.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+import encode
+from decode import iter_decode
+import morse_audio
+from morse_audio import build_symbol_buffers, element_durations, iter_wav_morse, write_wav
+
+class TestMorseAudio:
+    """Test class for WAV rendering"""
+
+    def test_element_durations(self):
+        """Test PARIS timing with and without Farnsworth spacing"""
+        assert element_durations(20) == pytest.approx((0.06, 0.18, 0.42))
+        dot, letter_gap, word_gap = element_durations(20, 10)
+        assert dot == pytest.approx(0.06)
+        # PARIS at 10 WPM overall lasts 6 seconds: 31 dots of letters plus 19 gap units
+        assert 31 * dot + 19 * letter_gap / 3 == pytest.approx(6.0)
+        assert word_gap / letter_gap == pytest.approx(7 / 3)
+
+        with pytest.raises(ValueError):
+            element_durations(0)
+        with pytest.raises(ValueError):
+            element_durations(10, 20)
+
+    def test_symbol_buffers(self):
+        """Test the length and content of the precomputed buffers"""
+        buffers = build_symbol_buffers(wpm=20, tone=500, sample_rate=8000)
+        # 60 ms dot plus 60 ms gap, 16-bit samples
+        assert len(buffers["."]) == 2 * 960
+        assert len(buffers["-"]) == 2 * 1920
+        assert buffers["."][2 * 480:] == bytes(2 * 480)
+        assert buffers[" "] == bytes(2 * 960)
+        assert buffers["/"] == bytes(2 * 960)
+        assert any(buffers["."][:2 * 480])
+
+    def test_write_wav(self):
+        """Test that PARIS renders to 44 units at 20 WPM"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "paris.wav")
+            seconds = write_wav(path, [".--. .- ", ".-. .. ..."], sample_rate=8000)
+            assert seconds == pytest.approx(44 * 0.06)
+
+            with wave.open(path, "rb") as wav:
+                assert wav.getnchannels() == 1
+                assert wav.getsampwidth() == 2
+                assert wav.getframerate() == 8000
+                assert wav.getnframes() == round(44 * 0.06 * 8000)
+
+    def test_write_wav_is_incremental(self):
+        """Test that a long chunk is written in bounded batches, not rendered whole"""
+        sizes = []
+        writeframesraw = wave.Wave_write.writeframesraw
+
+        def record(wav, data):
+            sizes.append(len(data))
+            writeframesraw(wav, data)
+
+        largest = max(map(len, build_symbol_buffers(sample_rate=8000).values()))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "long.wav")
+            with patch.object(wave.Wave_write, "writeframesraw", record):
+                seconds = write_wav(path, [".- -... / " * 2000], sample_rate=8000)
+            assert len(sizes) > 5
+            assert max(sizes) < morse_audio._WRITE_BYTES + largest
+            assert sum(sizes) == 2 * round(seconds * 8000)
+
+    def test_main_with_wav(self):
+        """Test the --wav option of the encoder, and that failures leave no file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "out.wav")
+            with patch('sys.argv', ['encode.py', 'SOS', '--wav', path, '--wpm', '25', '--farnsworth', '10']):
+                assert encode.main() == 0
+            with wave.open(path, "rb") as wav:
+                assert wav.getnframes() > 0
+
+            os.remove(path)
+            with patch('sys.argv', ['encode.py', 'SO#S', '--wav', path]):
+                assert encode.main() == 1
+            assert os.listdir(tmpdir) == []
+
+    @pytest.mark.parametrize("wpm, farnsworth_wpm, tone, sample_rate", [
+        (20, None, 600, 8000),
+        (40, None, 750, 44100),
+        (25, 10, 550, 8000),
+        (8, None, 900, 22050),
+    ])
+    def test_read_rendered_wav(self, wpm, farnsworth_wpm, tone, sample_rate):
+        """Test that rendered audio decodes back to the text, without being told the speed or tone"""
+        text = "CQ CQ DE W1AW THE QUICK BROWN FOX 73"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cq.wav")
+            write_wav(path, encode.iter_encode([text]), wpm, farnsworth_wpm, tone, sample_rate)
+            assert "".join(iter_decode(iter_wav_morse(path, block_frames=1000))) == text
+            assert "".join(iter_decode(iter_wav_morse(path, tone=tone))) == text
+
+    def test_read_noisy_wav(self):
+        """Test that moderate white noise does not change the decoded text"""
+        text = "PARIS PARIS SOS"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "noisy.wav")
+            write_wav(path, [encode.encode_to_morse(text)], sample_rate=8000)
+            with wave.open(path, "rb") as wav:
+                samples = array("h", wav.readframes(wav.getnframes()))
+            rng = random.Random(0)
+            noisy = array("h", (max(-32768, min(32767, round(sample + rng.gauss(0, 6000)))) for sample in samples))
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(8000)
+                wav.writeframes(noisy.tobytes())
+
+            assert "".join(iter_decode(iter_wav_morse(path))) == text
+
+    def test_main_with_wav_input(self, capsys):
+        """Test the --wav option of the decoder and its errors"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sos.wav")
+            write_wav(path, ["... --- ..."], wpm=30, sample_rate=8000)
+            with patch('sys.argv', ['decode.py', '--wav', path]):
+                assert decode.main() == 0
+            assert capsys.readouterr().out == "SOS\n"
+
+            text_path = os.path.join(tmpdir, "sos.txt")
+            with open(text_path, "w") as f:
+                f.write("... --- ...")
+            for bad_path, message in ((text_path, "Not a PCM WAV file"), (path + ".missing", "Input file not found")):
+                with patch('sys.argv', ['decode.py', '--wav', bad_path]):
+                    assert decode.main() == 1
+                assert message in capsys.readouterr().err
@@ -0,0 +1,91 @@
+"""
+Unit tests for morse_batch.py
+"""
+
+import os
+import sys
+import pytest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_batch.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from decode import decode_from_morse, iter_decode, parallel_decode
+from encode import encode_to_morse, iter_encode, main, parallel_encode
+from morse_batch import translate_directory
+
+class TestBatch:
+    """Test class for batch and parallel translation"""
+
+    def _write_inputs(self, input_dir, contents):
+        for name, content in contents.items():
+            with open(os.path.join(input_dir, name), 'w') as f:
+                f.write(content)
+
+    def test_translate_directory_in_process(self):
+        """Test translating a directory without a process pool"""
+        with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as output_dir:
+            self._write_inputs(input_dir, {"a.txt": "SOS", "b.txt": "Hello World"})
+
+            results = list(translate_directory(iter_encode, input_dir, output_dir, jobs=1))
+
+            assert results == [
+                (os.path.join(input_dir, "a.txt"), None),
+                (os.path.join(input_dir, "b.txt"), None),
+            ]
+            with open(os.path.join(output_dir, "b.txt")) as f:
+                assert f.read() == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+
+    def test_translate_directory_reports_errors_per_file(self):
+        """Test that one bad file does not stop the others from being translated"""
+        with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as output_dir:
+            self._write_inputs(input_dir, {"bad.txt": ".-.-..-.", "good.txt": "... --- ..."})
+
+            results = dict(translate_directory(iter_decode, input_dir, output_dir, jobs=2))
+
+            assert "does not match any character" in results[os.path.join(input_dir, "bad.txt")]
+            assert results[os.path.join(input_dir, "good.txt")] is None
+            assert not os.path.exists(os.path.join(output_dir, "bad.txt"))
+            with open(os.path.join(output_dir, "good.txt")) as f:
+                assert f.read() == "SOS"
+
+    def test_output_directory_must_differ(self):
+        """Test that translating a directory onto itself is refused and leaves the sources intact"""
+        with tempfile.TemporaryDirectory() as input_dir:
+            self._write_inputs(input_dir, {"a.txt": "SOS"})
+
+            with pytest.raises(ValueError, match="Output directory is the input directory"):
+                list(translate_directory(iter_encode, input_dir, os.path.join(input_dir, "."), jobs=1))
+            with patch('sys.argv', ['encode.py', '--batch', input_dir, '--out-dir', input_dir, '--jobs', '1']):
+                assert main() == 1
+
+            with open(os.path.join(input_dir, "a.txt")) as f:
+                assert f.read() == "SOS"
+
+    def test_main_with_batch(self):
+        """Test the --batch option of the encoder"""
+        with tempfile.TemporaryDirectory() as input_dir, tempfile.TemporaryDirectory() as output_dir:
+            self._write_inputs(input_dir, {"a.txt": "Hello©World"})
+
+            with patch('sys.argv', ['encode.py', '--batch', input_dir, '--out-dir', output_dir,
+                                    '--jobs', '1', '--skip-unknown']):
+                assert main() == 0
+
+            with open(os.path.join(output_dir, "a.txt")) as f:
+                assert f.read() == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+
+    def test_parallel_encode_matches_serial(self):
+        """Test that encoding blocks in a process pool gives the serial result"""
+        text = "Hello World  the quick\nbrown©fox " * 20
+        chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+        expected = encode_to_morse(text, skip_unknown=True)
+        assert "".join(parallel_encode(chunks, skip_unknown=True, jobs=2, block_size=16)) == expected
+
+    def test_parallel_decode_matches_serial(self):
+        """Test that decoding blocks in a process pool gives the serial result and errors"""
+        morse = " .... . .-.. .-.. ---/.-- --- .-. .-.. -.. //" * 20 + "... "
+        chunks = [morse[i:i + 5] for i in range(0, len(morse), 5)]
+        assert "".join(parallel_decode(chunks, jobs=2, block_size=16)) == decode_from_morse(morse)
+
+        with pytest.raises(ValueError, match=r"'\.-\.-\.\.-\.' does not match any character \(at offset 61\)"):
+            list(parallel_decode(chunks[:12] + [" .-.-..-. "] + chunks[12:], jobs=2, block_size=16))
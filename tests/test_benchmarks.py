@@ -0,0 +1,82 @@
+"""
+Unit tests for the benchmarks package
+"""
+
+import os
+import sys
+import pytest
+import tempfile
+
+# Add parent directory to path to import the benchmarks package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.corpus import make_messages, make_morse, make_text
+from benchmarks.suite import find_regressions, load_baseline, run_benchmarks, save_baseline
+from decode import decode_from_morse
+from encode import encode_to_morse
+
+class TestBenchmarks:
+    """Test class for the benchmark suite"""
+
+    def test_corpus_is_valid_input(self):
+        """Test that the generated inputs have the requested size and translate cleanly"""
+        text = make_text(5000)
+        assert 4990 <= len(text) <= 5000
+        assert decode_from_morse(encode_to_morse(text)) == text.upper()
+
+        morse_code = make_morse(5000)
+        assert 4000 <= len(morse_code) <= 5000
+        decode_from_morse(morse_code)
+
+        encode_to_morse(make_text(5000, unknown=True), skip_unknown=True)
+        with pytest.raises(ValueError):
+            encode_to_morse(make_text(5000, unknown=True))
+
+        assert make_text(5000) == text
+        assert len(make_messages(10)) == 10
+
+    def test_run_benchmarks(self):
+        """Test that a run reports throughput and peak memory for each case"""
+        with tempfile.TemporaryDirectory() as workdir:
+            results = list(run_benchmarks(workdir, ["encode", "file_round_trip"], ["short"], repeat=1))
+
+        assert [(result["name"], result["size"]) for result in results] == [
+            ("encode", "short"), ("file_round_trip", "short"),
+        ]
+        for result in results:
+            assert result["mb_per_s"] > 0
+            assert result["peak_bytes"] >= 0
+
+    def test_file_round_trip_keeps_its_input(self):
+        """Test that every repeat of the file round trip reads the original text"""
+        with tempfile.TemporaryDirectory() as workdir:
+            list(run_benchmarks(workdir, ["file_round_trip"], ["short"], repeat=2))
+            with open(os.path.join(workdir, "round_trip.txt")) as f:
+                text = f.read()
+            with open(os.path.join(workdir, "round_trip.out.txt")) as f:
+                assert f.read() == text.upper()
+        assert text != text.upper()
+
+    def test_cold_start_runs_once(self):
+        """Test that the cold start benchmark runs the command line tool at the short size only"""
+        with tempfile.TemporaryDirectory() as workdir:
+            results = list(run_benchmarks(workdir, ["cold_start_encode"], ["short", "1MB"], repeat=1))
+
+        assert [(result["name"], result["size"]) for result in results] == [("cold_start_encode", "short")]
+        assert results[0]["seconds"] > 0
+
+    def test_baseline_regressions(self):
+        """Test that slower or larger results than the stored baseline are reported"""
+        before = [{"name": "encode", "size": "1MB", "mb_per_s": 10.0, "peak_bytes": 1000}]
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "baseline.json")
+            save_baseline(path, before)
+            baseline = load_baseline(path)
+
+        assert find_regressions(before, baseline) == []
+        after = [{"name": "encode", "size": "1MB", "mb_per_s": 8.0, "peak_bytes": 1050}]
+        assert find_regressions(after, baseline) == [
+            "encode/1MB: throughput 8.00 MB/s, baseline 10.00 MB/s",
+        ]
+        after[0]["peak_bytes"] = 2000
+        assert len(find_regressions(after, baseline)) == 2
+        assert find_regressions(after, baseline, tolerance=1.5) == []
@@ -0,0 +1,71 @@
+"""
+Unit tests for morse_bytes.py
+"""
+
+import mmap
+import os
+import sys
+import pytest
+import tempfile
+
+# Add parent directory to path to import morse_bytes.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from morse_bytes import decode_bytes, decode_buffer_to_fd, encode_bytes, encode_buffer_to_fd
+
+class TestMorseBytes:
+    """Test class for the bytes interface"""
+
+    def test_encode_bytes(self):
+        """Test encoding bytes, bytearray and memoryview input"""
+        expected = b".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+        assert encode_bytes(b"Hello World") == expected
+        assert encode_bytes(bytearray(b"Hello World")) == expected
+        assert encode_bytes(memoryview(b"xHello World")[1:]) == expected
+        assert encode_bytes("Hello©World".encode("utf-8"), skip_unknown=True) == expected
+
+    def test_decode_bytes(self):
+        """Test decoding bytes input"""
+        assert decode_bytes(b".... . .-.. .-.. --- / .-- --- .-. .-.. -..") == b"HELLO WORLD"
+        with pytest.raises(ValueError):
+            decode_bytes(b".-.-..-.")
+
+    def test_encode_into_buffer(self):
+        """Test writing the result into a preallocated buffer"""
+        out = bytearray(16)
+        assert encode_bytes(b"SOS", out=out) == 11
+        assert out[:11] == b"... --- ..."
+
+        with pytest.raises(ValueError, match="too small"):
+            encode_bytes(b"SOS", out=bytearray(4))
+
+    def test_large_input_into_buffer(self):
+        """Test that input spanning many chunks streams into a buffer that fits it exactly"""
+        data = b"Hello World " * 100000
+        expected = encode_bytes(data)
+        out = bytearray(len(expected))
+        assert encode_bytes(memoryview(data), out=out) == len(expected)
+        assert out == expected
+        assert decode_bytes(out, out=bytearray(len(data))) == len(data) - 1
+
+    def test_tables(self):
+        """Test translating with another code table"""
+        assert encode_bytes("Привет".encode("utf-8"), table="cyrillic") == b".--. .-. .. .-- . -"
+        assert decode_bytes(b".--. .-. .. .-- . -", table="cyrillic") == "ПРИВЕТ".encode("utf-8")
+
+    def test_buffer_to_fd_from_mmap(self):
+        """Test translating a memory-mapped file straight to a file descriptor"""
+        with tempfile.TemporaryFile() as source, tempfile.TemporaryFile() as target:
+            source.write(b"Hello World " * 1000)
+            source.flush()
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                encode_buffer_to_fd(buffer, target.fileno())
+
+            target.seek(0)
+            morse = target.read()
+            assert morse == encode_bytes(b"Hello World " * 1000)
+
+            target.seek(0)
+            target.truncate()
+            decode_buffer_to_fd(morse, target.fileno())
+            target.seek(0)
+            assert target.read() == b" ".join([b"HELLO WORLD"] * 1000)
@@ -0,0 +1,81 @@
+"""
+Unit tests for morse_cache.py
+"""
+
+import os
+import sys
+import pytest
+
+# Add parent directory to path to import morse_cache.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from decode import decode_from_morse, iter_decode
+from encode import encode_to_morse, iter_encode
+from morse_cache import WordCache
+
+class TestWordCache:
+    """Test class for the word translation cache"""
+
+    def test_statistics(self):
+        """Test that repeated words are served from the cache"""
+        cache = WordCache()
+        assert encode_to_morse("CQ CQ DE W1AW", cache=cache) == "-.-. --.- / -.-. --.- / -.. . / .-- .---- .- .--"
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.currsize) == (1, 3, 3)
+
+        cache.clear()
+        assert cache.stats().currsize == 0
+
+    def test_lru_eviction(self):
+        """Test that the least recently used word is evicted when the cache is full"""
+        cache = WordCache(maxsize=2)
+        encode_to_morse("A B A C", cache=cache)  # C evicts B, the least recently used
+        encode_to_morse("A", cache=cache)
+        encode_to_morse("B", cache=cache)
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.currsize) == (2, 4, 2)
+
+    def test_shared_by_encoder_and_decoder(self):
+        """Test that text and Morse code with the same spelling do not collide"""
+        cache = WordCache()
+        assert encode_to_morse("...", cache=cache) == ".-.-.- .-.-.- .-.-.-"
+        assert decode_from_morse("...", cache=cache) == "S"
+        assert encode_to_morse("...", cache=cache) == ".-.-.- .-.-.- .-.-.-"
+        assert cache.stats().misses == 2
+
+    def test_output_unchanged(self):
+        """Test that the cache never changes the output, with or without skip_unknown"""
+        cache = WordCache(maxsize=4)
+        texts = ["Hello World", "  hello   WORLD  ", "Hello©World", "A\tB\nC", "©©", "straße", "SOS"]
+        for text in texts * 2:
+            expected = encode_to_morse(text, skip_unknown=True)
+            assert encode_to_morse(text, skip_unknown=True, cache=cache) == expected
+            assert "".join(iter_encode([text], skip_unknown=True, cache=cache)) == expected
+
+        for morse_code in [" .- // -... ", "... --- ...", "... --- .../... --- ..."] * 2:
+            expected = decode_from_morse(morse_code)
+            assert decode_from_morse(morse_code, cache=cache) == expected
+            assert "".join(iter_decode([morse_code], cache=cache)) == expected
+
+    def test_errors_unchanged(self):
+        """Test that words that cannot be translated raise the usual errors"""
+        cache = WordCache()
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Character '#' cannot be converted to Morse code"):
+                encode_to_morse("Hello #World", cache=cache)
+            with pytest.raises(ValueError, match="Character '\t' cannot be converted to Morse code"):
+                encode_to_morse("A\tB", cache=cache)
+            with pytest.raises(ValueError, match=r"'\.-\.-\.\.-\.' does not match any character \(at offset 6\)"):
+                decode_from_morse("... / .-.-..-.", cache=cache)
+            with pytest.raises(ValueError, match=r"'/' does not match any character \(at offset 4\)"):
+                decode_from_morse("... /", cache=cache)
+
+    def test_table_mismatch(self):
+        """Test that a cache built for one table is refused by a translation with another"""
+        cache = WordCache()
+        with pytest.raises(ValueError, match="built for the latin table cannot be used with the cyrillic table"):
+            encode_to_morse("A", table="cyrillic", cache=cache)
+        with pytest.raises(ValueError, match="cannot be used with the cyrillic table"):
+            decode_from_morse(".-", table="cyrillic", cache=cache)
+        with pytest.raises(ValueError, match="cannot be used with the latin table"):
+            list(iter_encode(["A"], cache=WordCache(table="cyrillic")))
+        assert encode_to_morse("А", table="cyrillic", cache=WordCache(table="cyrillic")) == ".-"
@@ -0,0 +1,111 @@
+"""
+Unit tests for morse_check.py
+"""
+
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_check.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+import encode
+from morse_check import Problem, iter_morse_problems, iter_text_problems, report_problems
+
+def positions(problems):
+    """Returns (line, column, found) of each problem"""
+    return [(problem.line, problem.column, problem.found) for problem in problems]
+
+class TestCheck:
+    """Test class for the validation-only scans"""
+
+    def test_text_problems(self):
+        """Test that every invalid character is reported with its line and column"""
+        problems = list(iter_text_problems(["Hello #wo", "rld\nok ~\n\n€ ß"], lines=True))
+        assert positions(problems) == [(1, 7, "#"), (2, 4, "~"), (4, 1, "€")]
+        assert problems[0] == Problem(1, 7, 6, "#", "Character '#' cannot be converted to Morse code")
+
+    def test_text_message_is_upper_cased(self):
+        """Test that the message names the character as the translator raises it, and found keeps the input"""
+        problems = list(iter_text_problems(["caf\u00e9"]))
+        assert positions(problems) == [(1, 4, "\u00e9")]
+        with pytest.raises(ValueError) as error:
+            encode.encode_to_morse("caf\u00e9")
+        assert problems[0].message == str(error.value) == "Character '\u00c9' cannot be converted to Morse code"
+
+    def test_text_multi_character_symbols(self):
+        """Test that the characters of a multi-character symbol are not reported"""
+        assert positions(iter_text_problems(["<SK> <zz> <sk>"], table="prosigns")) == [(1, 6, "<"), (1, 9, ">")]
+
+    def test_morse_problems(self):
+        """Test that every invalid code is reported, including one split across chunks"""
+        problems = iter_morse_problems(["/ .- ..-- x\n.-.-.- ......", "- /\n"], lines=True)
+        assert positions(problems) == [(1, 1, "/"), (1, 6, "..--"), (1, 11, "x"), (2, 8, "......-"), (2, 16, "/")]
+
+    def test_valid_input(self):
+        """Test that valid input, including unspaced separators and whitespace closing Morse code, has no problems"""
+        assert list(iter_morse_problems([".- /-... ....", " \n"])) == []
+        assert list(iter_text_problems(["Hello ", "World "])) == []
+
+    def test_line_breaks(self):
+        """Test that line breaks are reported as the translators raise them, unless lines is set"""
+        text = ["Hello\n", "World\n"]
+        assert positions(iter_text_problems(text)) == [(1, 6, "\n"), (2, 6, "\n")]
+        assert list(iter_text_problems(text, lines=True)) == []
+        with pytest.raises(ValueError, match="Character '\n' cannot be converted"):
+            encode.encode_to_morse("".join(text))
+
+        morse = [".... ..\n", ".-- ---\n"]
+        problems = list(iter_morse_problems(morse))
+        assert problems == [Problem(1, 6, 5, "..\n.--", "Morse code '..\n.--' does not match any character")]
+        assert list(iter_morse_problems(morse, lines=True)) == []
+        with pytest.raises(ValueError, match=r"Morse code '..\n.--' does not match any character \(at offset 5\)"):
+            decode.decode_from_morse("".join(morse))
+
+    def test_closing_whitespace(self):
+        """Test that whitespace closing the input is stripped from an invalid code, as the decoder strips it"""
+        assert positions(iter_morse_problems([".- x\n\n", " ", "\n"])) == [(1, 4, "x")]
+        assert positions(iter_morse_problems([".- x\n", "\n", " .-"])) == [(1, 4, "x\n\n")]
+
+    def test_separator_alone(self):
+        """Test that a lone word separator is reported once"""
+        assert positions(iter_morse_problems([" / "])) == [(1, 2, "/")]
+
+    def test_empty_input(self):
+        """Test that empty input is reported"""
+        assert [problem.message for problem in iter_text_problems([])] == ["Input text is empty"]
+        assert [problem.message for problem in iter_morse_problems([""])] == ["Input Morse code is empty"]
+
+    def test_report_problems(self, capsys):
+        """Test printing problems up to a limit"""
+        assert report_problems(iter_text_problems(["a#b#c#"]), max_errors=2) == 1
+        captured = capsys.readouterr()
+        assert captured.out.splitlines() == ["1:2: Character '#' cannot be converted to Morse code",
+                                             "1:4: Character '#' cannot be converted to Morse code"]
+        assert captured.err == "Stopped after 2 problems\n"
+
+        assert report_problems(iter_text_problems(["a#b"])) == 1
+        assert capsys.readouterr().err == "Found 1 problem\n"
+        assert report_problems(iter_text_problems(["ab"])) == 0
+
+    def test_main_check(self, capsys):
+        """Test the --check option of both command line tools"""
+        with patch('sys.argv', ['encode.py', '--check', 'Hello #1']):
+            assert encode.main() == 1
+        assert capsys.readouterr().out == "1:7: Character '#' cannot be converted to Morse code\n"
+
+        with patch('sys.argv', ['decode.py', '--check', '--max-errors', '0', '.. ..-- ......-']):
+            assert decode.main() == 1
+        assert len(capsys.readouterr().out.splitlines()) == 2
+
+        with patch('sys.argv', ['decode.py', '--check', '... --- ...']):
+            assert decode.main() == 0
+        assert capsys.readouterr().out == ""
+
+        with patch('sys.argv', ['encode.py', '--check', 'Hello\nWorld']):
+            assert encode.main() == 1
+        with patch('sys.argv', ['encode.py', '--check', '--lines', 'Hello\nWorld']):
+            assert encode.main() == 0
+        with patch('sys.argv', ['decode.py', '--check', '--lines', '.... ..\n.-- ---']):
+            assert decode.main() == 0
@@ -2,7 +2,9 @@
 Unit tests for decode.py
 """
 
+import io
 import os
+import re
 import sys
 import pytest
 import tempfile
@@ -10,7 +12,7 @@ from unittest.mock import patch
 
 # Add parent directory to path to import decode.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from decode import decode_from_morse, main
+from decode import IncrementalDecoder, decode_from_morse, decode_from_morse_tree, decode_into, iter_decode, main
 
 class TestDecoder:
     """Test class for Morse code decoder"""
@@ -123,6 +125,114 @@ class TestDecoder:
         with pytest.raises(ValueError):
             decode_from_morse(".... . .-.-..-. .-.. ---")
 
+    def test_decode_invalid_input_reports_offset(self):
+        """Test that the first invalid code is reported with its offset"""
+        with pytest.raises(ValueError, match=r"'\.-\.-\.\.-\.' does not match any character \(at offset 7\)"):
+            decode_from_morse(".... . .-.-..-. .-.. ---")
+
+    def test_decode_rejects_separator_at_edges(self):
+        """Test that a word separator cannot open or close the message"""
+        with pytest.raises(ValueError, match="'/'"):
+            decode_from_morse("/ .-")
+        with pytest.raises(ValueError, match="'/'"):
+            decode_from_morse(".- /")
+
+    def test_decode_keeps_empty_words(self):
+        """Test that consecutive separators produce consecutive spaces"""
+        assert decode_from_morse(" .- // -... ") == "A  B"
+
+    def test_decode_from_morse_tree_matches_table(self):
+        """Test that the tree decoder gives the same results and errors as the table decoder"""
+        sample_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples', 'morse1.txt')
+        with open(sample_path) as f:
+            morse = f.read()
+        assert decode_from_morse_tree(morse) == decode_from_morse(morse)
+        assert decode_from_morse_tree(" .- // -... ") == "A  B"
+        
+        for invalid in ["", ".... . .-.-..-. .-.. ---", "/ .-", ".- /", ".-x", "........"]:
+            with pytest.raises(ValueError) as expected:
+                decode_from_morse(invalid)
+            with pytest.raises(ValueError, match=re.escape(str(expected.value))):
+                decode_from_morse_tree(invalid)
+
+    def test_iter_decode_codes_across_chunks(self):
+        """Test that streaming output matches decode_from_morse when codes span chunks"""
+        chunks = ["  ...", ". . .-", ".. .-.. --", "- /", "/ .-- -", "-- .-. .-.. -.. \n"]
+        assert "".join(iter_decode(chunks)) == decode_from_morse("".join(chunks))
+
+    def test_iter_decode_errors(self):
+        """Test that streaming reports the same errors as decode_from_morse"""
+        with pytest.raises(ValueError, match="empty"):
+            list(iter_decode([]))
+        with pytest.raises(ValueError, match=r"'\.-\.-\.\.-\.' does not match any character \(at offset 7\)"):
+            list(iter_decode([".... . .-", ".-..-. .-.. ---"]))
+        with pytest.raises(ValueError, match="'/'"):
+            list(iter_decode([".- ", "/", "  "]))
+
+    def test_decode_into_writers(self):
+        """Test that decode_into writes what decode_from_morse returns to every kind of writer"""
+        morse = " " + ".... . .-.. .-.. --- / .-- --- .-. .-.. -.. / " * 5000 + "... --- ... "
+        expected = decode_from_morse(morse)
+        out = bytearray()
+        assert decode_into(morse, out) == len(expected)
+        assert out == expected.encode("ascii")
+        string = io.StringIO()
+        decode_into(morse, string)
+        assert string.getvalue() == expected
+        out = bytearray()
+        decode_into(".-.-", out, table="cyrillic", encoding="utf-8")
+        assert out.decode("utf-8") == decode_from_morse(".-.-", table="cyrillic")
+
+        with pytest.raises(ValueError, match="empty"):
+            decode_into("", io.StringIO())
+        with pytest.raises(ValueError, match=r"'\.-\.-\.\.-\.' does not match any character \(at offset 7\)"):
+            decode_into(".... . .-.-..-. .-.. ---", io.StringIO())
+
+    def test_incremental_decoder_emits_letters_at_gaps(self):
+        """Test that each letter is returned as soon as the gap after it is fed"""
+        decoder = IncrementalDecoder()
+        assert decoder.feed("  ..") == ""
+        assert decoder.feed(". -") == "S"
+        assert decoder.feed("-- /") == "O "
+        assert decoder.feed("/ .-") == " "
+        assert decoder.flush() == "A"
+        
+        # The decoder is ready for the next message after a flush
+        assert decoder.feed("... ") == "S"
+        assert decoder.flush() == ""
+
+    def test_incremental_decoder_matches_decode_from_morse(self):
+        """Test that results and errors match decode_from_morse for any split of the input"""
+        messages = [" .- // -... ", ".... . .-.. .-.. --- / .-- --- .-. .-.. -..\n", "   ",
+                    "", "........", ".- /", "/ .-", ".-x -", ".-\t-", ".- \t", ".x- \n ..."]
+        for message in messages:
+            try:
+                expected = decode_from_morse(message)
+            except ValueError as e:
+                expected = str(e)
+            for size in (1, 2, 5):
+                decoder = IncrementalDecoder()
+                try:
+                    pieces = [decoder.feed(message[i:i + size]) for i in range(0, len(message), size)]
+                    result = "".join(pieces) + decoder.flush()
+                except ValueError as e:
+                    result = str(e)
+                assert result == expected
+
+    def test_incremental_decoder_state_is_bounded(self):
+        """Test that long runs of whitespace or of an invalid code are not kept whole"""
+        decoder = IncrementalDecoder()
+        decoder.feed(".-")
+        for _ in range(100000):
+            decoder.feed("\n")
+        assert len(decoder._run_text) <= 64
+        assert decoder.flush() == "A"
+
+        decoder.feed(".- " + "x" * 100000)
+        assert len(decoder._run_text) <= 64
+        with pytest.raises(ValueError, match=r"Morse code 'x{64}' does not match any character \(at offset 3\)"):
+            decoder.feed(" .")
+
     @patch('sys.stdout')
     @patch('sys.argv', ['decode.py', '.... . .-.. .-.. --- / .-- --- .-. .-.. -..'])
     def test_main_with_command_line_morse(self, mock_stdout):
@@ -130,6 +240,45 @@ class TestDecoder:
         result = main()
         assert result == 0
     
+    def test_main_with_single_message(self, capsys):
+        """Test that a lone message is read as argparse would, including a leading dash"""
+        with patch('sys.argv', ['decode.py', '-- ---']):
+            assert main() == 0
+        assert capsys.readouterr().out == "MO\n"
+        
+        with patch('sys.argv', ['decode.py', '.-.-..-.']):
+            assert main() == 1
+        assert "does not match any character" in capsys.readouterr().err
+    
+    def test_main_with_gapless(self, capsys):
+        """Test that --gapless prints the most likely candidates, one per line"""
+        with tempfile.TemporaryDirectory() as workdir:
+            words_path = os.path.join(workdir, 'words.txt')
+            with open(words_path, 'w') as f:
+                f.write('the 100\ndog 10\n')
+            with patch('sys.argv', ['decode.py', '--gapless', '--words', words_path, '--candidates', '2',
+                                    '--', '-.....-..-----.']):
+                assert main() == 0
+        assert capsys.readouterr().out.splitlines() == ['THE DOG', 'NH DOG']
+    
+    def test_main_with_stats(self, capsys):
+        """Test that --stats counts the codes repaired by --recover"""
+        with patch('sys.argv', ['decode.py', '--stats', '--recover', '... ---- ... x']):
+            assert main() == 0
+        captured = capsys.readouterr()
+        assert captured.out == "SJS*\n"
+        assert [line.split()[0] for line in captured.err.splitlines()[2:6]] == ['stage', 'read', 'decode', 'write']
+        assert 'unknown symbols: 2' in captured.err
+    
+    def test_main_with_recover(self, capsys):
+        """Test that --recover repairs unknown codes and reports them on stderr"""
+        with patch('sys.argv', ['decode.py', '--recover', '... ---- ... x']):
+            assert main() == 0
+        captured = capsys.readouterr()
+        assert captured.out == "SJS*\n"
+        assert "Recovered '----' at offset 4 as 'J' (nearest)" in captured.err
+        assert "Recovered 'x' at offset 13 as '*' (placeholder)" in captured.err
+    
     @patch('sys.stdout')
     @patch('sys.argv', ['decode.py', '--input', 'nonexistent.txt'])
     def test_main_with_nonexistent_input_file(self, mock_stdout):
@@ -168,6 +317,29 @@ class TestDecoder:
             if os.path.exists(tmp_out_path):
                 os.remove(tmp_out_path)
     
+    def test_main_with_invalid_input_keeps_output_file(self):
+        """Test that a failed decode leaves an existing output file untouched"""
+        with tempfile.NamedTemporaryFile(delete=False, mode='w') as tmp_in:
+            tmp_in.write(".... . / .-.-..-.")
+            tmp_in_path = tmp_in.name
+        
+        with tempfile.NamedTemporaryFile(delete=False, mode='w') as tmp_out:
+            tmp_out.write("previous")
+            tmp_out_path = tmp_out.name
+        
+        try:
+            with patch('sys.argv', ['decode.py', '--input', tmp_in_path, '--output', tmp_out_path]):
+                assert main() == 1
+            
+            with open(tmp_out_path, 'r') as f:
+                assert f.read() == "previous"
+            out_dir, out_name = os.path.split(tmp_out_path)
+            assert not [name for name in os.listdir(out_dir) if name.startswith(f".{out_name}.")]
+        
+        finally:
+            os.remove(tmp_in_path)
+            os.remove(tmp_out_path)
+    
     @patch('sys.stdout')
     @patch('sys.argv', ['decode.py'])
     def test_main_with_no_input(self, mock_stdout):
@@ -2,7 +2,9 @@
 Unit tests for encode.py
 """
 
+import io
 import os
+import subprocess
 import sys
 import pytest
 import tempfile
@@ -10,7 +12,7 @@ from unittest.mock import patch
 
 # Add parent directory to path to import encode.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from encode import encode_to_morse, main
+from encode import encode_into, encode_to_morse, iter_encode, main
 
 class TestEncoder:
     """Test class for Morse code encoder"""
@@ -63,6 +65,56 @@ class TestEncoder:
         # Test with some words containing only invalid chars
         assert encode_to_morse("Hello §§§ World", skip_unknown=True) == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
 
+    def test_encode_collapses_spaces(self):
+        """Test that leading, trailing and repeated spaces do not create empty words"""
+        assert encode_to_morse("  Hello   World ") == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+        assert encode_to_morse("   ") == ""
+
+    def test_encode_rejects_non_space_whitespace(self):
+        """Test that tabs and newlines are reported as unsupported characters"""
+        with pytest.raises(ValueError, match="cannot be converted"):
+            encode_to_morse("Hello\nWorld")
+
+    def test_encode_with_skip_unknown_whitespace(self):
+        """Test that skip_unknown treats any whitespace as a word boundary"""
+        assert encode_to_morse("Hello\n\tWorld\n", skip_unknown=True) == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+        assert encode_to_morse("", skip_unknown=True) == ""
+
+    def test_iter_encode_words_across_chunks(self):
+        """Test that streaming output matches encode_to_morse when words span chunks"""
+        chunks = ["He", "llo W", "or", "ld ", " again"]
+        assert "".join(iter_encode(chunks)) == encode_to_morse("".join(chunks))
+        assert "".join(iter_encode(["Hel", "lo©", "Wor", "ld"], skip_unknown=True)) == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+
+    def test_iter_encode_errors(self):
+        """Test that streaming raises the same errors as encode_to_morse"""
+        with pytest.raises(ValueError, match="empty"):
+            list(iter_encode(["", ""]))
+        with pytest.raises(ValueError, match="©"):
+            list(iter_encode(["Hello", "©World"]))
+
+    def test_encode_into_writers(self):
+        """Test that encode_into writes what encode_to_morse returns to every kind of writer"""
+        text = "Hello World, " * 10000 + "  Hello©World  "
+        expected = encode_to_morse(text, skip_unknown=True)
+        out = bytearray(b">")
+        assert encode_into(text, out, skip_unknown=True) == len(expected)
+        assert out == b">" + expected.encode("ascii")
+
+        binary = io.BytesIO()
+        with io.BufferedWriter(binary) as writer:
+            encode_into(text, writer, skip_unknown=True, encoding="ascii")
+            writer.flush()
+            assert binary.getvalue() == expected.encode("ascii")
+        string = io.StringIO()
+        encode_into("SOS", string)
+        assert string.getvalue() == "... --- ..."
+
+        with pytest.raises(ValueError, match="empty"):
+            encode_into("", bytearray())
+        with pytest.raises(ValueError, match="©"):
+            encode_into("Hello©World", bytearray())
+
     @patch('sys.stdout')
     @patch('sys.argv', ['encode.py', 'HELLO'])
     def test_main_with_command_line_text(self, mock_stdout):
@@ -115,9 +167,33 @@ class TestEncoder:
             if os.path.exists(tmp_out_path):
                 os.remove(tmp_out_path)
     
+    def test_main_with_stats_and_profile(self, capsys):
+        """Test that --stats reports each stage on stderr and --profile writes a profile"""
+        with tempfile.TemporaryDirectory() as workdir:
+            profile_path = os.path.join(workdir, 'run.prof')
+            with patch('sys.argv', ['encode.py', '--stats', '--profile', profile_path, '-s', 'SOS #1']):
+                assert main() == 0
+            assert os.path.getsize(profile_path) > 0
+        
+        captured = capsys.readouterr()
+        assert captured.out == "... --- ... / .----\n"
+        stages = [line.split()[0] for line in captured.err.splitlines()]
+        assert stages[:5] == ['stage', 'read', 'encode', 'write', 'total']
+        assert 'unknown symbols: 1' in captured.err
+    
     @patch('sys.stdout')
     @patch('sys.argv', ['encode.py'])
     def test_main_with_no_input(self, mock_stdout):
         """Test main function with no input"""
         result = main()
-        assert result == 0  # Should show help message and exit successfully 
\ No newline at end of file
+        assert result == 0  # Should show help message and exit successfully
+    
+    def test_command_line_tools_import_little(self):
+        """Test that starting the encoder or decoder does not load modules only some options need"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        heavy = ['argparse', 'cProfile', 'concurrent.futures', 'morse_audio', 'morse_check', 'morse_packed',
+                 'morse_recover', 'morse_segment', 'morse_stats', 'morse_timing', 'multiprocessing', 'wave']
+        for module in ('encode', 'decode'):
+            script = f"import sys, {module}; print(sorted(set({heavy!r}) & set(sys.modules)))"
+            output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True)
+            assert output.stdout.strip() == '[]'
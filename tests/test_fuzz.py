@@ -0,0 +1,71 @@
+"""
+Differential fuzz tests for the translation engines (see morse_fuzz.py)
+"""
+
+import ast
+import os
+import random
+import sys
+import pytest
+
+# Add parent directory to path to import morse_fuzz.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from decode import decode_from_morse
+from encode import encode_to_morse
+from morse_fuzz import (REFERENCE, Engine, FuzzFailure, check_decoders, check_encoders, check_round_trips,
+                        decoders, encoders, outcome, random_morse, random_text, run_fuzz, shrink)
+
+class TestFuzz:
+    """Test class for engine equivalence and round-trip invariants"""
+
+    def test_encoders_match_reference(self, fuzz):
+        """Test every registered encoder against encode_to_morse on generated text"""
+        assert fuzz(check_encoders, random_text) > 0
+
+    def test_decoders_match_reference(self, fuzz):
+        """Test every registered decoder against decode_from_morse on generated Morse code"""
+        assert fuzz(check_decoders, random_morse) > 0
+
+    def test_round_trips(self, fuzz):
+        """Test the round-trip invariants between the encoder, the decoder and the other formats"""
+        assert fuzz(check_round_trips, random_text) > 0
+
+    def test_known_odd_cases(self):
+        """Test the cases every engine must get right, whatever the seed"""
+        for text in ["Hello©World", "  leading and trailing  ", "a\tb", "", " ", "ß", "\xa0x\xa0"]:
+            assert check_encoders(text) is None
+        for morse_code in [" .- / -... ", ".-//-...", "/ .-", ".- /", "  ", "", ".-  /  -...", "\t.-\n"]:
+            assert check_decoders(morse_code) is None
+
+    def test_registry(self):
+        """Test that the built-in engines are registered with the reference"""
+        assert {REFERENCE, "stream", "cache", "numpy", "parallel"} <= set(encoders())
+        assert {REFERENCE, "tree", "stream", "incremental", "numpy", "parallel"} <= set(decoders())
+
+    def test_generators_are_seeded(self):
+        """Test that the same seed generates the same inputs, with clean and adversarial ones"""
+        first = [random_text(random.Random(7)) for _ in range(3)]
+        assert first == [random_text(random.Random(7)) for _ in range(3)]
+        rng = random.Random(1)
+        assert all(encode_to_morse(random_text(rng, 200, clean=True)) for _ in range(20))
+        assert all(decode_from_morse(random_morse(rng, 200, clean=True)) for _ in range(20))
+        adversarial = [random_morse(rng, 200, clean=False) for _ in range(50)]
+        assert any(outcome(decode_from_morse, morse_code)[0] == "error" for morse_code in adversarial)
+
+    def test_faulty_engine_is_caught_and_shrunk(self):
+        """Test that an engine that differs from the reference is reported with a small input"""
+        engines = dict(encoders())
+        # Loses the text after a tab when unknown characters are skipped
+        engines["faulty"] = Engine("faulty", lambda text, skip_unknown: encode_to_morse(
+            text.split("\t")[0] if skip_unknown else text, skip_unknown), 1)
+        check = lambda text, case: check_encoders(text, case, engines)
+        with pytest.raises(FuzzFailure, match="engine 'faulty'") as failure:
+            run_fuzz(check, random_text, budget=30, seed=3)
+        assert "seed 3" in str(failure.value)
+        shrunk = str(failure.value).split("input: ")[1].split("\n")[0]
+        assert len(ast.literal_eval(shrunk)) <= 3
+
+    def test_shrink(self):
+        """Test that shrinking keeps the input failing"""
+        assert shrink("xxxxxxAxxxxBxxxx", lambda value: "A" in value and "B" in value) == "AB"
+        assert shrink("abc", lambda value: False) == "abc"
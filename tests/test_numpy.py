@@ -0,0 +1,66 @@
+"""
+Unit tests for morse_numpy.py
+"""
+
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_numpy.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import morse_numpy
+from decode import decode_from_morse
+from encode import encode_to_morse
+from morse_numpy import decode_array, encode_array
+
+TEXTS = ["SOS", "Hello World", "  two  spaces ", "a", "CQ DE W1AW 73!"]
+MORSE_CODES = ["... --- ...", " .- // -... ", ".-", "-- / ---", "..--.. -.-.--"]
+
+class TestMorseNumpy:
+    """Test class for the NumPy bulk backend"""
+
+    def test_encode_array(self):
+        """Test that encoding an array matches encoding each text"""
+        np = pytest.importorskip("numpy")
+        assert encode_array(np.array(TEXTS)) == [encode_to_morse(text) for text in TEXTS]
+
+    def test_encode_array_skip_unknown(self):
+        """Test skipping unknown characters, including non-ASCII ones and empty texts"""
+        pytest.importorskip("numpy")
+        texts = ["Hello©World", "", "ß\tok", "###", "straße"]
+        expected = [encode_to_morse(text, skip_unknown=True) for text in texts]
+        assert encode_array(texts, skip_unknown=True) == expected
+
+    def test_encode_array_error(self):
+        """Test that the first text that cannot be encoded raises its own error"""
+        pytest.importorskip("numpy")
+        with pytest.raises(ValueError, match="Character '#' cannot be converted to Morse code"):
+            encode_array(["SOS", "A#B", "C\tD"])
+        with pytest.raises(ValueError, match="Input text is empty"):
+            encode_array(["SOS", ""])
+
+    def test_decode_array(self):
+        """Test that decoding an array matches decoding each message"""
+        np = pytest.importorskip("numpy")
+        expected = [decode_from_morse(morse_code) for morse_code in MORSE_CODES]
+        assert decode_array(np.array(MORSE_CODES)) == expected
+
+    def test_decode_array_error(self):
+        """Test that the first message that cannot be decoded raises its own error"""
+        pytest.importorskip("numpy")
+        with pytest.raises(ValueError, match=r"'\.-\.-\.\.-\.' does not match any character \(at offset 0\)"):
+            decode_array(["...", ".-.-..-.", "/ ..."])
+        with pytest.raises(ValueError, match="'/' does not match any character"):
+            decode_array(["...", "... / "])
+
+    def test_empty_array(self):
+        """Test translating an empty array"""
+        assert encode_array([]) == []
+        assert decode_array([]) == []
+
+    def test_fallback_without_numpy(self):
+        """Test that the functions still work when NumPy is not installed"""
+        with patch.object(morse_numpy, 'np', None):
+            assert encode_array(TEXTS) == [encode_to_morse(text) for text in TEXTS]
+            assert decode_array(MORSE_CODES) == [decode_from_morse(code) for code in MORSE_CODES]
@@ -0,0 +1,92 @@
+"""
+Unit tests for morse_packed.py
+"""
+
+import io
+import os
+import sys
+import pytest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_packed.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+import encode
+import morse_packed
+from morse_packed import pack, read_packed_chunks, unpack, write_packed
+
+class TestPacked:
+    """Test class for the packed binary format"""
+
+    def test_pack_layout(self):
+        """Test the header and the two-bit symbols of a packed message"""
+        # ".-" letter gap "-" word gap "." -> 0, 1, 2, 1 | 3, 0 (padded)
+        assert pack(".- - / .") == b"MRS\x01" + (6).to_bytes(8, "big") + bytes([0b00011001, 0b11000000])
+        assert pack("") == b"MRS\x01" + bytes(8)
+
+    def test_round_trip(self):
+        """Test that encoder output converts to the packed form and back unchanged"""
+        morse = encode.encode_to_morse("The quick brown fox, 1234567890 times! " * 50)
+        packed = pack(morse)
+        assert unpack(packed) == morse
+        assert len(packed) < len(morse) / 4
+
+    def test_spacing_is_normalized(self):
+        """Test that other spacing is normalized without changing the decoded text"""
+        for morse in [" .-   //  -...  ", ".-//-...", ".- / / -..."]:
+            assert unpack(pack(morse)) == ".- / / -..."
+            assert decode.decode_from_morse(unpack(pack(morse))) == decode.decode_from_morse(morse)
+
+    def test_invalid_input(self):
+        """Test the errors for text that is not Morse code and data that is not packed"""
+        with pytest.raises(ValueError, match="Character 'x' is not a Morse code symbol"):
+            pack("..x")
+        with pytest.raises(ValueError, match="not packed Morse code"):
+            unpack(b"... --- ... --- ...")
+        with pytest.raises(ValueError, match="version: 2"):
+            unpack(b"MRS\x02" + bytes(8))
+        with pytest.raises(ValueError, match="truncated"):
+            unpack(pack(".- - / .")[:-1])
+
+    def test_streaming_matches_pack(self):
+        """Test that writing and reading in chunks gives the in-memory result"""
+        morse = encode.encode_to_morse("Hello World " * 30)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "message.mrs")
+            for size in (1, 3, 64):
+                write_packed(path, [morse[i:i + size] for i in range(0, len(morse), size)])
+                with open(path, "rb") as f:
+                    assert f.read() == pack(morse)
+                assert "".join(read_packed_chunks(path, chunk_size=size)) == morse
+
+    def test_standard_streams(self):
+        """Test that standard output is written in chunks, and that standard input is left open"""
+        morse = encode.encode_to_morse("Hello World " * 30)
+        writes = []
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with patch.object(stdout.buffer, 'write', side_effect=writes.append), patch('sys.stdout', stdout), \
+                patch.object(morse_packed, 'CHUNK_SIZE', 64), patch.object(morse_packed, '_SPOOL_SIZE', 64):
+            write_packed("-", [morse[i:i + 50] for i in range(0, len(morse), 50)])
+        assert b"".join(writes) == pack(morse)
+        assert len(writes) > 5 and max(map(len, writes)) <= 64
+
+        stdin = io.TextIOWrapper(io.BytesIO(pack(morse)))
+        with patch('sys.stdin', stdin):
+            assert "".join(read_packed_chunks("-", chunk_size=16)) == morse
+        assert not stdin.closed
+
+    def test_main_round_trip(self):
+        """Test --format packed on both the encoder and the decoder"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            packed_path = os.path.join(tmp_dir, "message.mrs")
+            text_path = os.path.join(tmp_dir, "message.txt")
+            with patch('sys.argv', ['encode.py', 'Hello World', '--format', 'packed', '--output', packed_path]):
+                assert encode.main() == 0
+            with open(packed_path, "rb") as f:
+                assert f.read() == pack(".... . .-.. .-.. --- / .-- --- .-. .-.. -..")
+
+            with patch('sys.argv', ['decode.py', '--input', packed_path, '--format', 'packed', '--output', text_path]):
+                assert decode.main() == 0
+            with open(text_path) as f:
+                assert f.read() == "HELLO WORLD"
@@ -0,0 +1,73 @@
+"""
+Unit tests for morse_recover.py
+"""
+
+import os
+import sys
+import pytest
+
+# Add parent directory to path to import morse_recover.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from decode import decode_from_morse
+from encode import encode_to_morse
+from morse_recover import (Correction, decode_recovering, iter_decode_recovering, nearest_index,
+                           recover_code, split_code)
+from morse_tables import get_table
+
+class TestRecover:
+    """Test class for the error-tolerant decoder"""
+
+    def test_valid_input_unchanged(self):
+        """Test that valid input decodes as it does with decode_from_morse"""
+        morse = encode_to_morse("The quick brown fox, 1234!") + "  /  " + encode_to_morse("Hi")
+        assert decode_recovering(morse) == (decode_from_morse(morse), [])
+
+    def test_nearest_code(self):
+        """Test replacing a corrupted code with the nearest valid one"""
+        assert decode_recovering("... ---- ...") == ("SJS", [Correction(4, "----", "J", "nearest")])
+        assert nearest_index(get_table())["..-."] == ("..-.", 0)
+        assert nearest_index(get_table())["----"][1] == 1
+
+    def test_split_run_together_letters(self):
+        """Test splitting letters that were sent without gaps"""
+        assert split_code(".-.-.-.-", get_table()) == [".-", ".-.-.-"]
+        assert split_code("x", get_table()) is None
+        assert decode_recovering(".- ...-.-.--.-.. -") == (
+            "AS!LT", [Correction(3, "...-.-.--.-..", "S!L", "split")])
+
+    def test_placeholder(self):
+        """Test codes that cannot be repaired, and the placeholder strategy"""
+        assert decode_recovering("x .-") == ("*A", [Correction(0, "x", "*", "placeholder")])
+        assert decode_recovering("... ---- ...", strategy="placeholder", placeholder="?") == (
+            "S?S", [Correction(4, "----", "?", "placeholder")])
+        assert recover_code("-" * 40) == ("0" * 8, "split")
+
+    def test_dropped_separators(self):
+        """Test that word separators opening or closing the message are dropped"""
+        text, corrections = decode_recovering(" / .- / -... /")
+        assert text == "A B"
+        assert corrections == [Correction(1, "/", "", "dropped"), Correction(13, "/", "", "dropped")]
+
+    def test_chunked_input(self):
+        """Test that chunked input gives the same result as the whole message"""
+        morse = " / ".join([encode_to_morse("Sphinx of black quartz judge my vow")] * 2000)
+        morse = morse.replace("--.-", "--.-.", 50)
+        expected = decode_recovering(morse)
+        assert len(expected[1]) == 50
+
+        pieces = list(iter_decode_recovering(morse[i:i + 997] for i in range(0, len(morse), 997)))
+        assert len(pieces) > 1
+        assert "".join(text for text, _ in pieces) == expected[0]
+        assert [c for _, corrections in pieces for c in corrections] == expected[1]
+
+    def test_other_table(self):
+        """Test recovering with a table other than the Latin one"""
+        assert decode_recovering(".--. .-. ..-- ", table="cyrillic") == ("ПРЮ", [])
+        assert decode_recovering("---- ---.-", table="cyrillic")[0] == "ШЧ"
+
+    def test_errors(self):
+        """Test the errors for empty input and unknown strategies"""
+        with pytest.raises(ValueError, match="Input Morse code is empty"):
+            decode_recovering("")
+        with pytest.raises(ValueError, match="Unknown recovery strategy"):
+            decode_recovering("...", strategy="guess")
@@ -0,0 +1,86 @@
+"""
+Unit tests for morse_segment.py
+"""
+
+import os
+import sys
+import pytest
+import tempfile
+
+# Add parent directory to path to import morse_segment.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from encode import encode_to_morse
+from morse_segment import Segmenter, load_word_list, segment
+
+WORDS = {"THE": 100, "QUICK": 5, "BROWN": 5, "FOX": 5, "JUMPS": 5, "OVER": 20, "LAZY": 3, "DOG": 8}
+
+def gapless(text, **kwargs):
+    """Encodes text and removes every letter and word gap"""
+    return encode_to_morse(text, **kwargs).replace(" ", "").replace("/", "")
+
+class TestSegment:
+    """Test class for gapless segmentation"""
+
+    def test_letters_only(self):
+        """Test splitting into letters with letter frequencies alone"""
+        candidates = segment(gapless("SOS"), k=3)
+        assert [candidate.text for candidate in candidates] == ["SOS", "SOEI", "SOIE"]
+        assert candidates[0].log_probability > candidates[1].log_probability
+
+    def test_words(self):
+        """Test that listed words are preferred, and ranked by frequency"""
+        sentence = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG"
+        candidates = segment(gapless(sentence), WORDS, k=3)
+        assert candidates[0].text == sentence
+        assert len(candidates) == 3
+        assert all(candidate.text != sentence for candidate in candidates[1:])
+
+    def test_unlisted_letters_are_spelled_out(self):
+        """Test that letters outside listed words are spelled out between them"""
+        assert segment(gapless("THE K DOG"), ["THE", "DOG"])[0].text == "THE K DOG"
+        assert segment(gapless("THE K DOG"), ["THE", "DOG"], k=3)[1].text == "THE TA DOG"
+
+    def test_word_separators_are_kept(self):
+        """Test that gaps still present in the input are honoured"""
+        assert segment("... --- ... / .-")[0].text == "SOS A"
+        assert segment(gapless("THE") + "/" + gapless("DOG"), WORDS)[0].text == "THE DOG"
+
+    def test_best_candidate_matches_top_k(self):
+        """Test that asking for one candidate finds the best of several"""
+        segmenter = Segmenter(WORDS)
+        for text in ["THE", "QUICKFOX", "OVERLAZYDOG", "XQZ"]:
+            assert segmenter.segment(gapless(text)) == segmenter.segment(gapless(text), k=4)[:1]
+
+    def test_long_input(self):
+        """Test that long input is segmented in linear time"""
+        sentence = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG"
+        morse_code = gapless(" ".join([sentence] * 500))
+        assert segment(morse_code, WORDS)[0].text == " ".join([sentence] * 500)
+
+    def test_other_table(self):
+        """Test segmenting with a table other than the Latin one"""
+        morse_code = gapless("МИР", table="cyrillic")
+        assert segment(morse_code, ["МИР"], table="cyrillic")[0].text == "МИР"
+
+    def test_load_word_list(self):
+        """Test reading a word list with and without counts"""
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "words.txt")
+            with open(path, "w") as f:
+                f.write("the 100\nDog\n\nthe 5\n")
+            assert load_word_list(path) == {"THE": 105, "DOG": 1}
+
+            with open(path, "w") as f:
+                f.write("the many\n")
+            with pytest.raises(ValueError, match="at line 1"):
+                load_word_list(path)
+
+        with pytest.raises(FileNotFoundError, match="Word list not found"):
+            load_word_list("nonexistent.txt")
+
+    def test_errors(self):
+        """Test the errors for empty or invalid input"""
+        with pytest.raises(ValueError, match="Input Morse code is empty"):
+            segment("")
+        with pytest.raises(ValueError, match=r"Character 'x' is not Morse code \(at offset 2\)"):
+            segment("..x")
@@ -0,0 +1,155 @@
+"""
+Unit tests for morse_server.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import pytest
+import socket
+import tempfile
+import threading
+
+# Add parent directory to path to import morse_server.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from morse_server import AsyncMorseServer, MorseClient, handle_line, make_server
+
+@pytest.fixture
+def running_server():
+    """Starts a server on a temporary Unix socket and yields its path"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "morse.sock")
+        with make_server(socket_path) as server:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            yield socket_path
+            server.shutdown()
+            thread.join()
+
+class TestMorseServer:
+    """Test class for the translation server and client"""
+
+    def test_handle_line(self):
+        """Test the response to each kind of request line"""
+        assert json.loads(handle_line(b'{"op": "encode", "text": "SOS"}\n')) == {"result": "... --- ..."}
+        assert json.loads(handle_line(b'{"op": "decode", "morse": ".- / -..."}')) == {"result": "A B"}
+        assert json.loads(handle_line(b'{"op": "encode", "text": "A#", "skip_unknown": true}')) == {"result": ".-"}
+        assert json.loads(handle_line(b'{"op": "encode", "text": "A#"}')) == {
+            "error": "Character '#' cannot be converted to Morse code"
+        }
+        assert json.loads(handle_line(b'{"op": "shout"}')) == {"error": "Unknown operation: shout"}
+        assert json.loads(handle_line(b'{"op": "decode"}')) == {"error": "Malformed request"}
+        assert json.loads(handle_line(b'[1, 2]')) == {"error": "Malformed request"}
+        assert json.loads(handle_line(b'not json')) == {"error": "Request is not valid JSON"}
+        assert json.loads(handle_line(b'[' * 100000)) == {"error": "Request is not valid JSON"}
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets not available")
+    def test_client_reuses_connection(self, running_server):
+        """Test several requests, including a failing one, over one connection"""
+        with MorseClient(running_server) as client:
+            assert client.encode("Hello World") == ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
+            with pytest.raises(ValueError, match=r"'\.\.\.\.\.\.\.' does not match any character"):
+                client.decode(".......")
+            assert client.decode("... --- ...") == "SOS"
+            assert client.encode("Hello©World", skip_unknown=True) == client.encode("Hello World")
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets not available")
+    def test_socket_path_is_not_a_socket(self):
+        """Test that a stale socket is replaced, but any other file at the socket path is kept"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            socket_path = os.path.join(tmpdir, "notes.txt")
+            with open(socket_path, "w") as f:
+                f.write("notes")
+            with pytest.raises(FileExistsError, match="Not a socket"):
+                make_server(socket_path)
+            with open(socket_path) as f:
+                assert f.read() == "notes"
+
+            with pytest.raises(FileExistsError, match="Not a socket"):
+                asyncio.run(AsyncMorseServer(socket_path, workers=1).start())
+            with open(socket_path) as f:
+                assert f.read() == "notes"
+
+            socket_path = os.path.join(tmpdir, "morse.sock")
+            make_server(socket_path).server_close()
+            make_server(socket_path).server_close()
+
+    def test_tcp_server(self):
+        """Test a server listening on a local TCP port"""
+        with make_server(port=0, cache_size=0) as server:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                with MorseClient(port=server.server_address[1]) as client:
+                    assert client.decode(client.encode("CQ DE W1AW")) == "CQ DE W1AW"
+            finally:
+                server.shutdown()
+                thread.join()
+
+class TestAsyncMorseServer:
+    """Test class for the asyncio translation server"""
+
+    async def _exchange(self, server, payload, count):
+        host, port = server.address
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 24)
+        writer.write(payload)
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(count)]
+        writer.close()
+        return responses
+
+    def test_pipelined_requests_in_order(self):
+        """Test that small, offloaded and oversized requests are answered in order"""
+        lines = [
+            json.dumps({"op": "decode", "morse": ".- " * 1000}),
+            json.dumps({"op": "encode", "text": "SOS"}),
+            json.dumps({"op": "decode", "morse": "." * 6000}),
+            json.dumps({"op": "decode", "morse": "." * 200}),
+            json.dumps({"op": "encode", "text": "#"}),
+        ]
+
+        async def run():
+            server = AsyncMorseServer(port=0, max_request_size=5000, offload_size=100, max_pending=2, workers=1)
+            await server.start()
+            try:
+                return await self._exchange(server, "\n".join(lines).encode() + b"\n", 5)
+            finally:
+                await server.shutdown()
+
+        responses = asyncio.run(run())
+        assert responses[0] == {"result": "A" * 1000}
+        assert responses[1] == {"result": "... --- ..."}
+        assert responses[2] == {"error": "Request exceeds 5000 bytes"}
+        assert responses[3] == {"error": f"Morse code '{'.' * 200}' does not match any character (at offset 0)"}
+        assert responses[4] == {"error": "Character '#' cannot be converted to Morse code"}
+
+    def test_oversized_request_is_rejected(self):
+        """Test that a line longer than max_request_size is discarded without closing the connection"""
+        async def run():
+            server = AsyncMorseServer(port=0, max_request_size=1000, workers=1)
+            await server.start()
+            try:
+                payload = b'{"op": "decode", "morse": "' + b"." * 100000 + b'"}\n{"op": "decode", "morse": "."}\n'
+                return await self._exchange(server, payload, 2)
+            finally:
+                await server.shutdown()
+
+        assert asyncio.run(run()) == [{"error": "Request exceeds 1000 bytes"}, {"result": "E"}]
+
+    def test_graceful_shutdown(self):
+        """Test that requests already received are answered when the server shuts down"""
+        async def run():
+            server = AsyncMorseServer(port=0, workers=1)
+            await server.start()
+            host, port = server.address
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'{"op": "encode", "text": "LAST"}\n')
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            await server.shutdown()
+            responses = [await reader.readline(), await reader.readline()]
+            writer.close()
+            return responses
+
+        assert asyncio.run(run()) == [b'{"result": ".-.. .- ... -"}\n', b""]
@@ -0,0 +1,84 @@
+"""
+Unit tests for morse_stats.py
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import morse_stats.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from decode import iter_decode
+from encode import iter_encode
+from morse_stats import Recorder, peak_memory, run_profiled
+from morse_utils import validate_english_text
+
+def slow_chunks(chunks, delay):
+    """Yields the chunks, sleeping before each one"""
+    for chunk in chunks:
+        time.sleep(delay)
+        yield chunk
+
+class TestStats:
+    """Test class for the instrumentation layer"""
+
+    def test_wrap_counts_chunks(self):
+        """Test that a wrapped stage counts characters and bytes, and passes chunks through"""
+        recorder = Recorder()
+        chunks = list(recorder.wrap("read", ["SOS ", "héllo"]))
+        assert chunks == ["SOS ", "héllo"]
+        stats = recorder["read"]
+        assert (stats.chars, stats.bytes, stats.calls) == (9, 10, 2)
+
+    def test_stages_are_charged_their_own_time(self):
+        """Test that a stage is not charged for the stage it pulls from, nor for its consumer"""
+        recorder = Recorder()
+        chunks = recorder.wrap("read", slow_chunks(["SOS"] * 3, 0.02))
+        morse = recorder.wrap("encode", slow_chunks(iter_encode(chunks), 0.01), consumer="write")
+        for chunk in morse:
+            time.sleep(0.03)
+
+        assert list(recorder.stages) == ["read", "encode", "write"]
+        calls = recorder["encode"].calls
+        assert recorder["read"].seconds >= 0.06
+        # Encoding itself only sleeps, and is not charged for reading
+        assert 0.01 * calls <= recorder["encode"].seconds < 0.06
+        assert recorder["write"].seconds >= 0.03 * calls
+        assert recorder["write"].chars == recorder["encode"].chars == len("... --- ... ... --- ... ... --- ...")
+
+    def test_unknown_and_callback(self):
+        """Test counting unknown symbols and following progress with a callback"""
+        seen = []
+        recorder = Recorder(callback=lambda stats: seen.append((stats.name, stats.chars)))
+        list(recorder.wrap("read", ["a#b", "~~"], unknown=lambda chunk: chunk.count("#") + chunk.count("~")))
+        recorder.add_unknown(2)
+        assert recorder.unknown == 5
+        assert seen == [("read", 3), ("read", 5)]
+
+    def test_call(self):
+        """Test timing a single call, such as a validation"""
+        recorder = Recorder()
+        assert recorder.call("validate", validate_english_text, "Hello") == (True, "")
+        assert recorder["validate"].chars == 5
+        assert recorder["validate"].seconds > 0
+
+    def test_report(self):
+        """Test the formatted report"""
+        recorder = Recorder()
+        "".join(recorder.wrap("decode", iter_decode(["... --- ..."])))
+        report = recorder.report().splitlines()
+        assert report[0].split() == ["stage", "seconds", "chars", "bytes", "chars/s"]
+        assert report[1].split()[:4] == ["decode", report[1].split()[1], "3", "3"]
+        assert report[2].startswith("total")
+        assert "unknown symbols: 0" in report
+        if peak_memory() is not None:
+            assert report[-1].startswith("peak memory:")
+
+    def test_run_profiled(self):
+        """Test writing a cProfile profile of a call"""
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "run.prof")
+            assert run_profiled(path, "".join, iter_encode(["SOS"])) == "... --- ..."
+            assert any(function[2] == "iter_encode" for function in pstats.Stats(path).stats)
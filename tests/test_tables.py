@@ -0,0 +1,100 @@
+"""
+Unit tests for morse_tables.py
+"""
+
+import os
+import pickle
+import sys
+import pytest
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_tables.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+from decode import IncrementalDecoder, decode_from_morse, decode_from_morse_tree, iter_decode
+from encode import encode_to_morse, iter_encode
+from morse_cache import WordCache
+from morse_tables import CodeTable, get_table, register_table, table_names
+from morse_utils import CHAR_TO_MORSE, MORSE_TREE
+
+class TestTables:
+    """Test class for the code table registry"""
+
+    def test_default_table(self):
+        """Test that the default table is the Latin one and is compiled once"""
+        assert get_table() is get_table("latin")
+        assert get_table().char_to_morse == CHAR_TO_MORSE
+        assert get_table().tree == MORSE_TREE
+        assert "latin" in table_names()
+
+    def test_unknown_table(self):
+        """Test the error for a table that is not registered"""
+        with pytest.raises(ValueError, match="Unknown code table: klingon"):
+            get_table("klingon")
+
+    def test_cyrillic_round_trip(self):
+        """Test encoding and decoding with the Cyrillic table"""
+        morse = encode_to_morse("Привет, мир", table="cyrillic")
+        assert morse == ".--. .-. .. .-- . - --..-- / -- .. .-."
+        assert decode_from_morse(morse, table="cyrillic") == "ПРИВЕТ, МИР"
+        with pytest.raises(ValueError, match="Character 'W' cannot be converted"):
+            encode_to_morse("World", table="cyrillic")
+
+    def test_greek_accents(self):
+        """Test that accented Greek letters are encoded as the plain ones"""
+        assert decode_from_morse(encode_to_morse("Καλημέρα", table="greek"), table="greek") == "ΚΑΛΗΜΕΡΑ"
+
+    def test_wabun_kana(self):
+        """Test that hiragana, small and voiced kana are encoded with Wabun"""
+        assert encode_to_morse("カタカナ", table="wabun") == ".-.. -. .-.. .-."
+        assert encode_to_morse("かっが", table="wabun") == ".-.. .--. .-.. .."
+        assert decode_from_morse(".-.. .--. .-.. ..", table="wabun") == "カツカ゛"
+
+    def test_prosigns(self):
+        """Test that prosigns are encoded whole and take precedence when decoding"""
+        table = get_table("prosigns")
+        assert encode_to_morse("CQ <sk>", table=table) == "-.-. --.- / ...-.-"
+        assert decode_from_morse("...-.- / .-.-.", table=table) == "<SK> <AR>"
+        assert decode_from_morse_tree("...-.- / .-.-.", table=table) == "<SK> <AR>"
+        with pytest.raises(ValueError, match="Character '<' cannot be converted"):
+            encode_to_morse("<XY>", table=table)
+        assert encode_to_morse("©<SK>>A", skip_unknown=True, table=table) == "...-.- / .-"
+
+    def test_streaming_and_caching(self):
+        """Test that every engine gives the same result with a table"""
+        text = "Съешь же ещё этих мягких булок " * 20
+        morse = encode_to_morse(text, table="cyrillic")
+        chunks = [morse[i:i + 7] for i in range(0, len(morse), 7)]
+        expected = decode_from_morse(morse, table="cyrillic")
+
+        assert "".join(iter_encode([text[i:i + 5] for i in range(0, len(text), 5)], table="cyrillic")) == morse
+        assert encode_to_morse(text, cache=WordCache(table="cyrillic"), table="cyrillic") == morse
+        assert "".join(iter_decode(chunks, table="cyrillic")) == expected
+        assert decode_from_morse(morse, cache=WordCache(table="cyrillic"), table="cyrillic") == expected
+        decoder = IncrementalDecoder(table="cyrillic")
+        assert "".join(decoder.feed(chunk) for chunk in chunks) + decoder.flush() == expected
+
+    @patch.dict('morse_tables._LOADERS')
+    @patch.dict('morse_tables._TABLES')
+    def test_register_table(self):
+        """Test that a registered table is only loaded when it is first used"""
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return {"A": ".-", "B": "-..."}
+
+        register_table("test-ab", loader)
+        assert "test-ab" in table_names() and not loads
+        table = get_table("test-ab")
+        assert get_table("test-ab") is table and len(loads) == 1
+        assert encode_to_morse("ab ba", table=table) == ".- -... / -... .-"
+        # Tables travel to worker processes by name
+        assert pickle.loads(pickle.dumps(table)) is table
+        assert isinstance(table, CodeTable)
+
+    def test_main_with_table(self, capsys):
+        """Test the --table option of the decoder"""
+        with patch('sys.argv', ['decode.py', '--table', 'greek', '-.- .- .-.. .... -- . .-. .-']):
+            assert decode.main() == 0
+        assert capsys.readouterr().out == "ΚΑΛΗΜΕΡΑ\n"
@@ -0,0 +1,109 @@
+"""
+Unit tests for morse_timing.py
+"""
+
+import os
+import random
+import sys
+import pytest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import morse_timing.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decode
+import encode
+from decode import iter_decode
+from morse_timing import (array_events, format_timing, iter_timing, iter_timing_morse, parse_timing,
+                          timing_array, timing_units)
+
+class TestTiming:
+    """Test class for keying timelines"""
+
+    def test_units(self):
+        """Test PARIS element lengths in dots, and a dot of 60 ms at 20 WPM"""
+        events = list(iter_timing([".- / -"], unit="units"))
+        assert events == [(True, 1), (False, 1), (True, 3), (False, 7), (True, 3)]
+        assert list(iter_timing([".- -"], wpm=20)) == [(True, 60), (False, 60), (True, 180), (False, 180), (True, 180)]
+        assert timing_units(20, 10, "units")[0] == 1
+
+    def test_rounding_does_not_drift(self):
+        """Test that rounded durations add up to the exact length of the timeline"""
+        morse = encode.encode_to_morse("PARIS " * 13)
+        # PARIS is 50 dots with its word gap, which is not sent after the last word
+        durations = timing_array([morse], wpm=13)
+        assert sum(durations) == round(13 * 50 * 1200 / 13 - 7 * 1200 / 13)
+        assert set(durations) > {92, 93}
+
+    def test_farnsworth(self):
+        """Test that Farnsworth timing stretches only the gaps between letters and words"""
+        events = list(iter_timing(["... / -"], wpm=20, farnsworth_wpm=10))
+        dot, letter_gap, word_gap = timing_units(20, 10)
+        assert events[:5] == [(True, 60), (False, 60), (True, 60), (False, 60), (True, 60)]
+        assert events[5] == (False, round(word_gap))
+        assert word_gap > 7 * dot
+
+    def test_separators_and_errors(self):
+        """Test that separators opening or closing the message add no gap, and the errors"""
+        assert list(iter_timing([" / .  / "], unit="units")) == [(True, 1)]
+        assert list(iter_timing([""])) == []
+        with pytest.raises(ValueError, match="Character 'x' is not a Morse code symbol"):
+            list(iter_timing([".x"]))
+        with pytest.raises(ValueError, match="Unknown timing unit"):
+            list(iter_timing(["."], unit="s"))
+        with pytest.raises(ValueError, match="16-bit"):
+            timing_array([". ."], wpm=20, farnsworth_wpm=0.01)
+
+    @pytest.mark.parametrize("wpm, farnsworth_wpm, unit", [
+        (20, None, "ms"),
+        (13, None, "ms"),
+        (25, 10, "ms"),
+        (20, None, "units"),
+        (18, 5, "units"),
+    ])
+    def test_round_trip(self, wpm, farnsworth_wpm, unit):
+        """Test that timelines in every form decode back to the Morse code, streamed in any chunks"""
+        morse = encode.encode_to_morse("CQ CQ DE W1AW, the quick brown fox: 73!")
+        for size in (1, 5, 1000):
+            chunks = [morse[i:i + size] for i in range(0, len(morse), size)]
+            events = list(iter_timing(chunks, wpm, farnsworth_wpm, unit))
+            assert list(array_events(timing_array(chunks, wpm, farnsworth_wpm, unit))) == events
+
+            text = "".join(format_timing(events))
+            parsed = parse_timing([text[i:i + size] for i in range(0, len(text), size)])
+            assert "".join(iter_timing_morse(parsed, wpm, farnsworth_wpm, unit)) == morse
+
+    def test_jitter(self):
+        """Test that durations off by up to a third of a dot still decode"""
+        text = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG"
+        rng = random.Random(0)
+        events = [(is_down, duration + rng.randint(-20, 20)) for is_down, duration in
+                  iter_timing([encode.encode_to_morse(text)], wpm=20)]
+        # Runs of the same kind, zero durations and silence around the message are merged or skipped
+        events = [(False, 500)] + events[:3] + [(True, 0), (False, 0)] + events[3:] + [(False, 900)]
+        assert "".join(iter_decode(iter_timing_morse(events, wpm=20))) == text
+
+    def test_parse_errors(self):
+        """Test that invalid events are reported with their offset"""
+        assert list(parse_timing(["60 -6", "0\n180"])) == [(True, 60), (False, 60), (True, 180)]
+        with pytest.raises(ValueError, match=r"Invalid timing event '-6x0' \(at offset 3\)"):
+            list(parse_timing(["60 -6", "x0"]))
+
+    def test_main_with_timing(self, capsys):
+        """Test --format timing in the encoder, and reading it back in the decoder"""
+        with patch('sys.argv', ['encode.py', 'SOS', '--format', 'timing', '--unit', 'units']):
+            assert encode.main() == 0
+        assert capsys.readouterr().out == "1 -1 1 -1 1 -3 3 -1 3 -1 3 -3 1 -1 1 -1 1\n"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cq.txt")
+            args = ['--wpm', '25', '--farnsworth', '10']
+            with patch('sys.argv', ['encode.py', 'CQ DE W1AW', '--format', 'timing', '-o', path] + args):
+                assert encode.main() == 0
+            with patch('sys.argv', ['decode.py', '--format', 'timing', '-i', path] + args):
+                assert decode.main() == 0
+            assert capsys.readouterr().out == "CQ DE W1AW\n"
+
+            with patch('sys.argv', ['decode.py', '--format', 'timing', '-i', path, '--wpm', '0']):
+                assert decode.main() == 1
+            assert "Speed must be a positive number" in capsys.readouterr().err
@@ -2,16 +2,23 @@
 Unit tests for morse_utils.py
 """
 
+import io
 import os
 import pytest
+import stat
 import tempfile
 from morse_utils import (
     CHAR_TO_MORSE, 
     MORSE_TO_CHAR, 
+    MORSE_TREE,
     validate_english_text, 
     validate_morse_code,
     read_from_file,
-    write_to_file
+    write_to_file,
+    read_chunks_from_file,
+    write_chunks_into,
+    write_chunks_to_file,
+    open_replacing
 )
 
 class TestMorseUtils:
@@ -33,6 +40,15 @@ class TestMorseUtils:
         assert MORSE_TO_CHAR['----.'] == '9'
         assert MORSE_TO_CHAR['.-.-.-'] == '.'
     
+    def test_morse_tree_matches_mapping(self):
+        """Test that the binary tree holds every code at its path"""
+        for code, char in MORSE_TO_CHAR.items():
+            index = 1
+            for symbol in code:
+                index = 2 * index + (1 if symbol == '-' else 0)
+            assert MORSE_TREE[index] == char
+        assert sum(char is not None for char in MORSE_TREE) == len(MORSE_TO_CHAR)
+    
     def test_validate_english_text_valid(self):
         """Test validation of valid English text"""
         valid, _ = validate_english_text("Hello World")
@@ -96,4 +112,77 @@ class TestMorseUtils:
     def test_file_not_found(self):
         """Test handling of non-existent files"""
         with pytest.raises(FileNotFoundError):
-            read_from_file("nonexistent_file.txt") 
\ No newline at end of file
+            read_from_file("nonexistent_file.txt")
+
+    def test_chunked_file_operations(self):
+        """Test chunked file read and write operations"""
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            tmp_path = tmp.name
+            
+        try:
+            write_chunks_to_file(tmp_path, iter(["Hello, ", "World!"]))
+            assert list(read_chunks_from_file(tmp_path, chunk_size=5)) == ["Hello", ", Wor", "ld!"]
+            
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def test_replacing_keeps_special_targets(self):
+        """Test that links are followed, devices written in place, and modes and other files kept"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "out.txt")
+            link = os.path.join(tmp_dir, "link.txt")
+            with open(path, "w") as f:
+                f.write("previous")
+            os.chmod(path, 0o640)
+            os.symlink(path, link)
+            with open(path + ".tmp", "w") as f:
+                f.write("unrelated")
+
+            write_chunks_to_file(link, ["new"])
+            assert os.path.islink(link)
+            with open(path) as f:
+                assert f.read() == "new"
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+            with open(path + ".tmp") as f:
+                assert f.read() == "unrelated"
+
+            with pytest.raises(ValueError):
+                with open_replacing(path) as f:
+                    f.write(b"partial")
+                    raise ValueError("failed")
+            with open(path) as f:
+                assert f.read() == "new"
+            assert sorted(os.listdir(tmp_dir)) == ["link.txt", "out.txt", "out.txt.tmp"]
+
+        write_chunks_to_file(os.devnull, ["discarded"])
+        assert stat.S_ISCHR(os.stat(os.devnull).st_mode)
+
+    def test_write_chunks_into(self):
+        """Test writing chunks to a bytearray and to binary, unbuffered and text files"""
+        chunks = ["Hello, ", "Wörld!"]
+        out = bytearray()
+        assert write_chunks_into(out, chunks, encoding="utf-8") == 13
+        assert out == "Hello, Wörld!".encode("utf-8")
+
+        class SlowRaw(io.RawIOBase):
+            """Unbuffered writer that takes at most two bytes per call"""
+            def __init__(self):
+                self.data = bytearray()
+            def writable(self):
+                return True
+            def write(self, data):
+                self.data += bytes(data[:2])
+                return min(2, len(data))
+
+        for target, written in [(io.BytesIO(), io.BytesIO.getvalue), (SlowRaw(), lambda raw: raw.data)]:
+            write_chunks_into(target, iter(chunks), encoding="utf-8")
+            assert written(target) == "Hello, Wörld!".encode("utf-8")
+        text = io.StringIO()
+        write_chunks_into(text, iter(chunks))
+        assert text.getvalue() == "Hello, Wörld!"
+
+    def test_chunked_file_not_found(self):
+        """Test handling of non-existent files when reading in chunks"""
+        with pytest.raises(FileNotFoundError):
+            list(read_chunks_from_file("nonexistent_file.txt"))